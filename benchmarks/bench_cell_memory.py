@@ -0,0 +1,75 @@
+"""Memory report for DungeonCellNeo grids
+
+Builds a size x size grid of cells with the old dict-backed cell (eight
+empty lists, a properties dict and a description per cell, kept here only
+as a reference) and with the slotted DungeonCellNeo, and reports what
+tracemalloc saw for each. A second pass touches every cell the way the
+renderer does (reading entities and overlays) to show that reads don't
+allocate anything that stays.
+
+    python -m benchmarks.bench_cell_memory
+    python -m benchmarks.bench_cell_memory --sizes 41 401 1001
+"""
+import argparse
+import gc
+import tracemalloc
+
+from dungeon_neo.cell_neo import DungeonCellNeo
+
+
+class DictCell:
+    """The old cell: every collection allocated up front"""
+
+    def __init__(self, base_type, x, y):
+        self.base_type = base_type
+        self.x = x
+        self.y = y
+        self.features = []
+        self.objects = []
+        self.npcs = []
+        self.items = []
+        self.modifications = []
+        self.temporary_effects = []
+        self.entities = []
+        self.overlays = []
+        self.description = ""
+        self.properties = {}
+
+
+def measure(cls, size, touch=False):
+    """Bytes still allocated after building (and optionally reading) a grid"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        grid = [[cls(0, x, y) for x in range(size)] for y in range(size)]
+        if touch:
+            for row in grid:
+                for cell in row:
+                    len(cell.entities)
+                    len(cell.overlays)
+        used = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    del grid
+    return used
+
+
+def run(sizes):
+    print(f"{'size':>6} {'cells':>9} {'old KB':>10} {'new KB':>10} {'old B/cell':>11} "
+          f"{'new B/cell':>11} {'saved':>7} {'after reads':>12}")
+    for size in sizes:
+        cells = size * size
+        old = measure(DictCell, size)
+        new = measure(DungeonCellNeo, size)
+        touched = measure(DungeonCellNeo, size, touch=True)
+        print(f"{size:>6} {cells:>9} {old / 1024:>10.1f} {new / 1024:>10.1f} {old / cells:>11.0f} "
+              f"{new / cells:>11.0f} {1 - new / old:>6.0%} {touched / 1024:>10.1f}KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare old and slotted cell memory')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[41, 151, 401])
+    args = parser.parse_args()
+
+    run(args.sizes)
@@ -0,0 +1,219 @@
+"""Config sweep benchmark for DungeonGeneratorNeo
+
+Runs every combination of size, dungeon layout, room layout, corridor
+layout, remove_deadends and add_stairs over a fixed seed set. Reports the
+median and p95 generation time and the tracemalloc peak per config. Timing
+runs are untraced; the peak comes from one extra traced run on the first
+seed, since tracing slows the generator down several times over.
+
+    python -m benchmarks.bench_generator --save benchmarks/generator_baseline.json
+    python -m benchmarks.bench_generator --compare benchmarks/generator_baseline.json
+    python -m benchmarks.bench_generator --sizes 151 --layouts None Box --phases
+    python -m benchmarks.bench_generator --sizes 301 --layouts Cavern --room-layouts Scattered \
+        --corridor-layouts Bent --deadends 0
+
+--compare exits with status 1 if any config got slower (or used more
+memory) than --threshold percent.
+
+Baselines are machine-specific: timings only compare against a baseline
+saved on the same machine (and Python), and peak memory shifts between
+Python versions too. The checked-in generator_baseline.json was recorded
+with the default sweep at the end of the last generator change, and its
+meta block says where - it is a reference, not a gate. Before comparing,
+check out the commit you are measuring against, --save a baseline of your
+own, then switch back and --compare against that. On a busy or
+single-core box timings swing 20-30% between runs; raise --threshold
+there, or trust only the peak column.
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+from dungeon_neo.profiling import PhaseTimer
+
+BASE_OPTIONS = {
+    'seed': None,
+    'n_rows': 39,
+    'n_cols': 39,
+    'dungeon_layout': 'None',
+    'room_min': 3,
+    'room_max': 9,
+    'room_layout': 'Scattered',
+    'corridor_layout': 'Bent',
+    'remove_deadends': 50,
+    'add_stairs': 2
+}
+
+SWEEP = {
+    'sizes': [39, 75],
+    'layouts': ['None', 'Box', 'Cross', 'Round'],
+    'room_layouts': ['Scattered', 'Packed'],
+    'corridor_layouts': ['Labyrinth', 'Bent', 'Straight'],
+    'deadends': [0, 50, 100],
+    'stairs': [0, 2],
+    'seeds': [1, 2, 3, 4, 5]
+}
+
+
+def config_key(size, layout, room_layout, corridor_layout, deadends, stairs):
+    return f"{size}/{layout}/{room_layout}/{corridor_layout}/dead{deadends}/stairs{stairs}"
+
+
+def make_options(size, layout, room_layout, corridor_layout, deadends, stairs, seed, extra=None):
+    options = dict(BASE_OPTIONS, n_rows=size, n_cols=size, dungeon_layout=layout,
+                   room_layout=room_layout, corridor_layout=corridor_layout,
+                   remove_deadends=deadends, add_stairs=stairs, seed=seed)
+    if extra:
+        options.update(extra)
+    return options
+
+
+def generate(options):
+    """Generate one dungeon, returning seconds spent in create_dungeon"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = DungeonGeneratorNeo(options)
+        start = time.perf_counter()
+        generator.create_dungeon()
+    return time.perf_counter() - start
+
+
+def traced_peak(options):
+    """tracemalloc peak in KB for one generation"""
+    tracemalloc.start()
+    try:
+        generate(options)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def p95(values):
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=20, method='inclusive')[18]
+
+
+def run_config(config, seeds, extra=None, phases=False):
+    times = [generate(make_options(*config, seed, extra)) * 1000 for seed in seeds]
+    result = {
+        'median_ms': statistics.median(times),
+        'p95_ms': p95(times),
+        'peak_kb': traced_peak(make_options(*config, seeds[0], extra))
+    }
+    if phases:
+        result['phases_ms'] = phase_medians(config, seeds, extra)
+    return result
+
+
+def phase_medians(config, seeds, extra=None):
+    """Median milliseconds per create_dungeon phase, from separate timed runs"""
+    per_phase = {}
+    for seed in seeds:
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator = DungeonGeneratorNeo(make_options(*config, seed, extra))
+            generator.timer = PhaseTimer()
+            generator.create_dungeon()
+        for name, ms in generator.last_timings['phases'].items():
+            per_phase.setdefault(name, []).append(ms)
+    return {name: statistics.median(times) for name, times in per_phase.items()}
+
+
+def run(sweep, extra=None, phases=False):
+    configs = list(itertools.product(sweep['sizes'], sweep['layouts'], sweep['room_layouts'],
+                                     sweep['corridor_layouts'], sweep['deadends'], sweep['stairs']))
+    results = {}
+    print(f"{'config':<44} {'median ms':>10} {'p95 ms':>10} {'peak KB':>10}")
+    for config in configs:
+        key = config_key(*config)
+        results[key] = run_config(config, sweep['seeds'], extra, phases)
+        row = results[key]
+        print(f"{key:<44} {row['median_ms']:>10.2f} {row['p95_ms']:>10.2f} {row['peak_kb']:>10.1f}")
+        if phases:
+            slowest = sorted(row['phases_ms'].items(), key=lambda item: -item[1])[:3]
+            print('    ' + '  '.join(f"{name}={ms:.1f}" for name, ms in slowest))
+    return results
+
+
+def save(path, results, sweep, extra=None):
+    baseline = {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'sweep': sweep,
+            'extra_options': extra or {}
+        },
+        'configs': results
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    print(f"Baseline written to {path}")
+
+
+def compare(path, results, threshold):
+    """Print deltas against a saved baseline; return the regressed configs"""
+    with open(path) as f:
+        baseline = json.load(f)['configs']
+
+    regressions = []
+    print(f"\n{'config':<44} {'median':>9} {'p95':>9} {'peak':>9}")
+    for key, row in results.items():
+        old = baseline.get(key)
+        if not old:
+            print(f"{key:<44} {'new':>9}")
+            continue
+        deltas = [(row[name] - old[name]) / old[name] * 100 if old[name] else 0.0
+                  for name in ('median_ms', 'p95_ms', 'peak_kb')]
+        flag = ''
+        if deltas[0] > threshold or deltas[2] > threshold:
+            regressions.append(key)
+            flag = '  REGRESSED'
+        print(f"{key:<44} {deltas[0]:>+8.1f}% {deltas[1]:>+8.1f}% {deltas[2]:>+8.1f}%{flag}")
+
+    missing = [key for key in baseline if key not in results]
+    print(f"\n{len(regressions)} regressed (> {threshold:.0f}%), "
+          f"{len(missing)} baseline configs not run")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark DungeonGeneratorNeo across configs')
+    parser.add_argument('--sizes', nargs='+', type=int, default=SWEEP['sizes'])
+    parser.add_argument('--layouts', nargs='+', default=SWEEP['layouts'])
+    parser.add_argument('--room-layouts', nargs='+', default=SWEEP['room_layouts'])
+    parser.add_argument('--corridor-layouts', nargs='+', default=SWEEP['corridor_layouts'])
+    parser.add_argument('--deadends', nargs='+', type=int, default=SWEEP['deadends'])
+    parser.add_argument('--stairs', nargs='+', type=int, default=SWEEP['stairs'])
+    parser.add_argument('--seeds', nargs='+', type=int, default=SWEEP['seeds'])
+    parser.add_argument('--options', type=json.loads, default=None,
+                        help='Extra generator options as JSON, e.g. \'{"numpy_passes": true}\'')
+    parser.add_argument('--phases', action='store_true', help='Also report median per-phase timings')
+    parser.add_argument('--save', metavar='PATH', help='Write results as a baseline JSON')
+    parser.add_argument('--compare', metavar='PATH', help='Compare results against a baseline JSON')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Percent slowdown counted as a regression (default 10)')
+    args = parser.parse_args()
+
+    sweep = {
+        'sizes': args.sizes,
+        'layouts': args.layouts,
+        'room_layouts': args.room_layouts,
+        'corridor_layouts': args.corridor_layouts,
+        'deadends': args.deadends,
+        'stairs': args.stairs,
+        'seeds': args.seeds
+    }
+    results = run(sweep, args.options, args.phases)
+
+    if args.save:
+        save(args.save, results, sweep, args.options)
+    if args.compare:
+        if compare(args.compare, results, args.threshold):
+            sys.exit(1)
@@ -0,0 +1,86 @@
+"""Scaling benchmark for region-parallel generation
+
+Generates the same big map as one generator run, then as `--regions`
+regions over 1, 2, ... N worker processes, and reports the median time
+and speedup over one worker. Every worker count must produce the same
+grid for a seed; the last column says whether it did.
+
+    python -m benchmarks.bench_regions
+    python -m benchmarks.bench_regions --size 400 --regions 8 --workers 1 2 4 8 --seeds 1 2 3
+
+Speedup tops out at the region count, and well below it once regions
+outnumber cores. Worker start-up is included in every timing, so small
+maps gain little.
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import time
+
+from core.region_generation import RegionGenerator
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+
+BASE_OPTIONS = {
+    'seed': None,
+    'n_rows': 400,
+    'n_cols': 400,
+    'dungeon_layout': 'None',
+    'room_min': 3,
+    'room_max': 9,
+    'room_layout': 'Scattered',
+    'corridor_layout': 'Bent',
+    'remove_deadends': 50,
+    'add_stairs': 2
+}
+
+
+def generate_single(options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        DungeonGeneratorNeo(dict(options)).create_dungeon()
+    return time.perf_counter() - start
+
+
+def generate_regions(options, regions, workers):
+    """Seconds for one region-parallel generation, and its grid"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = RegionGenerator(options, regions, workers).generate()
+    seconds = time.perf_counter() - start
+    return seconds, result['grid']
+
+
+def run(size, regions, workers, seeds, layout):
+    options = dict(BASE_OPTIONS, n_rows=size, n_cols=size, room_layout=layout)
+    single = statistics.median(generate_single(dict(options, seed=seed)) for seed in seeds) * 1000
+    print(f"{size}x{size} {layout}, {regions} regions, {os.cpu_count()} cores")
+    print(f"{'single generator':<18} {single:>10.1f} ms")
+    print(f"{'workers':<18} {'median ms':>10} {'speedup':>8}  identical")
+
+    grids = {}  # seed -> grid from the first worker count
+    first = None
+    for count in workers:
+        times, identical = [], True
+        for seed in seeds:
+            seconds, grid = generate_regions(dict(options, seed=seed), regions, count)
+            times.append(seconds)
+            identical = identical and grids.setdefault(seed, grid) == grid
+        ms = statistics.median(times) * 1000
+        first = first or ms
+        print(f"{count:<18} {ms:>10.1f} {first / ms:>7.2f}x  {identical}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark region-parallel generation over worker counts')
+    parser.add_argument('--size', type=int, default=400)
+    parser.add_argument('--regions', type=int, default=4)
+    parser.add_argument('--workers', nargs='+', type=int,
+                        help='Worker counts to try (default 1 up to the region count)')
+    parser.add_argument('--seeds', nargs='+', type=int, default=[1, 2, 3])
+    parser.add_argument('--room-layout', default='Scattered')
+    args = parser.parse_args()
+
+    workers = args.workers or list(range(1, args.regions + 1))
+    run(args.size, args.regions, workers, args.seeds, args.room_layout)
@@ -0,0 +1,143 @@
+"""Seeds-by-size benchmark for corridor tunnelling and dead-end collapse
+
+Compares the explicit-stack tunnel()/collapse() in DungeonGeneratorNeo with
+the old recursive versions (kept here only as a reference) and checks that
+both produce byte-identical dungeons for every seed.
+
+    python -m benchmarks.bench_tunnel
+    python -m benchmarks.bench_tunnel --sizes 151 301 1001 --seeds 1 2 3
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import threading
+import time
+
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+
+BASE_OPTIONS = {
+    'seed': None,
+    'n_rows': 39,
+    'n_cols': 39,
+    'dungeon_layout': 'None',
+    'room_min': 3,
+    'room_max': 9,
+    'room_layout': 'Scattered',
+    'corridor_layout': 'Bent',
+    'remove_deadends': 50,
+    'add_stairs': 2
+}
+
+
+class RecursiveGenerator(DungeonGeneratorNeo):
+    """The old recursive generator: one Python frame per corridor step"""
+
+    def tunnel(self, i, j, last_dir=None, deadline=None):
+        dirs = self.tunnel_dirs(last_dir)
+        for dir in dirs:
+            if self.open_tunnel(i, j, dir):
+                next_i = i + self.di[dir]
+                next_j = j + self.dj[dir]
+                self.tunnel(next_i, next_j, dir)
+        return True
+
+    def collapse(self, r, c, xc, closed=None):
+        if not (self.cell[r][c] & (self.ROOM | self.CORRIDOR)):
+            return
+
+        for dir, config in xc.items():
+            if not self.check_tunnel(self.cell, r, c, config):
+                continue
+
+            for pos in config['close']:
+                self.cell[r + pos[0]][c + pos[1]] = self.NOTHING
+                if closed is not None:
+                    closed.append((r + pos[0], c + pos[1]))
+
+            if 'recurse' in config:
+                recurse = config['recurse']
+                self.collapse(r + recurse[0], c + recurse[1], xc, closed)
+
+
+def generate(generator_class, size, seed):
+    """Generate one dungeon, returning (seconds, grid)"""
+    options = dict(BASE_OPTIONS, n_rows=size, n_cols=size, seed=seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = generator_class(options)
+        start = time.perf_counter()
+        result = generator.create_dungeon()
+    return time.perf_counter() - start, result['grid']
+
+
+def run_recursive(size, seed):
+    """Run the recursive reference on a big stack, or None if it still overflows"""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['value'] = generate(RecursiveGenerator, size, seed)
+        except RecursionError:
+            outcome['value'] = None
+
+    old_limit = sys.getrecursionlimit()
+    old_stack = threading.stack_size()
+    sys.setrecursionlimit(max(old_limit, size * size))
+    threading.stack_size(512 * 1024 * 1024)
+    try:
+        worker = threading.Thread(target=target)
+        worker.start()
+        worker.join()
+    finally:
+        threading.stack_size(old_stack)
+        sys.setrecursionlimit(old_limit)
+    return outcome.get('value')
+
+
+def fits_default_limit(size, seed):
+    """Whether the recursive reference survives the default recursion limit"""
+    try:
+        generate(RecursiveGenerator, size, seed)
+        return True
+    except RecursionError:
+        return False
+
+
+def run(sizes, seeds, reference=True):
+    print(f"{'size':>6} {'iterative ms':>13} {'recursive ms':>13} {'speedup':>8} "
+          f"{'default limit':>14}  identical")
+    for size in sizes:
+        iterative, recursive, identical, overflowed = [], [], True, False
+        for seed in seeds:
+            seconds, grid = generate(DungeonGeneratorNeo, size, seed)
+            iterative.append(seconds)
+            if reference and not overflowed:
+                ref = run_recursive(size, seed)
+                if ref is None:
+                    overflowed = True
+                    continue
+                recursive.append(ref[0])
+                identical = identical and ref[1] == grid
+
+        it_ms = statistics.median(iterative) * 1000
+        if not reference:
+            print(f"{size:>6} {it_ms:>13.1f} {'skipped':>13}")
+        elif overflowed:
+            print(f"{size:>6} {it_ms:>13.1f} {'overflow':>13}")
+        else:
+            rec_ms = statistics.median(recursive) * 1000
+            limit = 'ok' if fits_default_limit(size, seeds[0]) else 'RecursionError'
+            print(f"{size:>6} {it_ms:>13.1f} {rec_ms:>13.1f} {rec_ms / it_ms:>7.2f}x "
+                  f"{limit:>14}  {identical}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark iterative vs recursive tunnelling')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[39, 75, 151, 301])
+    parser.add_argument('--seeds', nargs='+', type=int, default=[1, 2, 3, 4, 5])
+    parser.add_argument('--no-reference', action='store_true',
+                        help='Skip the recursive reference (useful for very large maps)')
+    args = parser.parse_args()
+
+    run(args.sizes, args.seeds, reference=not args.no_reference)
@@ -0,0 +1,67 @@
+"""Cost of DM edit undo: chunk copy-on-write vs copying the whole state
+
+For each map size, times a snapshot, a one-cell edit and its undo through
+the state's EditHistory, against the deep copy of grid and secret mask
+that a naive undo would take before every edit (measured on the object
+grid only).
+
+    python -m benchmarks.bench_undo
+    python -m benchmarks.bench_undo --sizes 75 401 --repeat 1000
+"""
+import argparse
+import contextlib
+import copy
+import io
+import time
+
+from core.dungeon import DungeonSystem
+
+
+def make_state(size, flat_grid):
+    options = dict(DungeonSystem.DEFAULT_OPTIONS, seed=1, n_rows=size, n_cols=size, flat_grid=flat_grid)
+    with contextlib.redirect_stdout(io.StringIO()):
+        dungeon = DungeonSystem(options)
+        dungeon.generate()
+    return dungeon.state
+
+
+def time_undo(state, repeat):
+    """Microseconds for snapshot + edit + undo, and for the snapshot alone"""
+    history = state.history
+    x, y = state.width // 2, state.height // 2
+    value = state.get_cell(x, y).base_type
+    snap = total = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        history.snapshot('bench')
+        taken = time.perf_counter()
+        state.set_cell_flags(x, y, value ^ state.BLOCKED)
+        history.undo()
+        end = time.perf_counter()
+        snap += taken - start
+        total += end - start
+    assert state.get_cell(x, y).base_type == value
+    return total / repeat * 1e6, snap / repeat * 1e6
+
+
+def run(sizes, repeat):
+    print(f"{'size':>6} {'grid':>7} {'snapshot us':>12} {'edit+undo us':>13} {'deepcopy us':>12}")
+    for size in sizes:
+        for flat_grid in (False, True):
+            state = make_state(size, flat_grid)
+            cycle, snap = time_undo(state, repeat)
+            full = ''
+            if not flat_grid:
+                start = time.perf_counter()
+                copy.deepcopy((state.grid_system, state.secret_mask))
+                full = f"{(time.perf_counter() - start) * 1e6:.0f}"
+            print(f"{size:>6} {'flat' if flat_grid else 'object':>7} {snap:>12.1f} {cycle:>13.1f} {full:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare chunked undo with full-state copies')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[39, 151, 401])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    run(args.sizes, args.repeat)
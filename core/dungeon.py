@@ -1,9 +1,17 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from dungeon_neo.generator_neo import DungeonGeneratorNeo
+from dungeon_neo.result_codec import encode_result, decode_result
 from dungeon_neo.state_neo import DungeonStateNeo
 from dungeon_neo.renderer_neo import DungeonRendererNeo
 from dungeon_neo.visibility_neo import VisibilitySystemNeo
 from dungeon_neo.constants import CELL_FLAGS
+from dungeon_neo.passability import cell_passable
 from dungeon_neo.movement_service import MovementService
+from core.seed_search import SeedSearch
+from core.dungeon_levels import DungeonLevels
+from core.region_generation import RegionGenerator
+from dungeon_neo.chunked_grid import ChunkedGridSystem
 
 class DungeonSystem:
     NOTHING = CELL_FLAGS['NOTHING']
@@ -47,15 +55,38 @@ class DungeonSystem:
             'grid': 'Square'
         }
     
-    def __init__(self, options=None):
+    def __init__(self, options=None, pool=None, timer=None):
         self.options = options or self.DEFAULT_OPTIONS
         self.generator = DungeonGeneratorNeo(self.options)
+        # The state copies the grid into its own cells, so each regeneration
+        # can overwrite the previous grid's rows instead of allocating new ones
+        self.generator.reuse_buffers = True
+        self.generator.timer = timer  # Optional PhaseTimer for per-phase timings
+        self.pool = pool  # Optional DungeonPool serving pre-generated results
         self.renderer = DungeonRendererNeo()
         self.state = None  # Will be initialized after generation
         self.visibility_system = None  # Will be initialized after generation
+        self.last_degraded = []  # Steps the last generation cut short or could not finish
+        self.levels = None  # DungeonLevels stack, made on the first trip down (see level_stack)
+        self.depth = 1
+        # Level 1's result until the stack adopts it. Safe to hold: only the
+        # next generate() overwrites its rows, and that replaces it anyway
+        self._level_one = None
     
-    def generate(self, dungeon_type=None, theme=None, context=None):
-        """Generate dungeon with optional parameters"""
+    def generate(self, dungeon_type=None, theme=None, context=None, time_budget_ms=None):
+        """Generate dungeon with optional parameters
+
+        time_budget_ms is a soft generation-time target for interactive
+        callers (see DungeonGeneratorNeo.time_budget_ms): optional work is cut
+        to fit, required phases are not. It defaults to the options'
+        'time_budget_ms', and None keeps full quality.
+
+        With options 'regions' > 1 the map is generated as that many regions
+        over 'region_workers' processes (see core.region_generation); the
+        time budget doesn't apply there.
+        """
+        if time_budget_ms is None:
+            time_budget_ms = self.options.get('time_budget_ms')
         # Update options if parameters are provided
         if dungeon_type:
             self.options['dungeon_type'] = dungeon_type
@@ -65,37 +96,181 @@ class DungeonSystem:
             self.options['context'] = context
         try:
             # Generate dungeon and get the result
-            generator_result = self.generator.create_dungeon()
+            if self.pool:
+                generator_result = self.pool.get(
+                    self.options,
+                    self.options.get('dungeon_type'),
+                    self.options.get('theme'),
+                    time_budget_ms=time_budget_ms
+                )
+            elif (self.options.get('regions') or 1) > 1:
+                # Big maps: independent regions built in parallel, then stitched
+                generator_result = RegionGenerator(
+                    self.options, workers=self.options.get('region_workers') or 1
+                ).generate()
+            else:
+                self.generator.time_budget_ms = time_budget_ms
+                generator_result = self.generator.create_dungeon()
             if not generator_result:
                 return False
-            # Create state from generator result
-            self.state = DungeonStateNeo(generator_result)
-            
-            # Set final party position FIRST
-            self._set_initial_party_position()
-            
-            # THEN create visibility system with actual position
-            self.state.visibility_system = VisibilitySystemNeo(
-                self.state.grid_system, 
-                self.state.party_position
-            )
-        
-            # Update visibility immediately
-            self.state.visibility_system.update_visibility()
-            
-            # Finally create movement service
-            self.state.movement = MovementService(self.state)
-            print(f"Generated dungeon: {self.state.width}x{self.state.height}")
-            print(f"Initial party position: {self.state.party_position}")
+            self.last_degraded = generator_result.get('degraded', [])
+            self._load_result(generator_result)
+
+            # No stack until the party heads downstairs; most resets never do
+            if self.levels:
+                self.levels.close()
+            self.levels = None
+            self._level_one = generator_result
+            self.depth = 1
             return True            
         except Exception as e:
             print(f"Dungeon generation failed: {str(e)}")
             return False
 
-    def _set_initial_party_position(self):
-        """Set initial party position near first up stair"""
+    def level_stack(self):
+        """The DungeonLevels stack below the current dungeon, made on first use
+
+        Seeded from the seed level 1 was actually generated with, so the
+        same dungeon always has the same levels below it. None for an
+        endless dungeon.
+        """
+        if self.levels is None and self._level_one is not None:
+            self.levels = DungeonLevels(self.options, base_seed=self._level_one.get('seed'))
+            self.levels.add(1, self._level_one)
+            self._level_one = None
+        return self.levels
+
+    def stair_at_party(self):
+        """'down' or 'up' if the party stands on a stair, else None"""
+        cell = self.state.get_cell(*self.state.party_position) if self.state else None
+        if not cell:
+            return None
+        if cell.base_type & self.STAIR_DN:
+            return 'down'
+        if cell.base_type & self.STAIR_UP:
+            return 'up'
+        return None
+
+    def near_down_stair(self, radius=6):
+        """Start on the next level in the background once the party nears a down stair"""
+        if self.state is None or (self._level_one is None and self.levels is None):
+            return False
+        x, y = self.state.party_position
+        for stair in self.state.stairs:
+            # Stair dicts carry the row in 'x' and the column in 'y'
+            if stair['key'] == 'down' and abs(stair['x'] - y) + abs(stair['y'] - x) <= radius:
+                self.level_stack().prefetch(self.depth + 1)
+                return True
+        return False
+
+    def take_stairs(self, delta):
+        """Go one level down (delta 1) or up (delta -1)
+
+        The party has to be standing on a down stair to go down and on an up
+        stair to go up; level 1's up stairs lead nowhere.
+        """
+        if delta not in (1, -1) or self.stair_at_party() != ('down' if delta > 0 else 'up'):
+            return False
+        depth = self.depth + delta
+        levels = self.level_stack()
+        if depth < 1 or levels is None:
+            return False
+        return self.enter_level(levels, depth, 'up' if delta > 0 else 'down')
+
+    def enter_level(self, levels, depth, arrive_by='up'):
+        """Switch to one level of a core.dungeon_levels.DungeonLevels stack
+
+        The party arrives on the stair they came through: the up stair when
+        descending, the down stair when climbing back. The level below is
+        prefetched straight away. The state is built fresh from the level's
+        generated result: edits and exploration on the level being left are
+        lost (see DungeonLevels).
+        """
+        try:
+            self._load_result(levels.get(depth), arrive_by)
+        except Exception as e:
+            print(f"Entering dungeon level {depth} failed: {str(e)}")
+            return False
+        self.levels = levels
+        self.depth = depth
+        levels.prefetch(depth + 1)
+        return True
+
+    def _load_result(self, generator_result, arrive_by='up'):
+        """Build state, party position, visibility and movement for a result"""
+        # Create state from generator result; options 'flat_grid' keeps the
+        # cells in one flag buffer (see dungeon_neo.flat_grid)
+        self.state = DungeonStateNeo(generator_result, flat_grid=self.options.get('flat_grid'))
+        
+        # Set final party position FIRST
+        self._set_initial_party_position(arrive_by)
+        
+        # THEN create visibility system with actual position
+        self.state.visibility_system = VisibilitySystemNeo(
+            self.state.grid_system, 
+            self.state.party_position,
+            passability=self.state.passability
+        )
+        
+        # Update visibility immediately
+        self.state.visibility_system.update_visibility()
+        
+        # Finally create movement service
+        self.state.movement = MovementService(self.state)
+        print(f"Generated dungeon: {self.state.width}x{self.state.height}")
+        print(f"Initial party position: {self.state.party_position}")
+
+    def generate_endless(self, world_seed=None, chunk_size=41, max_chunks=16):
+        """Start an endless dungeon made of chunks generated as the party explores"""
+        try:
+            # Stairs lead nowhere in an endless world
+            world = ChunkedGridSystem(dict(self.options, add_stairs=0), world_seed, chunk_size, max_chunks)
+            self.state = DungeonStateNeo.endless(world)
+            self.state.party_position = world.find_open_cell(0, 0)
+            self.state.visibility_system = VisibilitySystemNeo(world, self.state.party_position)
+            self.state.movement = MovementService(self.state)
+        except Exception as e:
+            print(f"Endless dungeon generation failed: {str(e)}")
+            return False
+        if self.levels:
+            self.levels.close()
+        self.levels = None
+        self._level_one = None
+        self.depth = 1
+        print(f"Endless dungeon: world seed {world.world_seed}, {chunk_size}x{chunk_size} chunks")
+        print(f"Initial party position: {self.state.party_position}")
+        return True
+
+    @staticmethod
+    def generate_many(options, seeds, workers=1):
+        """Generate one dungeon per seed, fanned out over a process pool
+
+        Every dungeon is built by a fresh generator seeded only from its own
+        seed, so the results are the same whatever the worker count. Workers
+        send each dungeon back in the binary result_codec form, and results
+        come back in seed order as decoded dicts (grid rows are memoryviews).
+        """
+        options = dict(options or DungeonSystem.DEFAULT_OPTIONS)
+        seeds = list(seeds)
+
+        if not workers or workers <= 1 or len(seeds) <= 1:
+            return [decode_result(_generate_encoded(options, seed)) for seed in seeds]
+
+        chunksize = max(1, len(seeds) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            encoded = pool.map(_generate_encoded, repeat(options), seeds, chunksize=chunksize)
+            return [decode_result(data) for data in encoded]
+
+    @staticmethod
+    def find_seeds(criteria, options=None, matches=1, seeds=None, workers=1, max_candidates=1000):
+        """Seeds whose dungeons meet criteria (see core.seed_search.SeedSearch)"""
+        search = SeedSearch(dict(options or DungeonSystem.DEFAULT_OPTIONS), criteria, workers)
+        return search.search(seeds, matches, max_candidates)
+
+    def _set_initial_party_position(self, arrive_by='up'):
+        """Set initial party position near the first stair of kind arrive_by"""
         # Find first up stair
-        up_stairs = [stair for stair in self.state.stairs if stair.get('key') == 'up'] # find all the up stairs. You would come down them to be here.
+        up_stairs = [stair for stair in self.state.stairs if stair.get('key') == arrive_by] # find all the up stairs. You would come down them to be here.
         
         if not up_stairs:
             # Fallback to first room center
@@ -118,20 +293,8 @@ class DungeonSystem:
             self.state.party_position = (party_y, party_x)
                     
     def is_blocked_for_movement(self, cell):
-        """Simplified blocking logic"""
-        # Block all BLOCKED cells
-        if cell.is_blocked:
-            return True
-            
-        # Block all perimeter cells that aren't doors
-        if cell.is_perimeter and not cell.is_door:
-            return True
-            
-        # Block non-arch doors
-        if cell.is_door and not cell.is_arch:
-            return True
-            
-        return False
+        """Same rule as the state's passability bitmap (dungeon_neo.passability)"""
+        return not cell_passable(cell.base_type)
         
     def get_image(self, debug=False):
         # Simply pass the state directly to the renderer
@@ -139,4 +302,10 @@ class DungeonSystem:
             self.state, 
             debug_show_all=debug,
             visibility_system=self.state.visibility_system
-        )
\ No newline at end of file
+        )
+
+
+def _generate_encoded(options, seed):
+    """Worker entry point for DungeonSystem.generate_many"""
+    generator = DungeonGeneratorNeo(dict(options, seed=seed))
+    return encode_result(generator.create_dungeon(), seed)
@@ -0,0 +1,221 @@
+import os
+import random
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+from dungeon_neo.result_codec import encode_result, decode_result
+
+
+class DungeonLevels:
+    """A stack of dungeon levels generated on demand and linked by stairs
+
+    Level 1 is generated (or adopted with add()) first; level k + 1 is only
+    generated when something asks for it, with its up stair anchored on
+    level k's down stair (the generator's 'stair_anchor' option). Each level
+    has its own seed derived from base_seed, so any level can be rebuilt
+    without the ones above it as long as its anchor is known - anchors are
+    a couple of ints, so they are always kept.
+
+    At most cache_size levels are kept decoded in memory. Least recently
+    used levels are spilled to spill_dir (a temp dir by default) in the
+    result_codec form and decoded again on the next get(), which costs far
+    less than regenerating. prefetch() generates a level on a background
+    thread; near_down_stair() calls it while the party is close to a down
+    stair, so descending rarely waits.
+
+    Only generated results are stored - cached, spilled or rebuilt from the
+    seed, a level always comes back as it was generated. Nothing done to a
+    level's DungeonStateNeo while the party was on it (DM edits, cell
+    descriptions, entities, overlays, explored cells) is kept, so leaving a
+    level and coming back resets it.
+    """
+
+    def __init__(self, options, base_seed=None, cache_size=3, spill_dir=None):
+        self.options = dict(options)
+        # Levels outlive the generator call, so no shared grid buffers
+        self.options.pop('reuse_buffers', None)
+        self.options.pop('time_budget_ms', None)
+        seed = base_seed if base_seed is not None else self.options.get('seed')
+        self.base_seed = seed if seed not in (None, 'None') else random.randint(1, 100000)
+        self.cache_size = max(1, cache_size)
+        self._spill_dir = spill_dir
+        self._own_spill_dir = None
+
+        self._cache = OrderedDict()   # depth -> decoded result, oldest first
+        self._spilled = {}            # depth -> spill file path
+        self._anchors = {}            # depth -> (row, col) of its up stair
+        self._inflight = {}           # depth -> Future from prefetch
+        self._lock = threading.RLock()
+        self._executor = None
+        self.generated = 0
+        self.loads = 0
+
+    def level_seed(self, depth):
+        """Seed for one level; the same base seed always gives the same stack"""
+        return f"{self.base_seed}:{depth}"
+
+    def add(self, depth, result):
+        """Adopt an already generated level, e.g. level 1 from the DungeonPool
+
+        The result is stored through the codec, so the caller's generator
+        may overwrite its grid afterwards.
+        """
+        level = decode_result(encode_result(result, result.get('seed')))
+        with self._lock:
+            self._store(depth, level)
+        return level
+
+    def get(self, depth):
+        """Result for a level, generating it (and any missing levels above) as needed"""
+        if depth < 1:
+            raise ValueError(f"No dungeon level {depth}")
+        with self._lock:
+            level = self._cached(depth)
+            if level is not None:
+                return level
+            future = self._inflight.get(depth)
+        if future:
+            future.result()
+            with self._lock:
+                level = self._cached(depth)
+                if level is not None:
+                    return level
+        return self._generate(depth)
+
+    def prefetch(self, depth):
+        """Start generating a level in the background if it isn't ready yet"""
+        with self._lock:
+            if depth in self._cache or depth in self._spilled or depth in self._inflight:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dungeon-levels')
+            future = self._executor.submit(self._generate, depth)
+            self._inflight[depth] = future
+        future.add_done_callback(lambda _: self._finish_prefetch(depth))
+
+    def near_down_stair(self, depth, position, radius=6):
+        """Prefetch the next level when position (row, col) is near a down stair"""
+        with self._lock:
+            level = self._cache.get(depth)
+        if level is None:
+            return False
+        row, col = position
+        for stair in level['stairs']:
+            # Stair dicts carry the row in 'x' and the column in 'y'
+            if stair['key'] == 'down' and abs(stair['x'] - row) + abs(stair['y'] - col) <= radius:
+                self.prefetch(depth + 1)
+                return True
+        return False
+
+    def anchor(self, depth):
+        """(row, col) where a level's up stair was asked to go, if known"""
+        return self._anchors.get(depth)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'cached': sorted(self._cache),
+                'spilled': sorted(self._spilled),
+                'prefetching': sorted(self._inflight),
+                'generated': self.generated,
+                'loads': self.loads,
+                'cache_size': self.cache_size
+            }
+
+    def close(self):
+        """Stop prefetching and delete spill files"""
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            for path in self._spilled.values():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._spilled.clear()
+            if self._own_spill_dir:
+                try:
+                    os.rmdir(self._own_spill_dir)
+                except OSError:
+                    pass
+                self._own_spill_dir = None
+
+    # Internals
+
+    def _generate(self, depth):
+        options = dict(self.options, seed=self.level_seed(depth))
+        if depth > 1:
+            anchor = self._anchors.get(depth)
+            if anchor is None:
+                above = self.get(depth - 1)
+                anchor = self._down_stair(above, depth - 1)
+            options['stair_anchor'] = anchor
+            # The anchored up stair plus at least one way further down
+            options['add_stairs'] = max(2, options.get('add_stairs') or 0)
+
+        result = DungeonGeneratorNeo(options).create_dungeon()
+        with self._lock:
+            level = self._cached(depth)
+            if level is not None:
+                return level  # Another thread got there first
+            level = self._store(depth, decode_result(encode_result(result, options['seed'])))
+            self.generated += 1
+        return level
+
+    def _down_stair(self, level, depth):
+        for stair in level['stairs']:
+            if stair['key'] == 'down':
+                anchor = (stair['x'], stair['y'])
+                self._anchors[depth + 1] = anchor
+                return anchor
+        raise ValueError(f"Dungeon level {depth} has no down stair")
+
+    def _finish_prefetch(self, depth):
+        with self._lock:
+            future = self._inflight.pop(depth, None)
+        if future and not future.cancelled() and future.exception():
+            print(f"Prefetching dungeon level {depth} failed: {str(future.exception())}")
+
+    # Callers hold self._lock
+
+    def _cached(self, depth):
+        level = self._cache.get(depth)
+        if level is not None:
+            self._cache.move_to_end(depth)
+            return level
+        path = self._spilled.get(depth)
+        if path is None:
+            return None
+        with open(path, 'rb') as f:
+            level = decode_result(f.read())
+        self.loads += 1
+        return self._store(depth, level)
+
+    def _store(self, depth, level):
+        self._cache[depth] = level
+        self._cache.move_to_end(depth)
+        for stair in level['stairs']:
+            if stair['key'] == 'down':
+                self._anchors.setdefault(depth + 1, (stair['x'], stair['y']))
+                break
+        while len(self._cache) > self.cache_size:
+            old_depth, old_level = self._cache.popitem(last=False)
+            self._spill(old_depth, old_level)
+        return level
+
+    def _spill(self, depth, level):
+        if depth in self._spilled:
+            return  # Levels don't change once generated, the file is still good
+        if self._spill_dir is None:
+            self._own_spill_dir = self._own_spill_dir or tempfile.mkdtemp(prefix='dungeon-levels-')
+            directory = self._own_spill_dir
+        else:
+            os.makedirs(self._spill_dir, exist_ok=True)
+            directory = self._spill_dir
+        path = os.path.join(directory, f"level-{self.base_seed}-{depth}.dngr")
+        with open(path, 'wb') as f:
+            f.write(encode_result(level, level.get('seed')))
+        self._spilled[depth] = path
@@ -0,0 +1,159 @@
+import threading
+from collections import deque
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+
+class DungeonPool:
+    """Keeps pre-generated dungeons warm so requests never wait on the generator
+
+    Dungeons are pooled per (options, dungeon_type, theme). Each key owns one
+    generator, so a key hands out the same sequence of dungeons as a
+    DungeonSystem reusing its own generator would. A background worker keeps
+    up to `size` results ready per key and refills once a key drops below
+    `low_water`. Taking a ready dungeon is a dict lookup plus a deque pop.
+    """
+
+    # Options that describe the request rather than the layout
+    CONTEXT_KEYS = ('dungeon_type', 'theme', 'context')
+
+    def __init__(self, size=4, low_water=2, timer=None):
+        self.size = size
+        self.low_water = low_water
+        self.timer = timer  # Optional PhaseTimer shared by every generator
+        self.hits = 0
+        self.misses = 0
+
+        self._ready = {}          # key -> deque of generator results
+        self._generators = {}     # key -> DungeonGeneratorNeo
+        self._gen_locks = {}      # key -> lock held while that generator runs
+        self._pending = deque()   # keys waiting for a refill
+        self._cond = threading.Condition()
+        self._worker = None
+        self._closed = False
+
+    @classmethod
+    def make_key(cls, options, dungeon_type=None, theme=None):
+        """Hashable pool key for a set of generator options"""
+        layout = dict(options)
+        for name in cls.CONTEXT_KEYS:
+            layout.pop(name, None)
+        # The generator rounds the map size down to even on first use
+        for name in ('n_rows', 'n_cols'):
+            if name in layout:
+                layout[name] = (layout[name] // 2) * 2
+        return (tuple(sorted((k, repr(v)) for k, v in layout.items())), dungeon_type, theme)
+
+    def get(self, options, dungeon_type=None, theme=None, time_budget_ms=None):
+        """Return a generator result for these options, warm if possible
+
+        Ready results are always full quality; time_budget_ms only applies
+        when the pool is cold and the dungeon has to be generated inline.
+        """
+        key = self.make_key(options, dungeon_type, theme)
+
+        with self._cond:
+            ready = self._ready.get(key)
+            if ready:
+                self.hits += 1
+                result = ready.popleft()
+                self._schedule(key)
+                return result
+            self._register(key, options)
+            gen_lock = self._gen_locks[key]
+
+        # Miss: generate inline, unless the worker finishes one while we wait
+        with gen_lock:
+            with self._cond:
+                ready = self._ready[key]
+                if ready:
+                    self.hits += 1
+                    result = ready.popleft()
+                    self._schedule(key)
+                    return result
+                self.misses += 1
+            generator = self._generators[key]
+            generator.time_budget_ms = time_budget_ms
+            try:
+                result = generator.create_dungeon()
+            finally:
+                generator.time_budget_ms = None
+
+        with self._cond:
+            self._schedule(key)
+        return result
+
+    def warm(self, options, dungeon_type=None, theme=None):
+        """Start filling the pool for a key ahead of the first request"""
+        key = self.make_key(options, dungeon_type, theme)
+        with self._cond:
+            self._register(key, options)
+            self._schedule(key)
+
+    def stats(self):
+        with self._cond:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'keys': len(self._ready),
+                'ready': sum(len(ready) for ready in self._ready.values()),
+                'size': self.size,
+                'low_water': self.low_water
+            }
+
+    def close(self):
+        """Stop the background worker"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # Internals - callers hold self._cond
+
+    def _register(self, key, options):
+        if key in self._ready:
+            return
+        self._ready[key] = deque()
+        # No reuse_buffers here: queued results must keep their own grids.
+        # No time budget either: queued results are full quality.
+        options = dict(options)
+        options.pop('reuse_buffers', None)
+        options.pop('time_budget_ms', None)
+        self._generators[key] = DungeonGeneratorNeo(options)
+        self._generators[key].timer = self.timer
+        self._gen_locks[key] = threading.Lock()
+
+    def _schedule(self, key):
+        if len(self._ready[key]) >= max(1, self.low_water):
+            return
+        if key not in self._pending:
+            self._pending.append(key)
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='dungeon-pool', daemon=True)
+            self._worker.start()
+        self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                key = self._pending[0]
+                if len(self._ready[key]) >= self.size:
+                    self._pending.popleft()
+                    continue
+                gen_lock = self._gen_locks[key]
+
+            # Publish while still holding the generator lock so the queue stays
+            # in the same order the generator produced the dungeons
+            with gen_lock:
+                try:
+                    result = self._generators[key].create_dungeon()
+                except Exception as e:
+                    print(f"Dungeon pool generation failed: {str(e)}")
+                    with self._cond:
+                        self._pending.popleft()
+                    continue
+                with self._cond:
+                    self._ready[key].append(result)
@@ -1,4 +1,6 @@
 from .dungeon import DungeonSystem
+from .dungeon_pool import DungeonPool
+from dungeon_neo.profiling import PhaseTimer, RingBufferSink
 from dungeon_neo.movement_service import MovementService
 from dungeon_neo.party_system import PartySystem
 from collections import defaultdict
@@ -25,6 +27,9 @@ class GameState:
         self.campaign_theme = campaign_theme
 
         # Dungeon systems (lazy-loaded)
+        self.generation_timings = RingBufferSink()  # Recent per-phase timings for the API
+        self.generation_timer = PhaseTimer(sinks=[self.generation_timings])
+        self.dungeon_pool = DungeonPool(timer=self.generation_timer)  # Keeps generated dungeons warm for enter/reset
         self.dungeon = None
         self.dungeon_active = False
         self.movement = MovementService(self)
@@ -148,7 +153,7 @@ class GameState:
         
         # Initialize dungeon system
         if not self.dungeon:
-            self.dungeon = DungeonSystem()
+            self.dungeon = DungeonSystem(pool=self.dungeon_pool, timer=self.generation_timer)
         
         # Generate dungeon with parameters
         success = self.dungeon.generate(
@@ -160,6 +165,10 @@ class GameState:
         if not success:
             print("Dungeon generation failed")
             return False
+
+        # Pick up at the level the party last reached here
+        if location.dungeon_level > 1:
+            self.dungeon.enter_level(self.dungeon.level_stack(), location.dungeon_level)
             
         # Update state
         self.dungeon_active = True
@@ -252,6 +261,16 @@ class GameState:
             return "Not in dungeon"
         return self.dungeon.get_current_room_description()
 
+    def change_dungeon_level(self, delta):
+        """Take the stairs the party stands on one level down (delta 1) or up (-1)"""
+        if not self.dungeon_active or not self.dungeon.take_stairs(delta):
+            return False
+        depth = self.dungeon.depth
+        location = self.world_map.get_location(self.session.current_dungeon_id)
+        if location:
+            location.dungeon_level = depth
+        return True
+
     def reset_dungeon(self):
         """Regenerate the current dungeon"""
         if not self.dungeon_active:
@@ -0,0 +1,245 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+from dungeon_neo.result_codec import encode_result, decode_result
+from dungeon_neo.constants import CELL_FLAGS
+
+ROOM_ID = CELL_FLAGS['ROOM_ID']
+LABEL = CELL_FLAGS['LABEL']
+MAX_ROOM_ID = ROOM_ID >> 6
+
+# Generator maps need at least this many cells between walls
+MIN_SPAN = 10
+
+
+class RegionGenerator:
+    """Generate one big dungeon as a grid of regions built in parallel
+
+    The map is cut into `regions` rectangles (as square a grid as the count
+    allows, e.g. 4 -> 2 x 2, 6 -> 2 x 3). Each region is an ordinary
+    generator map with its own seed derived from (seed, region index), so
+    regions don't depend on each other and can be built in any order, in
+    any process. Neighbouring regions share their border wall, and every
+    shared wall gets one connector cell picked from (seed, wall) that both
+    sides open (the generator's 'edge_connectors' option), so the passages
+    line up and the regions join into one dungeon.
+
+    stitch() lays the regions into one grid, renumbers rooms so ids stay
+    unique (room ids are encoded in the cells too) and relabels every room
+    with its new id. The output depends only on the options, the
+    seed and the region count - never on the number of workers.
+
+    Stairs all go in one region: the one holding 'stair_anchor' if set,
+    otherwise the first. Masked layouts (Box, Round...) mask each region on
+    its own.
+    """
+
+    def __init__(self, options, regions=None, workers=1):
+        self.options = dict(options)
+        for name in ('reuse_buffers', 'time_budget_ms', 'timer', 'regions', 'region_workers'):
+            self.options.pop(name, None)
+        seed = self.options.get('seed')
+        self.seed = seed if seed not in (None, 'None') else random.randint(1, 100000)
+        self.options['seed'] = self.seed
+        # Like the generator, work on an even number of cells between the outer walls
+        self.options['n_rows'] = self.options['n_rows'] // 2 * 2
+        self.options['n_cols'] = self.options['n_cols'] // 2 * 2
+        self.regions = regions or options.get('regions') or 1
+        self.workers = workers
+        self.row_spans = self.col_spans = None
+        self.row_starts = self.col_starts = None
+        self._split()
+
+    def region_seed(self, index):
+        """Seed for one region; the same seed and region count always give the same map"""
+        return f"{self.seed}:region:{index}"
+
+    def generate(self):
+        """Generate every region and stitch them into one generator_result"""
+        start = time.perf_counter()
+        specs = self.region_options()
+        if not self.workers or self.workers <= 1 or len(specs) <= 1:
+            outputs = [_generate_region(options) for options in specs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                outputs = list(pool.map(_generate_region, specs))
+        generated = time.perf_counter()
+
+        parts = [decode_result(data) for data, _ in outputs]
+        result = self.stitch(parts)
+        for info, (_, ms) in zip(result['regions'], outputs):
+            info['ms'] = ms
+        result['timings'] = {
+            'generate_ms': (generated - start) * 1000,
+            'stitch_ms': (time.perf_counter() - generated) * 1000,
+            'total_ms': (time.perf_counter() - start) * 1000,
+            'workers': self.workers
+        }
+        return result
+
+    def region_options(self):
+        """Generator options for every region, in region index order"""
+        n_rows, n_cols = len(self.row_spans), len(self.col_spans)
+        stairs_at = self._stair_region()
+        specs = []
+        for index in range(n_rows * n_cols):
+            ri, ci = divmod(index, n_cols)
+            r0, c0 = self.row_starts[ri], self.col_starts[ci]
+            height, width = self.row_spans[ri], self.col_spans[ci]
+            connectors = []
+            if ci > 0:
+                connectors.append((self._wall_offset('v', ri, ci), 0))
+            if ci < n_cols - 1:
+                connectors.append((self._wall_offset('v', ri, ci + 1), width))
+            if ri > 0:
+                connectors.append((0, self._wall_offset('h', ri, ci)))
+            if ri < n_rows - 1:
+                connectors.append((height, self._wall_offset('h', ri + 1, ci)))
+            # Connectors asked for on the outside of the whole map
+            for r, c in self.options.get('edge_connectors') or []:
+                if r0 <= r <= r0 + height and c0 <= c <= c0 + width:
+                    connectors.append((r - r0, c - c0))
+
+            options = dict(self.options, seed=self.region_seed(index),
+                           n_rows=height, n_cols=width, edge_connectors=connectors)
+            options.pop('stair_anchor', None)
+            if index == stairs_at:
+                anchor = self.options.get('stair_anchor')
+                if anchor:
+                    options['stair_anchor'] = (anchor[0] - r0, anchor[1] - c0)
+            else:
+                options['add_stairs'] = 0
+            specs.append(options)
+        return specs
+
+    def stitch(self, parts):
+        """Lay decoded region results (in region index order) into one result"""
+        n_cols = len(self.col_spans)
+        width = self.options['n_cols'] + 1
+        grid = [[0] * width for _ in range(self.options['n_rows'] + 1)]
+        rooms, doors, stairs, regions = [], [], [], []
+        offset = 0
+        for index, part in enumerate(parts):
+            ri, ci = divmod(index, n_cols)
+            r0, c0 = self.row_starts[ri], self.col_starts[ci]
+            if offset + len(part['rooms']) > MAX_ROOM_ID:
+                raise ValueError(f"Stitched dungeon has more than {MAX_ROOM_ID} rooms - use fewer regions or bigger rooms")
+            shift = offset << 6
+
+            for r, source in enumerate(part['grid']):
+                row = grid[r0 + r]
+                # Labels spell the region's own room ids; they are redrawn below
+                values = [(value + shift if value & ROOM_ID else value) & ~LABEL for value in source]
+                if r == 0 and r0:
+                    # Shared wall with the region above
+                    for k, value in enumerate(values):
+                        row[c0 + k] |= value
+                else:
+                    # The first cell is the wall shared with the region to the west
+                    left = row[c0]
+                    row[c0:c0 + len(values)] = values
+                    row[c0] |= left
+
+            for room in part['rooms']:
+                room = dict(room, id=room['id'] + offset)
+                room['north'] += r0
+                room['south'] += r0
+                room['west'] += c0
+                room['east'] += c0
+                room['row'], room['col'] = room['north'], room['west']
+                rooms.append(room)
+            for door in part['doors']:
+                door = dict(door, x=door['x'] + c0, y=door['y'] + r0)
+                if door.get('out_id') is not None:
+                    door['out_id'] += offset
+                doors.append(door)
+            for stair in part['stairs']:
+                # Stair dicts carry the row in 'x' and the column in 'y'
+                stairs.append(dict(stair, x=stair['x'] + r0, y=stair['y'] + c0))
+            regions.append({
+                'index': index, 'seed': part['seed'],
+                'row': r0, 'col': c0, 'n_rows': part['n_rows'], 'n_cols': part['n_cols'],
+                'rooms': len(part['rooms'])
+            })
+            offset += len(part['rooms'])
+
+        _label_rooms(grid, rooms)
+        return {
+            'seed': self.seed,
+            'grid': grid,
+            'stairs': stairs,
+            'doors': doors,
+            'rooms': rooms,
+            'degraded': [],
+            'regions': regions,
+            'n_rows': self.options['n_rows'],
+            'n_cols': self.options['n_cols']
+        }
+
+    # Internals
+
+    def _split(self):
+        """Pick the region grid and each region's span"""
+        count = self.regions
+        if count < 1:
+            raise ValueError(f"regions must be at least 1, got {count}")
+        down = max(d for d in range(1, int(count ** 0.5) + 1) if count % d == 0)
+        across = count // down
+        if self.options['n_rows'] < self.options['n_cols']:
+            down, across = min(down, across), max(down, across)
+        else:
+            down, across = max(down, across), min(down, across)
+        self.row_spans = _spans(self.options['n_rows'], down)
+        self.col_spans = _spans(self.options['n_cols'], across)
+        self.row_starts = _starts(self.row_spans)
+        self.col_starts = _starts(self.col_spans)
+
+    def _wall_offset(self, kind, ri, ci):
+        """Odd offset along a shared wall; kind 'v' is the west wall of region (ri, ci), 'h' its north wall"""
+        span = self.row_spans[ri] if kind == 'v' else self.col_spans[ci]
+        return random.Random(f"{self.seed}:{kind}:{ri}:{ci}").randrange(1, span, 2)
+
+    def _stair_region(self):
+        anchor = self.options.get('stair_anchor')
+        if not anchor:
+            return 0
+        r, c = anchor
+        ri = max(k for k, start in enumerate(self.row_starts) if start <= r)
+        ci = max(k for k, start in enumerate(self.col_starts) if start <= c)
+        return ri * len(self.col_spans) + ci
+
+
+def _label_rooms(grid, rooms):
+    """Write each room's id into its middle row, as the generator's label_rooms does"""
+    for room in rooms:
+        label = str(room['id'])
+        r = (room['north'] + room['south']) // 2
+        c = (room['west'] + room['east'] - len(label)) // 2 + 1
+        for i, char in enumerate(label):
+            grid[r][c + i] |= ord(char) << 24
+
+
+def _spans(cells, parts):
+    """Split an even cell count into even spans as equal as possible"""
+    base, extra = divmod(cells // 2, parts)
+    spans = [2 * (base + (k < extra)) for k in range(parts)]
+    if spans[-1] < MIN_SPAN:
+        raise ValueError(f"{cells} cells can't be split into {parts} regions of at least {MIN_SPAN}")
+    return spans
+
+
+def _starts(spans):
+    # Neighbours share a wall, so each region starts on the last one's far wall
+    starts, at = [], 0
+    for span in spans:
+        starts.append(at)
+        at += span
+    return starts
+
+
+def _generate_region(options):
+    """Worker entry point: one region, encoded, plus how long it took"""
+    start = time.perf_counter()
+    result = DungeonGeneratorNeo(options).create_dungeon()
+    return encode_result(result, options['seed']), (time.perf_counter() - start) * 1000
@@ -0,0 +1,280 @@
+import itertools
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+from dungeon_neo.profiling import PhaseTimer
+from dungeon_neo.room_graph import RoomGraph
+from dungeon_neo.constants import CELL_FLAGS
+
+# Cells a party can walk through when measuring stair distance
+WALKABLE = CELL_FLAGS['ROOM'] | CELL_FLAGS['CORRIDOR'] | CELL_FLAGS['ENTRANCE'] | CELL_FLAGS['DOORSPACE']
+
+CRITERIA = ('min_rooms', 'max_rooms', 'min_stair_distance', 'all_rooms_reachable', 'min_secret_doors')
+
+# Set in each worker process by _init_worker
+_worker_cancel = None
+
+
+class Rejected(Exception):
+    """Raised from a phase hook once a candidate can no longer match"""
+
+    def __init__(self, phase, reason):
+        super().__init__(f"{phase}: {reason}")
+        self.phase = phase
+        self.reason = reason
+
+
+class SeedSearch:
+    """Look for seeds whose dungeons meet a set of quality targets
+
+    criteria is a dict using any of:
+
+        min_rooms / max_rooms    room count
+        min_stair_distance       walking steps between the two closest stairs
+        all_rooms_reachable      every room joined to the others through doors
+        min_secret_doors         secret doors in the finished dungeon
+
+    Each candidate is a fresh generator seeded from its own seed, like
+    DungeonSystem.generate_many, so DungeonGeneratorNeo(dict(options,
+    seed=seed)) rebuilds a match exactly. A PhaseTimer hook checks what is
+    already known after each phase and abandons the candidate as soon as it
+    cannot match - room counts after emplace_rooms, secret doors after
+    connect_rooms (cleanup only ever removes doors) - so most rejects never
+    pay for stairs and cleanup.
+
+    With workers > 1 the candidates run in a process pool. Once `matches`
+    seeds are found, or cancel() is called, queued candidates are dropped and
+    running ones stop at their next phase. Which seeds are found first then
+    depends on scheduling; the matches are still reported in seed order.
+    """
+
+    def __init__(self, options, criteria, workers=1):
+        unknown = set(criteria) - set(CRITERIA)
+        if unknown:
+            raise ValueError(f"Unknown seed search criteria: {', '.join(sorted(unknown))}")
+        if criteria.get('min_stair_distance') and not options.get('add_stairs'):
+            raise ValueError("min_stair_distance needs add_stairs")
+        self.options = dict(options)
+        self.options.pop('reuse_buffers', None)
+        self.criteria = dict(criteria)
+        self.workers = workers
+        self._cancel = None
+
+    def search(self, seeds=None, matches=1, max_candidates=1000):
+        """Try seeds (default 1, 2, 3...) until `matches` are found
+
+        Returns {'matches': [{'seed', 'stats'}], 'tried', 'rejected' (count
+        per phase that ruled candidates out), 'cancelled', 'elapsed_ms'}.
+        """
+        seeds = itertools.islice(itertools.count(1) if seeds is None else seeds, max_candidates)
+        start = time.perf_counter()
+        if not self.workers or self.workers <= 1:
+            self._cancel = threading.Event()
+            outcomes = self._search_serial(seeds, matches)
+        else:
+            self._cancel = multiprocessing.Event()
+            outcomes = self._search_parallel(seeds, matches)
+
+        found = [outcome for outcome in outcomes if outcome['matched']]
+        rejected = {}
+        for outcome in outcomes:
+            if not outcome['matched'] and outcome['phase'] != 'cancelled':
+                rejected[outcome['phase']] = rejected.get(outcome['phase'], 0) + 1
+        return {
+            'matches': [{'seed': outcome['seed'], 'stats': outcome['stats']}
+                        for outcome in sorted(found, key=lambda outcome: outcome['order'])][:matches],
+            'tried': len(outcomes),
+            'rejected': rejected,
+            'cancelled': self._cancel.is_set() and len(found) < matches,
+            'elapsed_ms': (time.perf_counter() - start) * 1000
+        }
+
+    def cancel(self):
+        """Stop a running search from another thread"""
+        if self._cancel is not None:
+            self._cancel.set()
+
+    def _search_serial(self, seeds, matches):
+        outcomes = []
+        found = 0
+        for order, seed in enumerate(seeds):
+            if self._cancel.is_set():
+                break
+            outcome = evaluate_seed(self.options, seed, self.criteria, self._cancel)
+            outcome['order'] = order
+            outcomes.append(outcome)
+            found += outcome['matched']
+            if found >= matches:
+                break
+        return outcomes
+
+    def _search_parallel(self, seeds, matches):
+        outcomes = []
+        found = 0
+        seeds = enumerate(seeds)
+        pending = {}
+        # Keep a couple of candidates queued per worker rather than
+        # submitting everything up front, so cancelling leaves little to drop
+        window = self.workers * 2
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self._cancel,)) as pool:
+            while True:
+                while len(pending) < window and not self._cancel.is_set():
+                    try:
+                        order, seed = next(seeds)
+                    except StopIteration:
+                        break
+                    pending[pool.submit(_evaluate_in_worker, self.options, seed, self.criteria)] = order
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    order = pending.pop(future)
+                    if future.cancelled():
+                        continue
+                    outcome = future.result()
+                    outcome['order'] = order
+                    outcomes.append(outcome)
+                    found += outcome['matched']
+                if found >= matches:
+                    self._cancel.set()
+                if self._cancel.is_set():
+                    for future in pending:
+                        future.cancel()
+        return outcomes
+
+
+def evaluate_seed(options, seed, criteria, cancel=None):
+    """Generate one candidate and check it against criteria
+
+    Returns {'seed', 'matched', 'phase', 'reason', 'stats'}; 'phase' is
+    where a rejected candidate was ruled out.
+    """
+    generator = DungeonGeneratorNeo(dict(options, seed=seed))
+    checks = _phase_checks(generator, criteria)
+
+    def on_phase(name, ms):
+        if cancel is not None and cancel.is_set():
+            raise Rejected('cancelled', 'search finished')
+        check = checks.get(name)
+        if check:
+            check()
+
+    generator.timer = PhaseTimer(on_phase=on_phase)
+    try:
+        result = generator.create_dungeon()
+    except Rejected as e:
+        return {'seed': seed, 'matched': False, 'phase': e.phase, 'reason': e.reason, 'stats': None}
+
+    stats = dungeon_stats(result, needs_distance='min_stair_distance' in criteria)
+    stats['ms'] = result['timings']['total_ms']
+    reason = _final_check(stats, criteria)
+    return {'seed': seed, 'matched': reason is None, 'phase': None if reason is None else 'final',
+            'reason': reason, 'stats': stats}
+
+
+def dungeon_stats(result, needs_distance=True):
+    """The numbers the search criteria are checked against"""
+    graph = RoomGraph.build(result['grid'], result['doors'], result['rooms'], result['stairs'])
+    room_nodes = {f"room:{room['id']}" for room in result['rooms']}
+    # Rooms outside the component holding the most rooms count as unreachable
+    groups = graph.components()
+    main = max(groups, key=lambda group: len(group & room_nodes)) if groups else set()
+    stats = {
+        'rooms': len(result['rooms']),
+        'doors': len(result['doors']),
+        'secret_doors': sum(1 for door in result['doors'] if door['key'] == 'secret'),
+        'stairs': len(result['stairs']),
+        'unreachable_rooms': len(room_nodes - main),
+        'corridors': graph.n_corridors
+    }
+    if needs_distance:
+        stats['stair_distance'] = stair_distance(result['grid'], result['stairs'])
+    return stats
+
+
+def stair_distance(grid, stairs):
+    """Walking steps between the two closest stairs, None if fewer than two
+    stairs are connected"""
+    # Stair dicts carry the row in 'x' and the column in 'y'
+    cells = [(stair['x'], stair['y']) for stair in stairs]
+    height, width = len(grid), len(grid[0]) if grid else 0
+    best = None
+    for i, (r, c) in enumerate(cells[:-1]):
+        targets = set(cells[i + 1:])
+        seen = {(r, c)}
+        frontier = deque([(r, c, 0)])
+        while frontier and targets:
+            cr, cc, steps = frontier.popleft()
+            if best is not None and steps >= best:
+                break
+            if (cr, cc) in targets:
+                best = steps
+                break
+            for nr, nc in ((cr - 1, cc), (cr + 1, cc), (cr, cc - 1), (cr, cc + 1)):
+                if (0 <= nr < height and 0 <= nc < width and (nr, nc) not in seen
+                        and grid[nr][nc] & WALKABLE):
+                    seen.add((nr, nc))
+                    frontier.append((nr, nc, steps + 1))
+    return best
+
+
+def _phase_checks(generator, criteria):
+    """Checks to run after the phases that already settle a criterion"""
+    checks = {}
+    min_rooms, max_rooms = criteria.get('min_rooms'), criteria.get('max_rooms')
+    if min_rooms is not None or max_rooms is not None:
+        def check_rooms():
+            # No later phase adds or removes rooms
+            n_rooms = len(generator.room)
+            if min_rooms is not None and n_rooms < min_rooms:
+                raise Rejected('emplace_rooms', f"{n_rooms} rooms < {min_rooms}")
+            if max_rooms is not None and n_rooms > max_rooms:
+                raise Rejected('emplace_rooms', f"{n_rooms} rooms > {max_rooms}")
+        checks['emplace_rooms'] = check_rooms
+
+    min_secret = criteria.get('min_secret_doors')
+    if min_secret:
+        def check_secret_doors():
+            # connect_rooms is the last phase to add doors (its links can be
+            # secret); cleanup can drop opened doors but never adds one
+            secret = sum(1 for door in generator.door_index.opened.values() if door['key'] == 'secret')
+            if secret < min_secret:
+                raise Rejected('connect_rooms', f"{secret} secret doors opened < {min_secret}")
+        checks['connect_rooms'] = check_secret_doors
+
+    if criteria.get('min_stair_distance'):
+        def check_stairs():
+            if len(generator.stairList) < 2:
+                raise Rejected('emplace_stairs', f"{len(generator.stairList)} stairs placed")
+        checks['emplace_stairs'] = check_stairs
+    return checks
+
+
+def _final_check(stats, criteria):
+    """Reason the finished dungeon fails criteria, or None"""
+    if criteria.get('min_secret_doors') and stats['secret_doors'] < criteria['min_secret_doors']:
+        return f"{stats['secret_doors']} secret doors < {criteria['min_secret_doors']}"
+    if criteria.get('all_rooms_reachable') and stats['unreachable_rooms']:
+        return f"{stats['unreachable_rooms']} rooms unreachable"
+    min_distance = criteria.get('min_stair_distance')
+    if min_distance:
+        distance = stats['stair_distance']
+        if distance is None:
+            return "stairs not connected"
+        if distance < min_distance:
+            return f"stairs {distance} steps apart < {min_distance}"
+    return None
+
+
+def _init_worker(cancel):
+    global _worker_cancel
+    _worker_cancel = cancel
+
+
+def _evaluate_in_worker(options, seed, criteria):
+    """Worker entry point for SeedSearch._search_parallel"""
+    return evaluate_seed(options, seed, criteria, _worker_cancel)
@@ -148,8 +148,8 @@ class DungeonAI:
         description += f"- Is stairs: {cell.is_stairs}\n"
         description += f"- Is secret: {cell.is_secret}\n"
         description += f"- Description: {cell.description or 'None'}\n"
-        description += f"- Entities: {len(cell.entities)}\n"
-        description += f"- Overlays: {len(cell.overlays)}"
+        description += f"- Entities: {len(self.state.entities.at(x, y))}\n"
+        description += f"- Overlays: {len(self.state.overlays.at(x, y))}"
         
         return {
             "success": True,
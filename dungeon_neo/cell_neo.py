@@ -1,4 +1,5 @@
 from dungeon_neo.constants import CELL_FLAGS
+from dungeon_neo.passability import cell_passable
 class DungeonCellNeo:
     NOTHING = CELL_FLAGS['NOTHING']
     BLOCKED = CELL_FLAGS['BLOCKED']
@@ -25,21 +26,38 @@ class DungeonCellNeo:
     BLOCK_CORR = CELL_FLAGS['BLOCK_CORR']
     BLOCK_DOOR = CELL_FLAGS['BLOCK_DOOR']
 
+    # Per-cell collections. Most cells never hold anything, so they stay None
+    # until first written (see _LazyList / _LazyDict below)
+    COLLECTIONS = ('features', 'objects', 'npcs', 'items', 'modifications',
+                   'temporary_effects', 'entities', 'overlays')
+
+    __slots__ = ('base_type', 'x', 'y', 'description', 'discovered', '_state', '_properties') + \
+        tuple('_' + name for name in COLLECTIONS)
+
     def __init__(self, base_type, x, y):
         # Convert to integer with comprehensive fallback
         self.base_type = self._ensure_int(base_type)
         self.x = x
         self.y = y
-        self.features = []
-        self.objects = []
-        self.npcs = []
-        self.items = []
-        self.modifications = []
-        self.temporary_effects = []
-        self.entities = []       # List of Entity objects
-        self.overlays = []       # List of Overlay objects
+        self._features = None
+        self._objects = None
+        self._npcs = None
+        self._items = None
+        self._modifications = None
+        self._temporary_effects = None
+        self._entities = None    # List of Entity objects
+        self._overlays = None    # List of Overlay objects
         self.description = ""    # Text description of the cell
-        self.properties = {}
+        self._properties = None
+
+    @property
+    def properties(self):
+        properties = getattr(self, '_properties', None)
+        return properties if properties is not None else _LazyDict(self, '_properties')
+
+    @properties.setter
+    def properties(self, value):
+        self._properties = value
 
     @property
     def position(self):
@@ -76,15 +94,7 @@ class DungeonCellNeo:
             return self.NOTHING
 
     def is_passable(self, secret_revealed=False):
-        if self.is_blocked: 
-            return False
-        if self.is_secret and not secret_revealed:
-            return False
-        if self.is_perimeter and not self.is_door:
-            return False
-        if self.is_door and not self.is_arch:
-            return False
-        return True
+        return cell_passable(self.base_type, secret_revealed)
         
     def reveal_secret(self):
         if self.base_type == self.SECRET:
@@ -164,4 +174,104 @@ class DungeonCellNeo:
     
     @property
     def has_label(self):
-        return self._safe_property_check(self.LABEL)
\ No newline at end of file
+        return self._safe_property_check(self.LABEL)
+
+
+def _collection(slot):
+    def get(self):
+        items = getattr(self, slot, None)
+        return items if items is not None else _LazyList(self, slot)
+
+    def set(self, value):
+        setattr(self, slot, value)
+    return property(get, set)
+
+
+for _name in DungeonCellNeo.COLLECTIONS:
+    setattr(DungeonCellNeo, _name, _collection('_' + _name))
+
+
+class _LazyList(list):
+    """Empty stand-in for a cell collection that doesn't exist yet
+
+    Reading it costs nothing lasting; the first write stores it on the cell,
+    so cell.entities.append(...) keeps working without every cell owning a
+    list up front. Every list method that can add items attaches, including
+    the in-place operators used on a held reference (items += ..., items[:] = ...).
+    """
+
+    __slots__ = ('_cell', '_slot')
+
+    def __init__(self, cell, slot):
+        super().__init__()
+        self._cell = cell
+        self._slot = slot
+
+    def _attach(self):
+        if getattr(self._cell, self._slot, None) is None:
+            setattr(self._cell, self._slot, self)
+
+    def append(self, item):
+        self._attach()
+        super().append(item)
+
+    def extend(self, items):
+        self._attach()
+        super().extend(items)
+
+    def insert(self, index, item):
+        self._attach()
+        super().insert(index, item)
+
+    def __setitem__(self, index, value):
+        self._attach()
+        super().__setitem__(index, value)
+
+    def __iadd__(self, items):
+        self._attach()
+        return super().__iadd__(items)
+
+    def __imul__(self, count):
+        self._attach()
+        return super().__imul__(count)
+
+    def __reduce_ex__(self, protocol):
+        # Copies and pickles come out as plain lists
+        return (list, (list(self),))
+
+
+class _LazyDict(dict):
+    """Empty stand-in for cell.properties, stored on the cell at first write
+
+    Every dict method that can add keys attaches, |= included.
+    """
+
+    __slots__ = ('_cell', '_slot')
+
+    def __init__(self, cell, slot):
+        super().__init__()
+        self._cell = cell
+        self._slot = slot
+
+    def _attach(self):
+        if getattr(self._cell, self._slot, None) is None:
+            setattr(self._cell, self._slot, self)
+
+    def __setitem__(self, key, value):
+        self._attach()
+        super().__setitem__(key, value)
+
+    def update(self, *args, **kwargs):
+        self._attach()
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self._attach()
+        return super().setdefault(key, default)
+
+    def __ior__(self, other):
+        self._attach()
+        return super().__ior__(other)
+
+    def __reduce_ex__(self, protocol):
+        return (dict, (dict(self),))
@@ -0,0 +1,222 @@
+import random
+from collections import OrderedDict
+from dungeon_neo.grid_system import GridSystem
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+from dungeon_neo.cell_neo import DungeonCellNeo
+
+
+class ChunkedGridSystem(GridSystem):
+    """Endless grid made of generated chunks, for the endless dungeon mode
+
+    The world runs on without limit in every direction, negative
+    coordinates included. It is cut into chunk_size x chunk_size squares,
+    chunk (cx, cy) covering x from cx * chunk_size; each chunk is an
+    ordinary generator map whose seed comes from (world_seed, chunk x, chunk
+    y), so a chunk comes out the same every time it is generated.
+
+    Neighbouring chunks meet wall to wall. Every shared edge gets one
+    connector cell, picked from (world_seed, edge) so both sides agree on
+    it, and both chunks open a corridor through their border there (the
+    generator's 'edge_connectors' option) - the passages line up and the
+    chunks join into one dungeon.
+
+    get_cell() generates chunks as they are touched, so callers never see
+    chunk boundaries. focus() loads every chunk within load_radius cells of
+    the party ahead of time. Drawing code should use peek_cell() and
+    view_bounds() instead, which only read loaded chunks and never
+    generate. Only max_chunks chunks are kept; the least recently used one
+    is dropped when a new one comes in, and anything listening on
+    evict_listeners is told so it can drop its own per-cell data. A dropped
+    chunk is simply generated again when it is next touched, so changes
+    made to its cells are not kept.
+    """
+
+    CHUNK_OPTIONS = {
+        'dungeon_layout': 'None',
+        'room_min': 3,
+        'room_max': 9,
+        'room_layout': 'Scattered',
+        'corridor_layout': 'Bent',
+        'remove_deadends': 50,
+        'add_stairs': 0
+    }
+
+    def __init__(self, options=None, world_seed=None, chunk_size=41, max_chunks=16, load_radius=None):
+        # Generator maps are (even + 1) cells across, so chunks have odd sizes
+        if chunk_size % 2 == 0 or chunk_size < 11:
+            raise ValueError(f"chunk_size must be odd and at least 11, got {chunk_size}")
+        self.chunk_size = chunk_size
+        self.options = dict(self.CHUNK_OPTIONS)
+        self.options.update(options or {})
+        for name in ('reuse_buffers', 'time_budget_ms', 'stair_anchor'):
+            self.options.pop(name, None)
+        self.options['n_rows'] = self.options['n_cols'] = chunk_size - 1
+        self.world_seed = world_seed if world_seed is not None else random.randint(1, 100000)
+        self.max_chunks = max(4, max_chunks)
+        self.load_radius = chunk_size // 2 if load_radius is None else load_radius
+
+        self._chunks = OrderedDict()   # (cx, cy) -> rows of cells, oldest first
+        self.door_orientations = {}    # (x, y) -> orientation, loaded chunks only
+        self.stair_orientations = {}   # (row, col) -> orientation, loaded chunks only
+        self.evict_listeners = []      # callables(x0, y0, x1, y1) for dropped chunks
+        self.generated = 0
+        self.evicted = 0
+
+    # GridSystem interface
+
+    @property
+    def width(self):
+        """Width of the box around the loaded chunks (see loaded_bounds)"""
+        x0, _, x1, _ = self.loaded_bounds()
+        return x1 - x0
+
+    @property
+    def height(self):
+        _, y0, _, y1 = self.loaded_bounds()
+        return y1 - y0
+
+    def get_cell(self, x: int, y: int):
+        """Get cell at world coordinates (x,y), generating its chunk if needed"""
+        size = self.chunk_size
+        cx, cy = x // size, y // size
+        return self.chunk(cx, cy)[y - cy * size][x - cx * size]
+
+    def set_cell(self, x: int, y: int, value):
+        size = self.chunk_size
+        cx, cy = x // size, y // size
+        self.chunk(cx, cy)[y - cy * size][x - cx * size] = value
+
+    def is_valid_position(self, x: int, y: int) -> bool:
+        return True
+
+    def peek_cell(self, x: int, y: int):
+        """Cell at (x, y) if its chunk is loaded, else None; never generates"""
+        size = self.chunk_size
+        cx, cy = x // size, y // size
+        rows = self._chunks.get((cx, cy))
+        return rows[y - cy * size][x - cx * size] if rows is not None else None
+
+    def loaded_bounds(self):
+        """(x0, y0, x1, y1) box around the loaded chunks, end exclusive"""
+        if not self._chunks:
+            return 0, 0, 0, 0
+        size = self.chunk_size
+        xs = [cx for cx, _ in self._chunks]
+        ys = [cy for _, cy in self._chunks]
+        return min(xs) * size, min(ys) * size, (max(xs) + 1) * size, (max(ys) + 1) * size
+
+    def view_bounds(self, x, y, radius=None):
+        """(x0, y0, x1, y1) window radius cells around (x, y), cut to the loaded chunks"""
+        radius = self.chunk_size if radius is None else radius
+        lx0, ly0, lx1, ly1 = self.loaded_bounds()
+        x0, y0 = max(x - radius, lx0), max(y - radius, ly0)
+        return x0, y0, max(x0, min(x + radius + 1, lx1)), max(y0, min(y + radius + 1, ly1))
+
+    # Chunks
+
+    def chunk_seed(self, cx, cy):
+        return f"{self.world_seed}:{cx}:{cy}"
+
+    def chunk(self, cx, cy):
+        """Rows of cells for one chunk, generated on first use"""
+        rows = self._chunks.get((cx, cy))
+        if rows is not None:
+            self._chunks.move_to_end((cx, cy))
+            return rows
+        rows = self._generate(cx, cy)
+        self._chunks[(cx, cy)] = rows
+        while len(self._chunks) > self.max_chunks:
+            self._evict(*self._chunks.popitem(last=False)[0])
+        return rows
+
+    def is_loaded(self, cx, cy):
+        return (cx, cy) in self._chunks
+
+    def focus(self, x, y):
+        """Load the chunks within load_radius cells of (x, y); returns the new ones"""
+        size, radius = self.chunk_size, self.load_radius
+        loaded = []
+        for cy in range((y - radius) // size, (y + radius) // size + 1):
+            for cx in range((x - radius) // size, (x + radius) // size + 1):
+                if (cx, cy) not in self._chunks:
+                    loaded.append((cx, cy))
+                self.chunk(cx, cy)
+        # Touch the party's own chunk last so it is never the oldest
+        self.chunk(x // size, y // size)
+        return loaded
+
+    def stats(self):
+        return {
+            'loaded': len(self._chunks),
+            'max_chunks': self.max_chunks,
+            'chunk_size': self.chunk_size,
+            'generated': self.generated,
+            'evicted': self.evicted
+        }
+
+    def find_open_cell(self, cx=0, cy=0):
+        """A room or corridor cell in a chunk, as close to its middle as possible"""
+        size = self.chunk_size
+        rows = self.chunk(cx, cy)
+        middle = size // 2
+        best = None
+        for r, row in enumerate(rows):
+            for c, cell in enumerate(row):
+                if (cell.is_room or cell.is_corridor) and not cell.is_blocked:
+                    distance = abs(r - middle) + abs(c - middle)
+                    if best is None or distance < best[0]:
+                        best = (distance, cx * size + c, cy * size + r)
+        return (best[1], best[2]) if best else (cx * size + middle, cy * size + middle)
+
+    # Internals
+
+    def _edge_offset(self, kind, cx, cy):
+        """Odd offset along an edge; kind 'v' is the west edge of (cx, cy), 'h' its north edge"""
+        return random.Random(f"{self.world_seed}:{kind}:{cx}:{cy}").randrange(1, self.chunk_size - 1, 2)
+
+    def _connectors(self, cx, cy):
+        last = self.chunk_size - 1
+        return [
+            (self._edge_offset('v', cx + 1, cy), last),  # east
+            (last, self._edge_offset('h', cx, cy + 1)),  # south
+            (self._edge_offset('v', cx, cy), 0),         # west
+            (0, self._edge_offset('h', cx, cy))          # north
+        ]
+
+    def _generate(self, cx, cy):
+        options = dict(self.options, seed=self.chunk_seed(cx, cy),
+                       edge_connectors=self._connectors(cx, cy))
+        result = DungeonGeneratorNeo(options).create_dungeon()
+        self.generated += 1
+
+        size = self.chunk_size
+        x0, y0 = cx * size, cy * size
+        orientations = {(door['x'], door['y']): door.get('orientation', 'horizontal')
+                        for door in result['doors']}
+        rows = []
+        for r, source in enumerate(result['grid']):
+            row = []
+            for c, value in enumerate(source):
+                cell = DungeonCellNeo(value, x0 + c, y0 + r)
+                orientation = orientations.get((c, r))
+                if orientation and cell.is_door:
+                    cell.properties['orientation'] = orientation
+                    self.door_orientations[(x0 + c, y0 + r)] = orientation
+                row.append(cell)
+            rows.append(row)
+        for stair in result['stairs']:
+            # Stair dicts carry the row in 'x' and the column in 'y'
+            self.stair_orientations[(y0 + stair['x'], x0 + stair['y'])] = stair.get('orientation', 'horizontal')
+        return rows
+
+    def _evict(self, cx, cy):
+        size = self.chunk_size
+        x0, y0 = cx * size, cy * size
+        x1, y1 = x0 + size, y0 + size
+        for x, y in [key for key in self.door_orientations if x0 <= key[0] < x1 and y0 <= key[1] < y1]:
+            del self.door_orientations[(x, y)]
+        for r, c in [key for key in self.stair_orientations if y0 <= key[0] < y1 and x0 <= key[1] < x1]:
+            del self.stair_orientations[(r, c)]
+        self.evicted += 1
+        for listener in self.evict_listeners:
+            listener(x0, y0, x1, y1)
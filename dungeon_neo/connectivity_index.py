@@ -0,0 +1,91 @@
+from array import array
+
+
+class ConnectivityIndex:
+    """Union-find over the open cells of a generator grid
+
+    Cells are flat indices r * width + c. open() marks a cell walkable and
+    joins it with its open orthogonal neighbours, so the generator only calls
+    it where it carves: room interiors, doors and corridor cells. Union by
+    size with path halving keeps each call close to constant time.
+
+    Every set also counts the rooms in it, and room_groups is the number of
+    sets holding at least one room, so connected() is one comparison. Cells
+    are never taken out again. Dead-end removal only closes corridor ends,
+    which can't split what is left, so the sets stay right through cleanup.
+
+    The per-cell tables are int arrays rather than lists: a list of
+    distinct ints costs a pointer plus an int object per cell.
+    """
+
+    def __init__(self, n_rows, n_cols):
+        self.width = n_cols + 1
+        self.height = n_rows + 1
+        size = self.height * self.width
+        self.parent = array('i', range(size))
+        self.size = array('i', [1]) * size
+        self.rooms = array('i', [0]) * size
+        self.is_open = bytearray(size)
+        self.room_groups = 0
+
+    def index(self, r, c):
+        return r * self.width + c
+
+    def find(self, index):
+        parent = self.parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        if self.rooms[a] and self.rooms[b]:
+            self.room_groups -= 1
+        self.rooms[a] += self.rooms[b]
+        return True
+
+    def open(self, r, c):
+        """Mark (r, c) walkable and join it to its open neighbours"""
+        index = r * self.width + c
+        if self.is_open[index]:
+            return
+        self.is_open[index] = 1
+        is_open = self.is_open
+        for nxt, inside in ((index - self.width, r > 0), (index + self.width, r < self.height - 1),
+                            (index - 1, c > 0), (index + 1, c < self.width - 1)):
+            if inside and is_open[nxt]:
+                self.union(index, nxt)
+
+    def add_room(self, r1, c1, r2, c2):
+        for r in range(r1, r2 + 1):
+            for c in range(c1, c2 + 1):
+                self.open(r, c)
+        root = self.find(r1 * self.width + c1)
+        if not self.rooms[root]:
+            self.room_groups += 1
+        self.rooms[root] += 1
+
+    def is_open_at(self, r, c):
+        return bool(self.is_open[r * self.width + c])
+
+    def group(self, r, c):
+        return self.find(r * self.width + c)
+
+    def same(self, a, b):
+        """Whether cells a and b, as (row, col), are joined"""
+        return self.group(*a) == self.group(*b)
+
+    def rooms_with(self, r, c):
+        """Rooms in the set holding (r, c)"""
+        return self.rooms[self.group(r, c)]
+
+    def connected(self):
+        """True once every room can reach every other"""
+        return self.room_groups <= 1
@@ -2,12 +2,35 @@ from dungeon_neo.constants import CELL_FLAGS
 from dungeon_neo.entity import Entity
 from dungeon_neo.overlay import Overlay
 from .tool_system import tool
+import functools
 import random
 import json
 
+
+def undoable(func):
+    """Make each call of a map-editing tool one undo step
+
+    Snapshots the state's EditHistory before the tool runs. Tools called
+    from inside another (create_door runs set_cell_type and
+    set_door_properties) stay part of the outer call's step.
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        history = getattr(self.state, 'history', None)
+        if history is None or self._editing:
+            return func(self, *args, **kwargs)
+        history.snapshot(func.__name__)
+        self._editing = True
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self._editing = False
+    return wrapper
+
 class DMTools:
     def __init__(self, state):
         self.state = state
+        self._editing = False  # Inside an undoable tool call (see undoable)
 
         # Directly import all flags from constants
         self.NOTHING = CELL_FLAGS['NOTHING']
@@ -77,6 +100,7 @@ class DMTools:
                 cell_type="room, corridor, blocked, door, stairs"
         """)
     )
+    @undoable
     def set_cell_type(self, x: int, y: int, cell_type: str) -> dict:
         cell = self.state.get_cell(x, y)
         if not cell:
@@ -96,7 +120,7 @@ class DMTools:
                 return self.fail("Doors require adjacent open spaces")
         
         # Clear existing type flags
-        cell.base_type &= ~(
+        value = cell.base_type & ~(
             self.ROOM | 
             self.CORRIDOR | 
             self.BLOCKED | 
@@ -112,7 +136,7 @@ class DMTools:
             'door': self.DOORSPACE,
             'stairs': self.STAIRS
         }
-        cell.base_type |= type_map.get(cell_type, self.BLOCKED)
+        self.state.set_cell_flags(x, y, value | type_map.get(cell_type, self.BLOCKED))
         
         # Special handling for stairs
         if cell_type == "stairs":
@@ -140,6 +164,7 @@ class DMTools:
         orientation="horizontal or vertical",
         door_type="arch, normal, locked, trapped, secret, portc"
     )
+    @undoable
     def create_door(self, x: int, y: int, orientation: str, door_type: str) -> dict:
         # First convert cell to door space
         cell_result = self.set_cell_type(x, y, "door")
@@ -169,6 +194,7 @@ class DMTools:
         orientation="horizontal or vertical",
         door_type="arch, normal, locked, trapped, secret, portc"
     )
+    @undoable
     def set_door_properties(self, x: int, y: int, orientation: str, door_type: str) -> dict:
         cell = self.state.get_cell(x, y)
         if not cell:
@@ -179,11 +205,12 @@ class DMTools:
             return self.fail("Orientation must be horizontal or vertical")
         
         # Set orientation in state and cell
+        self.state.touch(x, y)
         self.state.door_orientations[(x, y)] = orientation
         cell.properties['orientation'] = orientation  # Add this line
         
         # Clear existing door flags
-        cell.base_type &= ~(
+        value = cell.base_type & ~(
             self.ARCH | 
             self.DOOR | 
             self.LOCKED | 
@@ -204,13 +231,10 @@ class DMTools:
         if door_type not in type_map:
             return self.fail(f"Invalid door type: {door_type}")
         
-        cell.base_type |= type_map[door_type]
+        self.state.set_cell_flags(x, y, value | type_map[door_type])
         
-        # Handle secret state
-        if door_type == "secret":
-            self.state.secret_mask[y][x] = False  # Start hidden
-        else:
-            self.state.secret_mask[y][x] = True  # Make visible
+        # Handle secret state: secret doors start hidden, anything else is visible
+        self.state.set_secret_revealed(x, y, door_type != "secret")
         
         return self.success(f"Set door to {door_type} ({orientation}) at ({x}, {y})")
 
@@ -226,6 +250,7 @@ class DMTools:
         x="X coordinate (number)",
         y="Y coordinate (number)"
     )
+    @undoable
     def reveal_secret(self, x: int, y: int) -> dict:
         cell = self.state.get_cell(x, y)
         if not cell:
@@ -235,12 +260,11 @@ class DMTools:
         
         state = self.state.__class__
         
-        # Update secret mask to reveal door
-        self.state.secret_mask[y][x] = True
-        
         # Convert to arch (passable)
-        cell.base_type &= ~state.SECRET
-        cell.base_type |= state.ARCH
+        self.state.set_cell_flags(x, y, (cell.base_type & ~state.SECRET) | state.ARCH)
+        
+        # Update secret mask to reveal door
+        self.state.set_secret_revealed(x, y, True)
         
         return self.success(f"Secret door revealed at ({x}, {y})")
 
@@ -258,6 +282,7 @@ class DMTools:
         direction="up or down",
         orientation="horizontal or vertical"
     )
+    @undoable
     def set_stairs_orientation(self, x: int, y: int, direction: str, orientation: str) -> dict:
         cell = self.state.get_cell(x, y)
         if not cell:
@@ -274,11 +299,9 @@ class DMTools:
         # Update stairs properties
         state = self.state.__class__
         if direction == "up":
-            cell.base_type |= state.STAIR_UP
-            cell.base_type &= ~state.STAIR_DN
+            self.state.set_cell_flags(x, y, (cell.base_type | state.STAIR_UP) & ~state.STAIR_DN)
         else:
-            cell.base_type |= state.STAIR_DN
-            cell.base_type &= ~state.STAIR_UP
+            self.state.set_cell_flags(x, y, (cell.base_type | state.STAIR_DN) & ~state.STAIR_UP)
             
         self.state.stair_orientations[(x, y)] = orientation
         return self.success(f"Set {direction} stairs to {orientation} at ({x}, {y})")
@@ -317,6 +340,7 @@ class DMTools:
         property="Specific property to modify",
         value="true or false"
     )
+    @undoable
     def modify_cell_flag(self, x: int, y: int, property: str, value: str) -> dict:
         cell = self.state.get_cell(x, y)
         if not cell:
@@ -346,9 +370,9 @@ class DMTools:
         flag = prop_to_flag[property]
         
         if bool_value:
-            cell.base_type |= flag
+            self.state.set_cell_flags(x, y, cell.base_type | flag)
         else:
-            cell.base_type &= ~flag
+            self.state.set_cell_flags(x, y, cell.base_type & ~flag)
             
         return {"success": True, "message": f"Set {property} to {value} at ({x}, {y})"}
     @tool(
@@ -358,13 +382,14 @@ class DMTools:
         y="Y coordinate (number)",
         entity_type="Type of entity (npc, monster, item, trap, portal, chest, etc.)"
     )
+    @undoable
     def add_entity(self, x: int, y: int, entity_type: str) -> dict:
         """Add entity to specified cell"""
         cell = self.state.get_cell(x, y)
         if not cell:
             return {"success": False, "message": "Invalid coordinates"}
         
-        cell.entities.append(Entity(entity_type))
+        self.state.entities.add(x, y, Entity(entity_type))
         return {"success": True, "message": f"Added {entity_type} at ({x}, {y})"}
     
     @tool(
@@ -374,12 +399,14 @@ class DMTools:
         y="Y coordinate (number)",
         text="Description text"
     )
+    @undoable
     def describe_cell(self, x: int, y: int, text: str) -> dict:
         """Add description to cell"""
         cell = self.state.get_cell(x, y)
         if not cell:
             return {"success": False, "message": "Invalid coordinates"}
         
+        self.state.touch(x, y)
         cell.description = text
         return {"success": True, "message": f"Added description to ({x}, {y})"}
 
@@ -394,6 +421,7 @@ class DMTools:
         color_b="Blue component (0-255)",
         parameters="JSON string of additional parameters (optional)"
     )
+    @undoable
     def add_overlay(self, x: int, y: int, primitive: str, color_r: int, color_g: int, color_b: int, parameters: str = "{}") -> dict:
         """Add a primitive overlay to a cell"""
         import json
@@ -412,10 +440,32 @@ class DMTools:
         
         # Create overlay with all parameters
         overlay_params = {"color": color, **params}
-        cell.overlays.append(Overlay(primitive, **overlay_params))
+        self.state.overlays.add(x, y, Overlay(primitive, **overlay_params))
         
         return {"success": True, "message": f"Added {primitive} overlay to ({x}, {y})"}
     
+    @tool(
+        name="undo_edit",
+        description="Undo the last change made to the dungeon map"
+    )
+    def undo_edit(self) -> dict:
+        """Roll the map back to before the last edit"""
+        if self.state.history is None or not self.state.history.can_undo():
+            return self.fail("Nothing to undo")
+        label = self.state.history.undo()
+        return self.success(f"Undid {label or 'last edit'}")
+
+    @tool(
+        name="redo_edit",
+        description="Redo the last undone change to the dungeon map"
+    )
+    def redo_edit(self) -> dict:
+        """Re-apply the last undone edit"""
+        if self.state.history is None or not self.state.history.can_redo():
+            return self.fail("Nothing to redo")
+        label = self.state.history.redo()
+        return self.success(f"Redid {label or 'last edit'}")
+
     @tool(
         name="reset_dungeon",
         description="Generate a new dungeon"
@@ -0,0 +1,75 @@
+class DoorRegistry:
+    """Door and room lookups for one generated dungeon
+
+    Doors are keyed by (x, y) = (column, row), the same way the door dicts
+    and DungeonStateNeo.door_orientations are. Two door maps are kept:
+
+    - opened: every door open_room or connect_rooms carved, minus the
+      ones clean_disconnected_doors wiped off the grid; the cleanup passes
+      walk this map instead of the whole grid
+    - doors: the final door list fix_doors settles on, in generation order
+
+    Rooms are indexed by id, and their per-direction door lists are the
+    room['door'] dicts themselves, so the registry never goes stale against
+    the room data.
+    """
+
+    def __init__(self):
+        self.opened = {}        # (x, y) -> door dict from open_room / connect_rooms
+        self.doors = {}         # (x, y) -> final door dict
+        self.orientations = {}  # (x, y) -> orientation of final doors
+        self.rooms = {}         # room_id -> room dict
+
+    def __len__(self):
+        return len(self.doors)
+
+    def __contains__(self, pos):
+        return pos in self.doors
+
+    # Rooms
+
+    def add_room(self, room):
+        self.rooms[room['id']] = room
+
+    def room(self, room_id):
+        return self.rooms.get(room_id)
+
+    def room_doors(self, room_id, dir=None):
+        """Doors of a room, by direction or all of them"""
+        room = self.rooms.get(room_id)
+        if not room:
+            return {} if dir is None else []
+        if dir is None:
+            return room['door']
+        return room['door'].get(dir, [])
+
+    # Doors
+
+    def open(self, door, room=None, dir=None):
+        """Record a door carved by open_room, optionally on a room side"""
+        self.opened[(door['x'], door['y'])] = door
+        if room is not None:
+            room['door'].setdefault(dir, []).append(door)
+
+    def opened_at(self, x, y):
+        return self.opened.get((x, y))
+
+    def discard_opened(self, x, y):
+        """A carved door lost its door flags (e.g. it led nowhere)"""
+        self.opened.pop((x, y), None)
+
+    def clear_final(self):
+        self.doors.clear()
+        self.orientations.clear()
+
+    def register(self, door):
+        """Add a door to the final list"""
+        pos = (door['x'], door['y'])
+        self.doors[pos] = door
+        self.orientations[pos] = door.get('orientation', 'horizontal')
+
+    def get(self, x, y):
+        return self.doors.get((x, y))
+
+    def door_list(self):
+        return list(self.doors.values())
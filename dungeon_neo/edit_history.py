@@ -0,0 +1,189 @@
+from dungeon_neo.flat_grid import FlatGridSystem
+
+
+class Snapshot:
+    """One undo step: the chunks edited since it was taken, as they were"""
+
+    def __init__(self, label=None):
+        self.label = label
+        self.chunks = {}  # (cx, cy) -> chunk contents from EditHistory._capture
+
+
+class EditHistory:
+    """Chunk-level copy-on-write undo/redo for a DungeonStateNeo
+
+    Taking a snapshot copies nothing. The map is cut into chunk_size x
+    chunk_size chunks, and the first time an edit touches a chunk after a
+    snapshot, that chunk's contents (flags, secret mask, orientations, cell
+    descriptions and properties, entities and overlays) are copied into the
+    snapshot; untouched chunks stay shared with the live state. undo()
+    swaps just those chunks back, saving their current contents so redo()
+    can swap them forward again.
+
+    The state calls touch() from set_cell_flags, set_secret_revealed and its
+    entity/overlay stores; anything else that changes a cell should call
+    state.touch(x, y) before it does.
+    """
+
+    def __init__(self, state, chunk_size=8, max_snapshots=100):
+        self.state = state
+        self.chunk_size = chunk_size
+        self.max_snapshots = max_snapshots
+        self.undo_stack = []
+        self.redo_stack = []
+        self.restoring = False  # Set while chunks are swapped, so they aren't re-saved
+
+    def snapshot(self, label=None):
+        """Mark a point to undo back to - O(1)"""
+        if self.undo_stack and not self.undo_stack[-1].chunks:
+            # Nothing was edited since the last one; reuse it
+            self.undo_stack[-1].label = label
+            return
+        self.undo_stack.append(Snapshot(label))
+        if len(self.undo_stack) > self.max_snapshots:
+            self.undo_stack.pop(0)
+
+    def touch(self, x, y):
+        """Save (x, y)'s chunk into the current snapshot before it changes"""
+        if self.restoring or not self.undo_stack:
+            return
+        if self.redo_stack:
+            # A new edit forks history; what was undone can't come back
+            self.redo_stack.clear()
+        chunks = self.undo_stack[-1].chunks
+        key = (x // self.chunk_size, y // self.chunk_size)
+        if key not in chunks:
+            chunks[key] = self._capture(key)
+
+    def can_undo(self):
+        self._drop_empty()
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def undo(self):
+        """Roll back to the last snapshot; returns its label, or None if there is none"""
+        self._drop_empty()
+        if not self.undo_stack:
+            return None
+        snapshot = self.undo_stack.pop()
+        self.redo_stack.append(self._swap(snapshot))
+        return snapshot.label
+
+    def redo(self):
+        """Re-apply the last undone snapshot; returns its label, or None"""
+        self._drop_empty()
+        if not self.redo_stack:
+            return None
+        snapshot = self.redo_stack.pop()
+        self.undo_stack.append(self._swap(snapshot))
+        return snapshot.label
+
+    def _drop_empty(self):
+        while self.undo_stack and not self.undo_stack[-1].chunks:
+            self.undo_stack.pop()
+
+    def _swap(self, snapshot):
+        """Restore snapshot's chunks; returns a snapshot of what they held"""
+        # Capture every chunk before restoring any: an entity moved between
+        # two of them is re-added (and so moved) by whichever restores first
+        current = Snapshot(snapshot.label)
+        current.chunks = {key: self._capture(key) for key in snapshot.chunks}
+        self.restoring = True
+        try:
+            for key, contents in snapshot.chunks.items():
+                self._restore(key, contents)
+        finally:
+            self.restoring = False
+        return current
+
+    def _bounds(self, key):
+        grid = self.state.grid_system
+        x0, y0 = key[0] * self.chunk_size, key[1] * self.chunk_size
+        return x0, y0, min(x0 + self.chunk_size, grid.width), min(y0 + self.chunk_size, grid.height)
+
+    def _cells_with_data(self, x0, y0, x1, y1):
+        grid = self.state.grid_system
+        if isinstance(grid, FlatGridSystem):
+            # Only kept cells can have descriptions or properties
+            cells = (grid.extra.get((x, y)) for y in range(y0, y1) for x in range(x0, x1))
+        else:
+            cells = (cell for y in range(y0, y1) for cell in grid.grid[y][x0:x1])
+        return [cell for cell in cells
+                if cell and (cell.description or getattr(cell, '_properties', None))]
+
+    def _capture_flags(self, x0, y0, x1, y1):
+        grid = self.state.grid_system
+        if isinstance(grid, FlatGridSystem):
+            return [grid.flags[y * grid.width + x0:y * grid.width + x1] for y in range(y0, y1)]
+        return [[cell.base_type if cell else 0 for cell in grid.grid[y][x0:x1]] for y in range(y0, y1)]
+
+    def _capture(self, key):
+        state = self.state
+        grid = state.grid_system
+        x0, y0, x1, y1 = self._bounds(key)
+        flags = self._capture_flags(x0, y0, x1, y1)
+        orientations = {}
+        for name in ('door_orientations', 'stair_orientations'):
+            table = getattr(state, name)
+            orientations[name] = {(x, y): table[(x, y)] for y in range(y0, y1)
+                                  for x in range(x0, x1) if (x, y) in table}
+        return {
+            'flags': flags,
+            'secret': [state.secret_mask[y][x0:x1] for y in range(y0, y1)],
+            'orientations': orientations,
+            'cells': {(cell.x, cell.y): (cell.description, dict(cell.properties))
+                      for cell in self._cells_with_data(x0, y0, x1, y1)},
+            'entities': list(state.entities.in_rect(x0, y0, x1, y1)),
+            'overlays': list(state.overlays.in_rect(x0, y0, x1, y1)),
+        }
+
+    def _restore(self, key, contents):
+        state = self.state
+        grid = state.grid_system
+        x0, y0, x1, y1 = self._bounds(key)
+
+        current = self._capture_flags(x0, y0, x1, y1)
+        for y, flags, secret, now in zip(range(y0, y1), contents['flags'], contents['secret'], current):
+            if isinstance(grid, FlatGridSystem):
+                grid.flags[y * grid.width + x0:y * grid.width + x1] = flags
+            else:
+                for cell, value in zip(grid.grid[y][x0:x1], flags):
+                    if cell:
+                        cell.base_type = value
+            if flags != now:
+                state.drop_room_graph()
+            secret_now = state.secret_mask[y][x0:x1]
+            state.secret_mask[y][x0:x1] = secret
+            if state.passability is not None:
+                # Only cells that actually differ need their bits re-derived
+                for i, value in enumerate(flags):
+                    if value != now[i] or secret[i] != secret_now[i]:
+                        state.passability.update(x0 + i, y, value, secret[i])
+
+        for name, saved in contents['orientations'].items():
+            table = getattr(state, name)
+            for y in range(y0, y1):
+                for x in range(x0, x1):
+                    table.pop((x, y), None)
+            table.update(saved)
+
+        saved_cells = contents['cells']
+        for cell in self._cells_with_data(x0, y0, x1, y1):
+            if (cell.x, cell.y) not in saved_cells:
+                cell.description = ""
+                cell.properties = None
+                if isinstance(grid, FlatGridSystem):
+                    # Clearing a view keeps it; drop it again if nothing is left
+                    grid.release(cell)
+        for (x, y), (description, properties) in saved_cells.items():
+            cell = grid.get_cell(x, y)
+            cell.description = description
+            cell.properties = dict(properties) if properties else None
+
+        for name in ('entities', 'overlays'):
+            store = getattr(state, name)
+            store.clear_area(x0, y0, x1, y1)
+            for x, y, obj in contents[name]:
+                store.add(x, y, obj)
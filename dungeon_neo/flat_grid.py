@@ -0,0 +1,107 @@
+from array import array
+from dungeon_neo.grid_system import GridSystem
+from dungeon_neo.cell_neo import DungeonCellNeo
+
+
+class FlatGridSystem(GridSystem):
+    """Grid keeping every cell's flags in one flat array('I')
+
+    flags[y * width + x] is the cell's base_type. Most cells are nothing but
+    flags (rock, room floor, corridor), so no object is kept for them:
+    get_cell() hands out a FlatCell view over the buffer on demand. A view
+    that gets data of its own - properties, a description, entities,
+    overlays - is kept in `extra` under (x, y), and get_cell() returns that
+    same object from then on.
+
+    Bulk readers (renderer, visibility, debug grid) can read flags directly
+    and only ask for cells where `extra` has something or the flags say
+    there is something to draw.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.flags = array('I', bytes(4 * width * height))
+        self.extra = {}  # (x, y) -> FlatCell with data beyond its flags
+
+    def load(self, rows):
+        """Copy a generator grid (lists, array rows or memoryviews) into the buffer"""
+        width = self.width
+        for y, row in enumerate(rows[:self.height]):
+            values = row[:width]
+            if not (isinstance(values, array) and values.typecode == 'I'):
+                values = array('I', values)
+            start = y * width
+            self.flags[start:start + len(values)] = values
+
+    def index(self, x, y):
+        return y * self.width + x
+
+    def row(self, y):
+        """Flags for one row, as a view over the buffer"""
+        return memoryview(self.flags)[y * self.width:(y + 1) * self.width]
+
+    def get_cell(self, x: int, y: int):
+        """Cell at (x, y): its kept object if it has one, else a fresh view"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            cell = self.extra.get((x, y))
+            return cell if cell is not None else FlatCell(self, x, y)
+        return None
+
+    def set_cell(self, x: int, y: int, value):
+        """Store a cell's flags, keeping the cell itself only if it carries data"""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return
+        if isinstance(value, int):
+            self.flags[y * self.width + x] = value
+            return
+        self.flags[y * self.width + x] = value.base_type
+        self.extra.pop((x, y), None)
+        cell = FlatCell(self, x, y)
+        for slot in FlatCell.DATA_SLOTS:
+            data = getattr(value, slot, None)
+            if data:
+                setattr(cell, slot, data)
+
+    def keep(self, cell):
+        self.extra[(cell.x, cell.y)] = cell
+
+    def release(self, cell):
+        """Stop keeping a cell once it carries nothing beyond its flags"""
+        if not any(getattr(cell, slot, None) for slot in FlatCell.DATA_SLOTS):
+            self.extra.pop((cell.x, cell.y), None)
+
+
+class FlatCell(DungeonCellNeo):
+    """DungeonCellNeo whose base_type lives in a FlatGridSystem buffer
+
+    Views are cheap: only the grid, the index and the position are set, and
+    the lazy collections read as empty. The first write of anything but the
+    flags registers the view with the grid so the data isn't lost.
+    """
+
+    __slots__ = ('_grid', '_index')
+
+    DATA_SLOTS = ('description', 'discovered', '_state', '_properties') + \
+        tuple('_' + name for name in DungeonCellNeo.COLLECTIONS)
+
+    def __init__(self, grid, x, y):
+        init = object.__setattr__
+        init(self, '_grid', grid)
+        init(self, '_index', y * grid.width + x)
+        init(self, 'x', x)
+        init(self, 'y', y)
+        init(self, 'description', "")
+
+    @property
+    def base_type(self):
+        return self._grid.flags[self._index]
+
+    @base_type.setter
+    def base_type(self, value):
+        self._grid.flags[self._index] = self._ensure_int(value)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name != 'base_type':
+            self._grid.keep(self)
@@ -1,7 +1,22 @@
 import random
 import math
+import time
+import tracemalloc
+from bisect import bisect_right, insort
+from heapq import heapify, heappop, heappush
+from collections import deque
+from itertools import count
+from contextlib import nullcontext
 from typing import List, Dict, Any, Tuple, Optional
 from dungeon_neo.constants import CELL_FLAGS, DIRECTION_VECTORS, OPPOSITE_DIRECTIONS
+from dungeon_neo.door_registry import DoorRegistry
+from dungeon_neo.connectivity_index import ConnectivityIndex
+from dungeon_neo.occupancy_index import OccupancyIndex
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only the numpy_passes option uses it
+    np = None
 
 class DungeonGeneratorNeo:
 
@@ -30,6 +45,19 @@ class DungeonGeneratorNeo:
     BLOCK_CORR = CELL_FLAGS['BLOCK_CORR']
     BLOCK_DOOR = CELL_FLAGS['BLOCK_DOOR']
 
+    # All 32 flag bits, used to build clear masks that fit in a uint32 array
+    CELL_MASK = 0xFFFFFFFF
+
+    # Door flag -> the 'key' open_room gives it
+    DOOR_KEYS = {
+        CELL_FLAGS['ARCH']: 'arch',
+        CELL_FLAGS['DOOR']: 'open',
+        CELL_FLAGS['LOCKED']: 'lock',
+        CELL_FLAGS['TRAPPED']: 'trap',
+        CELL_FLAGS['SECRET']: 'secret',
+        CELL_FLAGS['PORTC']: 'portc'
+    }
+
     @property
     def rooms(self):
         """Alias for room attribute to match test expectations"""
@@ -64,10 +92,52 @@ class DungeonGeneratorNeo:
 
         print (self.opts['seed'])
             
-        if self.opts['seed'] is None:
+        # 'None' is how the web options spell "no seed"
+        if self.opts['seed'] in (None, 'None'):
             self.opts['seed'] = random.randint(1, 100000)
             
         self.rand = random.Random(self.opts['seed'])
+
+        # Optional numpy versions of the whole-grid passes. The grid itself
+        # stays row lists; each pass copies it into a uint32 ndarray and back.
+        # 'array_grid' is the option's old name.
+        self.use_numpy = bool(self.opts.get('numpy_passes') or self.opts.get('array_grid'))
+        if self.use_numpy and np is None:
+            print("numpy_passes requested but numpy is not installed - using the list passes")
+            self.use_numpy = False
+
+        # Overwrite the previous dungeon's cell rows instead of allocating new
+        # ones. Only safe when callers are done with the last result's grid.
+        self.reuse_buffers = bool(self.opts.get('reuse_buffers'))
+        self.generations = 0
+        self.last_alloc_stats = {}
+
+        # Optional dungeon_neo.profiling.PhaseTimer for per-phase timings
+        self.timer = None
+        self.last_timings = None
+        self._timing_run = None
+
+        # Optional latency target - soft, not a ceiling. Room placement,
+        # corridor tunnelling and the dead-end sweep look at the clock inside
+        # their loops and stop early, and each cut is listed in the result's
+        # 'degraded'. Linking the rooms, stairs and door cleanup always run to
+        # the end, so a map can still overrun by their cost. None means full
+        # quality.
+        self.time_budget_ms = self.opts.get('time_budget_ms')
+        self.degraded = []
+        self._budget_start = None
+
+        # Optional (row, col) for the up stair, so a level can line up with
+        # the down stair of the level above (see core.dungeon_levels)
+        self.stair_anchor = self.opts.get('stair_anchor')
+        self.anchor_placement = None
+
+        # Optional border cells (row, col) to open as corridor, so adjacent
+        # maps can be stitched together (see dungeon_neo.chunked_grid)
+        self.edge_connectors = self.opts.get('edge_connectors') or []
+        self._reserved_roots = []
+        self._protected_cells = set()  # Opened connector cells collapse must keep
+        self._link_scratch = None  # _search_link's per-cell buffers, reused across searches
         
         # Direction vectors
         self.di = {d: vec[0] for d, vec in DIRECTION_VECTORS.items()}
@@ -81,6 +151,9 @@ class DungeonGeneratorNeo:
             'Cross': [[0, 1, 0], [1, 1, 1], [0, 1, 0]]
         }
         
+        # 'Cavern' replaces rooms and corridors with a cellular automata cave
+        self.is_cavern = self.opts.get('dungeon_layout') == 'Cavern'
+
         self.corridor_layout = {
             'Labyrinth': 0,
             'Bent': 50,
@@ -144,6 +217,11 @@ class DungeonGeneratorNeo:
         
     def _initialize_structures(self):
         self.cell = None
+        self.links = None  # ConnectivityIndex over the carved cells
+        self.occupancy = None  # OccupancyIndex, only live while rooms are scattered
+        self.added_links = []  # Doors and corridors connect_rooms had to add
+        self.door_index = DoorRegistry()
+        self.cell_buffer = None  # last grid, kept for reuse_buffers
         self.room = []
         self.doorList = []
         self.stairList = []
@@ -156,36 +234,151 @@ class DungeonGeneratorNeo:
         self.room_base = 0
         self.room_radix = 0
         
+    def reset(self):
+        """Drop everything the last create_dungeon built
+
+        Rooms, doors, stairs and the door registry start empty again, so a
+        generator that is reused for a whole session only ever holds one
+        dungeon. The RNG is left alone and keeps its sequence going.
+        """
+        buffer = self.cell if self.reuse_buffers else None
+        self._initialize_structures()
+        if hasattr(self, 'connect'):
+            del self.connect
+        self.cell_buffer = buffer
+
     def create_dungeon(self):
-        self.init_dungeon_size()
-        self.init_cells()
-        self.emplace_rooms()
-        self.open_rooms()
-        self.label_rooms()
-        self.corridors()
+        # Fresh structures each time - the registry is exported with the result
+        self.reset()
+        self.generations += 1
+        self.degraded = []
+        self._budget_start = time.perf_counter() if self.time_budget_ms else None
+        # Under an outer tracer, report what this generation left allocated.
+        # The tracer's peak belongs to whoever started it, so it isn't reset
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            traced_start = tracemalloc.get_traced_memory()[0]
+        if self.timer:
+            self._timing_run = self.timer.begin(seed=self.opts['seed'], generation=self.generations)
+
+        with self._phase('init_dungeon_size'):
+            self.init_dungeon_size()
+        with self._phase('init_cells'):
+            self.init_cells()
+        if self.is_cavern:
+            # One cave in place of rooms and corridors, nothing to clean up
+            with self._phase('cavern'):
+                self.carve_cavern()
+        else:
+            with self._phase('emplace_rooms'):
+                self.emplace_rooms()
+            with self._phase('open_rooms'):
+                self.open_rooms()
+            with self._phase('label_rooms'):
+                self.label_rooms()
+            with self._phase('corridors'):
+                self.corridors()
+            with self._phase('connect_rooms'):
+                self.connect_rooms()
         
         if self.opts['add_stairs']:
-            self.emplace_stairs()
-                
-        self.clean_dungeon()
+            with self._phase('emplace_stairs'):
+                self.emplace_stairs()
 
-        # NEW: Clean stray door flags
-        for r in range(len(self.cell)):
-            for c in range(len(self.cell[r])):
-                if self.cell[r][c] & self.DOORSPACE:
-                    # Check if door is registered
-                    if not any(d['x'] == c and d['y'] == r for d in self.doorList):
-                        #print(f"Cleaning stray door at ({c},{r})")
-                        self.cell[r][c] &= ~self.DOORSPACE  # Remove door flags
-                        self.cell[r][c] |= self.ENTRANCE  # Keep as regular entrance
-        
-        # Before returning, ensure all grid values are integers
-        for x in range(len(self.cell)):
-            for y in range(len(self.cell[x])):
-                if not isinstance(self.cell[x][y], int):
-                    print(f"Non-int value at ({x},{y}): {self.cell[x][y]} - converting to NOTHING")
-                    self.cell[x][y] = self.NOTHING
-        
+        if not self.is_cavern:
+            with self._phase('clean_dungeon'):
+                self.clean_dungeon()
+        with self._phase('stray_doors'):
+            self.clean_stray_doors()
+        with self._phase('pack_result'):
+            stairs, doors = self.pack_result()
+        with self._phase('fill_blocks'):
+            self.fill_blocks() # set blocked which cannot be traveled through.
+        #print(f"Cell (6,5) flags: {hex(self.cell[5][6])}")  # [row][col]        
+
+        n_cells = (self.opts['n_rows'] + 1) * (self.opts['n_cols'] + 1)
+        self.last_alloc_stats = {
+            'generation': self.generations,
+            'buffer_reused': self.cell_buffer is not None,
+            'cells': n_cells,
+            'cells_allocated': 0 if self.cell_buffer is not None else n_cells,
+            'rooms': len(self.room),
+            'doors': len(self.doorList),
+            'opened_doors': len(self.door_index.opened),
+            'stairs': len(self.stairList)
+        }
+        if tracing:
+            current = tracemalloc.get_traced_memory()[0]
+            self.last_alloc_stats['traced_kb'] = (current - traced_start) / 1024
+
+        result = {
+            'seed': self.result_seed(),
+            'grid': self.cell,
+            'stairs': stairs,
+            'doors': doors,
+            'rooms': self.room,
+            'door_index': self.door_index,
+            'alloc_stats': self.last_alloc_stats,
+            'degraded': self.degraded,
+            'added_links': self.added_links,
+            'stair_anchor': self.anchor_placement,
+            'n_rows': self.opts['n_rows'],
+            'n_cols': self.opts['n_cols']
+        }
+        if self._budget_start is not None:
+            elapsed = (time.perf_counter() - self._budget_start) * 1000
+            if elapsed > self.time_budget_ms:
+                # Linking and cleanup always run, so big maps can overrun
+                print(f"Dungeon took {elapsed:.0f}ms, over its {self.time_budget_ms}ms budget")
+        if self.timer:
+            self._timing_run.update(n_rows=self.opts['n_rows'], n_cols=self.opts['n_cols'])
+            self.last_timings = self.timer.finish(self._timing_run)
+            self._timing_run = None
+            result['timings'] = self.last_timings
+        return result
+
+    def result_seed(self):
+        """Seed naming the last dungeon: the generator's seed for its first one,
+        '<seed>#<n>' for the nth after that (the RNG carries on between them)"""
+        if self.generations <= 1:
+            return self.opts['seed']
+        return f"{self.opts['seed']}#{self.generations}"
+
+    # Share of time_budget_ms each optional step may run until
+    BUDGET_SHARES = {
+        'emplace_rooms': 0.25,
+        'corridors': 0.4,
+        'remove_deadends_start': 0.45,
+        'remove_deadends': 0.55
+    }
+
+    def _budget_deadline(self, step):
+        """perf_counter time at which `step` has to stop, or None without a budget"""
+        if self._budget_start is None:
+            return None
+        return self._budget_start + self.time_budget_ms * self.BUDGET_SHARES[step] / 1000
+
+    def _degrade(self, step, detail):
+        self.degraded.append({'step': step, 'detail': detail})
+
+    def _phase(self, name):
+        """Time a create_dungeon phase when a PhaseTimer is attached"""
+        if self.timer:
+            return self.timer.phase(self._timing_run, name)
+        return nullcontext()
+
+    def clean_stray_doors(self):
+        """Turn door flags that fix_doors did not keep back into plain entrances"""
+        # Every door cell came from open_room or connect_rooms, so the
+        # registry of carved doors is the full list of candidates
+        cell = self.cell
+        for c, r in self.door_index.opened:
+            if cell[r][c] & self.DOORSPACE and (c, r) not in self.door_index:
+                cell[r][c] &= ~self.DOORSPACE  # Remove door flags
+                cell[r][c] |= self.ENTRANCE  # Keep as regular entrance
+
+    def pack_result(self):
+        """Stairs and doors in the world coordinates the result carries"""
         # Prepare stairs and doors in world coordinates
         stairs = []
         for stair in self.stairList:
@@ -226,17 +419,8 @@ class DungeonGeneratorNeo:
                 'east': room['east']
             })
 
-        self.fill_blocks() # set blocked which cannot be traveled through.
-        #print(f"Cell (6,5) flags: {hex(self.cell[5][6])}")  # [row][col]        
-        return {
-            'grid': self.cell,
-            'stairs': stairs,
-            'doors': doors,
-            'rooms': self.room,
-            'n_rows': self.opts['n_rows'],
-            'n_cols': self.opts['n_cols']
-        }
-    
+        return stairs, doors
+
     # Core generation methods
     def init_dungeon_size(self):
         self.n_i = self.opts['n_rows'] // 2
@@ -255,7 +439,31 @@ class DungeonGeneratorNeo:
         # Ensure proper dimensions
         rows = self.opts['n_rows'] + 1
         cols = self.opts['n_cols'] + 1
-        
+
+        buffer = self.cell_buffer
+        if buffer is not None and (len(buffer) != rows or len(buffer[0]) != cols):
+            buffer = self.cell_buffer = None  # size changed, start over
+
+        if self.use_numpy:
+            self.cell = buffer
+            self._init_cells_array(rows, cols)
+            return
+
+        if buffer is not None:
+            blank = [self.NOTHING] * cols
+            for row in buffer:
+                row[:] = blank
+            self.cell = buffer
+        else:
+            self._allocate_cells(rows, cols)
+
+        layout = self.dungeon_layout.get(self.opts['dungeon_layout'])
+        if layout:
+            self.mask_cells(layout)
+        elif self.opts['dungeon_layout'] == 'Round':
+            self.round_mask()
+
+    def _allocate_cells(self, rows, cols):
         try:
             # Initialize with NOTHING flag
             self.cell = [
@@ -266,12 +474,6 @@ class DungeonGeneratorNeo:
             # Fallback to safe initialization
             self.cell = [[self.NOTHING] * cols for _ in range(rows)]
         
-        layout = self.dungeon_layout.get(self.opts['dungeon_layout'])
-        if layout:
-            self.mask_cells(layout)
-        elif self.opts['dungeon_layout'] == 'Round':
-            self.round_mask()
-        
     def mask_cells(self, mask):
         r_scale = len(mask) / (self.opts['n_rows'] + 1)
         c_scale = len(mask[0]) / (self.opts['n_cols'] + 1)
@@ -295,14 +497,300 @@ class DungeonGeneratorNeo:
                 if d > radius:
                     self.cell[r][c] = self.BLOCKED
 
+    # Cavern layout
+    #
+    # Random fill, then a few rounds of the 4-5 rule: a cell becomes wall with
+    # more than four wall neighbours, floor with fewer, and otherwise stays.
+    # Neighbour counts are whole-grid sums - shifted ndarrays with the numpy_passes
+    # option, zipped row sums on the lists - never per-cell loops. Floor is
+    # plain CORRIDOR and walls are left for fill_blocks, so the result uses
+    # the usual flags and everything downstream treats the cave as one big
+    # corridor.
+
+    CAVERN_FILL = 45        # percent of cells that start as wall
+    CAVERN_ITERATIONS = 5
+    CAVERN_MIN_POCKET = 4   # smaller pockets are filled in instead of linked
+
+    def carve_cavern(self):
+        rows, cols = self.opts['n_rows'] + 1, self.opts['n_cols'] + 1
+        fill = self.opts.get('cavern_fill', self.CAVERN_FILL) / 100
+        iterations = self.opts.get('cavern_iterations', self.CAVERN_ITERATIONS)
+        random_value = self.rand.random
+
+        # 1 = wall, 0 = floor; the border is always wall
+        wall = [[1] * cols]
+        for _ in range(rows - 2):
+            wall.append([1] + [int(random_value() < fill) for _ in range(cols - 2)] + [1])
+        wall.append([1] * cols)
+
+        forced = self._cavern_forced_floor()
+        if self.use_numpy:
+            wall = self._smooth_cavern_array(wall, iterations, forced)
+        else:
+            wall = self._smooth_cavern(wall, iterations, forced)
+        self._link_cavern(wall, forced)
+
+        floor, nothing = self.CORRIDOR, self.NOTHING
+        for row, walls in zip(self.cell, wall):
+            row[:] = [nothing if w else floor for w in walls]
+
+    def _cavern_forced_floor(self):
+        """Cells that must end up open: the stair anchor and edge connectors"""
+        self._protected_cells = set()
+        self.anchor_placement = None
+        forced = []
+        if self.stair_anchor:
+            r, c = self.stair_anchor
+            if 0 < r <= self.max_row and 0 < c <= self.max_col:
+                forced.append((r, c))
+            else:
+                print(f"Stair anchor {(r, c)} is not inside the map - ignoring it")
+        for r, c in self._edge_cells():
+            inner = (min(max(r, 1), self.max_row), min(max(c, 1), self.max_col))
+            forced += [(r, c), inner]
+            self._protected_cells.update(((r, c), inner))
+        return forced
+
+    def _smooth_cavern(self, wall, iterations, forced):
+        rows, cols = len(wall), len(wall[0])
+        edge = [3] * cols  # Three wall cells per column past the top and bottom
+        for _ in range(iterations):
+            # Horizontal runs of three per row, then three rows of those
+            runs = []
+            for row in wall:
+                padded = [1] + row + [1]
+                runs.append([a + b + c for a, b, c in zip(padded, padded[1:], padded[2:])])
+            above, below = [edge] + runs[:-1], runs[1:] + [edge]
+            wall = [
+                [1 if (n := a + b + c - w) > 4 else (w if n == 4 else 0)
+                 for a, b, c, w in zip(up, mid, down, row)]
+                for up, mid, down, row in zip(above, runs, below, wall)
+            ]
+            wall[0] = [1] * cols
+            wall[-1] = [1] * cols
+            for row in wall:
+                row[0] = row[-1] = 1
+            for r, c in forced:
+                wall[r][c] = 0
+        return wall
+
+    def _smooth_cavern_array(self, wall, iterations, forced):
+        grid = np.array(wall, dtype=np.uint8)
+        rows, cols = grid.shape
+        for _ in range(iterations):
+            padded = np.pad(grid, 1, constant_values=1)
+            count = np.zeros(grid.shape, dtype=np.uint8)
+            for dr in (0, 1, 2):
+                for dc in (0, 1, 2):
+                    if (dr, dc) != (1, 1):
+                        count += padded[dr:dr + rows, dc:dc + cols]
+            grid = np.where(count > 4, 1, np.where(count < 4, 0, grid)).astype(np.uint8)
+            grid[[0, -1], :] = 1
+            grid[:, [0, -1]] = 1
+            for r, c in forced:
+                grid[r, c] = 0
+        return grid.tolist()
+
+    def _link_cavern(self, wall, forced):
+        """Keep the largest cave and tunnel every other pocket into it
+
+        Pockets are labelled with a flat-index flood fill. Each one, in scan
+        order, grows a breadth-first search through rock until it touches
+        the connected cave and carves that shortest path. Pockets under
+        CAVERN_MIN_POCKET cells are filled in, unless they hold a forced
+        cell.
+        """
+        rows, cols = len(wall), len(wall[0])
+        flat = [w for row in wall for w in row]
+        label = [-1] * len(flat)
+
+        pockets = []
+        for start, w in enumerate(flat):
+            if w or label[start] >= 0:
+                continue
+            n = len(pockets)
+            label[start] = n
+            pocket = [start]
+            for index in pocket:
+                r, c = divmod(index, cols)
+                # Edge connectors put floor on the border, so bound every step
+                for nxt, inside in ((index - cols, r > 0), (index + cols, r < rows - 1),
+                                    (index - 1, c > 0), (index + 1, c < cols - 1)):
+                    if inside and not flat[nxt] and label[nxt] < 0:
+                        label[nxt] = n
+                        pocket.append(nxt)
+            pockets.append(pocket)
+        if not pockets:
+            return
+
+        keep = {label[r * cols + c] for r, c in forced}
+        main = max(range(len(pockets)), key=lambda n: len(pockets[n]))
+        connected = bytearray(len(flat))
+        for index in pockets[main]:
+            connected[index] = 1
+
+        for n, pocket in enumerate(pockets):
+            if n == main:
+                continue
+            if len(pocket) < self.opts.get('cavern_min_pocket', self.CAVERN_MIN_POCKET) and n not in keep:
+                for index in pocket:
+                    flat[index] = 1
+                continue
+            path = self._cavern_tunnel(pocket, connected, rows, cols)
+            for index in pocket + path:
+                flat[index] = 0
+                connected[index] = 1
+
+        for r in range(rows):
+            wall[r][:] = flat[r * cols:(r + 1) * cols]
+
+    def _cavern_tunnel(self, pocket, connected, rows, cols):
+        """Rock cells on the shortest path from a pocket to the connected cave"""
+        parent = dict.fromkeys(pocket, -1)
+        frontier = list(pocket)
+        for index in frontier:
+            r, c = divmod(index, cols)
+            for nxt, inside in ((index - cols, r > 1), (index + cols, r < rows - 2),
+                                (index - 1, c > 1), (index + 1, c < cols - 2)):
+                if not inside or nxt in parent:
+                    continue
+                parent[nxt] = index
+                if connected[nxt]:
+                    path = []
+                    index = parent[nxt]
+                    while parent[index] != -1:
+                        path.append(index)
+                        index = parent[index]
+                    return path
+                frontier.append(nxt)
+        return []
+
+    def _cavern_stair_ends(self):
+        """Stair sites in a cave: floor cells with one open side, in random order
+
+        Cells with two or three open sides are added if there are not enough
+        of those nooks. The stair anchor always qualifies when it is open.
+        """
+        anchor = tuple(self.stair_anchor) if self.stair_anchor else None
+        nooks = self._cavern_sites(lambda n: n == 1, anchor)
+        self.rand.shuffle(nooks)
+        short = self.opts['add_stairs'] - len(nooks)
+        if short > 0:
+            others = self._cavern_sites(lambda n: 1 < n < 4, None)
+            self.rand.shuffle(others)
+            nooks += others[:short]
+        return [self._stair_end(r, c, next_vec, 'horizontal' if next_vec[0] != 0 else 'vertical')
+                for r, c, next_vec in nooks]
+
+    def _cavern_sites(self, wanted, anchor):
+        """(row, col, vector to an open side) for floor cells whose number of
+        open sides passes wanted(), plus the anchor"""
+        cell = self.cell
+        floor = self.CORRIDOR
+        sites = []
+        for r in range(1, self.opts['n_rows']):
+            row, up, down = cell[r], cell[r - 1], cell[r + 1]
+            for c in range(1, self.opts['n_cols']):
+                if row[c] != floor:
+                    continue
+                open_up, open_down = up[c] == floor, down[c] == floor
+                open_left, open_right = row[c - 1] == floor, row[c + 1] == floor
+                n = open_up + open_down + open_left + open_right
+                if not n or not (wanted(n) or (r, c) == anchor) or (r, c) in self._protected_cells:
+                    continue
+                next_vec = [-1, 0] if open_up else [1, 0] if open_down else [0, -1] if open_left else [0, 1]
+                sites.append((r, c, next_vec))
+        return sites
+
+    # numpy passes
+    #
+    # The whole-grid passes below run as uint32 mask operations. The generator
+    # never keeps its grid as an array: room placement, tunnelling and dead-end
+    # removal touch a handful of cells at a time and stay on the row lists,
+    # since single-element ndarray access is several times slower than list
+    # indexing. Each pass converts the rows to an array and back, so the gain
+    # is modest (around 10% on big maps).
+
+    def _grid_array(self):
+        """Return the cell grid as a uint32 ndarray"""
+        return np.array(self.cell, dtype=np.uint32)
+
+    def _store_grid_array(self, grid):
+        """Write an ndarray grid back as the row lists the rest of the generator uses"""
+        if self.reuse_buffers and self.cell is not None:
+            for row, values in zip(self.cell, grid.tolist()):
+                row[:] = values
+        else:
+            self.cell = grid.tolist()
+
+    def _init_cells_array(self, rows, cols):
+        grid = np.zeros((rows, cols), dtype=np.uint32)
+
+        layout = self.dungeon_layout.get(self.opts['dungeon_layout'])
+        if layout:
+            # Same scaling as mask_cells: each cell samples the layout mask
+            mask = np.array(layout, dtype=bool)
+            mask_r = (np.arange(rows) * (len(layout) / rows)).astype(np.intp)
+            mask_c = (np.arange(cols) * (len(layout[0]) / cols)).astype(np.intp)
+            grid[~mask[np.ix_(mask_r, mask_c)]] = self.BLOCKED
+        elif self.opts['dungeon_layout'] == 'Round':
+            center_r = self.opts['n_rows'] // 2
+            center_c = self.opts['n_cols'] // 2
+            r, c = np.ogrid[:rows, :cols]
+            d = np.sqrt((r - center_r) ** 2 + (c - center_c) ** 2)
+            grid[d > center_c] = self.BLOCKED
+
+        self._store_grid_array(grid)
+
+    def _block_corridor_walls_array(self):
+        grid = self._grid_array()
+
+        # Corridor flags on the odd tunnel grid only, like the loop version
+        corridor = np.zeros(grid.shape, dtype=bool)
+        odd = (slice(3, self.n_i * 2, 2), slice(3, self.n_j * 2, 2))
+        corridor[odd] = (grid[odd] & self.CORRIDOR) != 0
+
+        # Every orthogonal neighbour of a corridor cell, inside max_row/max_col
+        near = np.zeros(grid.shape, dtype=bool)
+        near[1:, :] |= corridor[:-1, :]
+        near[:-1, :] |= corridor[1:, :]
+        near[:, 1:] |= corridor[:, :-1]
+        near[:, :-1] |= corridor[:, 1:]
+        near[self.max_row + 1:, :] = False
+        near[:, self.max_col + 1:] = False
+
+        near &= (grid & (self.ROOM | self.CORRIDOR | self.ENTRANCE)) == 0
+        grid[near] |= self.BLOCKED | self.PERIMETER
+        self._store_grid_array(grid)
+
+    def _fill_blocks_array(self):
+        grid = self._grid_array()
+        bare_perimeter = (((grid & self.PERIMETER) != 0) &
+                          ((grid & (self.ENTRANCE | self.DOORSPACE)) == 0))
+        grid[(grid == self.NOTHING) | bare_perimeter] = self.BLOCKED
+        self._store_grid_array(grid)
+
     def emplace_rooms(self):
+        self._reserve_tunnel_roots()
+        self.links = ConnectivityIndex(self.opts['n_rows'], self.opts['n_cols'])
         if self.opts.get('room_layout') == 'Packed':
             self.pack_rooms()
-        else:
+            return
+        # Random rectangles mostly land in open space on Scattered, so the
+        # row bitsets pay off there; Packed tries each slot once and its
+        # rejects hit a wall on the first cell, so upkeep would cost more
+        self.occupancy = OccupancyIndex(self.cell, self.BLOCKED, self.ROOM)
+        try:
             self.scatter_rooms()
+        finally:
+            self.occupancy = None
 
     def pack_rooms(self):
+        deadline = self._budget_deadline('emplace_rooms')
         for i in range(self.n_i):
+            if deadline is not None and self.room and time.perf_counter() > deadline:
+                self._degrade('emplace_rooms', f"packed {i} of {self.n_i} rows")
+                break
             r = (i * 2) + 1
             for j in range(self.n_j):
                 c = (j * 2) + 1
@@ -314,7 +802,11 @@ class DungeonGeneratorNeo:
 
     def scatter_rooms(self):
         n_rooms = self.alloc_rooms()
-        for _ in range(n_rooms):
+        deadline = self._budget_deadline('emplace_rooms')
+        for attempt in range(n_rooms):
+            if deadline is not None and self.room and time.perf_counter() > deadline:
+                self._degrade('emplace_rooms', f"{attempt} of {n_rooms} placement attempts")
+                break
             self.emplace_room()
 
     def alloc_rooms(self):
@@ -335,8 +827,7 @@ class DungeonGeneratorNeo:
         if r1 < 1 or r2 > self.max_row or c1 < 1 or c2 > self.max_col:
             return
         
-        hit = self.sound_room(r1, c1, r2, c2)
-        if hit.get('blocked') or hit:
+        if self.room_collides(r1, c1, r2, c2):
             return
         
         room_id = self.n_rooms + 1
@@ -350,6 +841,9 @@ class DungeonGeneratorNeo:
                 elif self.cell[r][c] & self.PERIMETER:
                     self.cell[r][c] &= ~self.PERIMETER
                 self.cell[r][c] |= self.ROOM | (room_id << 6)
+        self.links.add_room(r1, c1, r2, c2)
+        if self.occupancy:
+            self.occupancy.mark_room(r1, c1, r2, c2)
         
         height = (r2 - r1 + 1) * 10
         width = (c2 - c1 + 1) * 10
@@ -360,12 +854,15 @@ class DungeonGeneratorNeo:
             'door': {}
         }
         self.room.append(room_data)
+        self.door_index.add_room(room_data)
         
         # Block corridors from room boundary
         for r in range(r1 - 1, r2 + 2):
             if r <= self.max_row:
                 if not (self.cell[r][c1 - 1] & (self.ROOM | self.ENTRANCE)):
                     self.cell[r][c1 - 1] |= (self.BLOCKED | self.PERIMETER)
+                    if self.occupancy:
+                        self.occupancy.mark_blocked(r, c1 - 1)
                 if not (self.cell[r][c2 + 1] & (self.ROOM | self.ENTRANCE)):
                     self.cell[r][c2 + 1] |= self.PERIMETER
         
@@ -375,6 +872,8 @@ class DungeonGeneratorNeo:
                     self.cell[r1 - 1][c] |= self.PERIMETER
                 if not (self.cell[r2 + 1][c] & (self.ROOM | self.ENTRANCE)):
                     self.cell[r2 + 1][c] |= (self.BLOCKED | self.PERIMETER)
+                    if self.occupancy:
+                        self.occupancy.mark_blocked(r2 + 1, c)
 
     def set_room(self, proto):
         if proto is None:
@@ -394,7 +893,21 @@ class DungeonGeneratorNeo:
         
         return proto
 
+    def room_collides(self, r1, c1, r2, c2):
+        """True if the rectangle touches a BLOCKED or ROOM cell"""
+        if self.occupancy:
+            return (self.occupancy.any_blocked(r1, c1, r2, c2) or
+                    self.occupancy.any_room(r1, c1, r2, c2))
+        return bool(self.sound_room(r1, c1, r2, c2))
+
     def sound_room(self, r1, c1, r2, c2):
+        """Report what a rectangle hits: {'blocked': True}, {room_id: cells, ...} or {}"""
+        if self.occupancy:
+            if self.occupancy.any_blocked(r1, c1, r2, c2):
+                return {'blocked': True}
+            if not self.occupancy.any_room(r1, c1, r2, c2):
+                return {}
+        # Room hits are counted from the cells themselves
         hit = {}
         for r in range(r1, r2 + 1):
             for c in range(c1, c2 + 1):
@@ -420,10 +933,6 @@ class DungeonGeneratorNeo:
         if not hasattr(self, 'connect'):
             self.connect = {}
         
-        # Initialize master door list if it doesn't exist
-        if not hasattr(self, 'all_doors'):
-            self.all_doors = []
-        
         for _ in range(n_opens):
             if not sills:
                 break
@@ -486,19 +995,15 @@ class DungeonGeneratorNeo:
             if 'out_id' in sill:
                 door['out_id'] = sill['out_id']
             
-            # Add to master list
-            self.all_doors.append(door)
-            
-            # Also add to room's door list
-            if open_dir not in room['door']:
-                room['door'][open_dir] = []
-            room['door'][open_dir].append(door)
+            # Add to the registry and the room's door list
+            self.door_index.open(door, room, open_dir)
+            self.links.open(door_r, door_c)
 
         # # NEW: Register ALL valid sills, not just selected ones
         # for sill in sills:
         #     x, y = sill['door_c'], sill['door_r']
         #     orientation = 'vertical' if sill['dir'] in ['north','south'] else 'horizontal'
-        #     self.all_doors.append({
+        #     self.door_index.open({
         #         'x': x, 'y': y,
         #         'orientation': orientation,
         #         'key': 'potential'  # Flag for unselected doors
@@ -602,16 +1107,36 @@ class DungeonGeneratorNeo:
                 self.cell[label_r][label_c + i] |= (char_code << 24)
 
     def corridors(self):
+        # Starting the walk at the stair anchor leaves it a dead end: the
+        # first branch carves everything reachable, so no other side can
+        # open. Edge connectors start walks too, so they always join the maze.
+        # Under a time budget the walks stop once their deadline passes;
+        # connect_rooms then joins the rooms with what was carved.
+        deadline = self._budget_deadline('corridors')
+        stopped = None  # Row the walks ran out of time on
+        for r, c in self._release_tunnel_roots():
+            if stopped is None and not self.tunnel((r - 1) // 2, (c - 1) // 2, deadline=deadline):
+                stopped = r
         for i in range(1, self.n_i):
+            if stopped is not None:
+                break
             r = (i * 2) + 1
             for j in range(1, self.n_j):
                 c = (j * 2) + 1
                 if self.cell[r][c] & self.CORRIDOR:
                     continue
-                self.tunnel(i, j)
+                if not self.tunnel(i, j, deadline=deadline):
+                    stopped = r
+                    break
+        if stopped is not None:
+            self._degrade('corridors', f"stopped at row {stopped} of {self.max_row}")
         self.block_corridor_walls() # this should create the blocking for corridors
+        self._open_edge_connectors()
 
     def block_corridor_walls(self):
+        if self.use_numpy:
+            self._block_corridor_walls_array()
+            return
         for i in range(1, self.n_i):
             r = (i * 2) + 1
             for j in range(1, self.n_j):
@@ -627,13 +1152,37 @@ class DungeonGeneratorNeo:
                         self.cell[nr][nc] |= self.BLOCKED | self.PERIMETER
 
 
-    def tunnel(self, i, j, last_dir=None):
-        dirs = self.tunnel_dirs(last_dir)
-        for dir in dirs:
-            if self.open_tunnel(i, j, dir):
-                next_i = i + self.di[dir]
-                next_j = j + self.dj[dir]
-                self.tunnel(next_i, next_j, dir)
+    def tunnel(self, i, j, last_dir=None, deadline=None):
+        """Depth-first corridor walk from (i, j)
+
+        Uses an explicit stack of [i, j, dirs, next_dir_index] frames instead of
+        recursing once per corridor step, so large maps don't hit the recursion
+        limit. Frames are expanded in the same order as the recursive walk, so
+        the random stream and the carved corridors are unchanged for a seed.
+        With a perf_counter deadline the walk stops where it is once that
+        passes; returns False if it did, True when it ran to the end.
+        """
+        open_tunnel = self.open_tunnel
+        tunnel_dirs = self.tunnel_dirs
+        di, dj = self.di, self.dj
+
+        stack = [[i, j, tunnel_dirs(last_dir), 0]]
+        steps = 0
+        while stack:
+            steps += 1
+            if deadline is not None and not steps & 255 and time.perf_counter() > deadline:
+                return False
+            frame = stack[-1]
+            i, j, dirs, k = frame
+            if k == len(dirs):
+                stack.pop()
+                continue
+            frame[3] = k + 1
+
+            dir = dirs[k]
+            if open_tunnel(i, j, dir):
+                stack.append([i + di[dir], j + dj[dir], tunnel_dirs(dir), 0])
+        return True
 
     def tunnel_dirs(self, last_dir):
         dirs = self.dj_dirs[:]
@@ -684,8 +1233,319 @@ class DungeonGeneratorNeo:
             for c in range(min_c, max_c + 1):
                 self.cell[r][c] &= ~self.ENTRANCE
                 self.cell[r][c] |= self.CORRIDOR
+                # A walk can start on a masked cell, which stays impassable
+                if not self.cell[r][c] & self.BLOCKED:
+                    self.links.open(r, c)
         return True
 
+    def _reserve_tunnel_roots(self):
+        """Keep rooms and doors off the stair anchor and the cells inside the
+        edge connectors until corridors run"""
+        self._reserved_roots = []
+        self._protected_cells = set()
+        self.anchor_placement = None
+        roots = []
+        if self.stair_anchor:
+            r, c = self.stair_anchor
+            if r % 2 and c % 2 and 0 < r <= self.max_row and 0 < c <= self.max_col:
+                roots.append((r, c))
+            else:
+                print(f"Stair anchor {(r, c)} is not an odd cell inside the map - ignoring it")
+        for r, c in self._edge_cells():
+            # The odd cell just inside the border
+            roots.append((min(max(r, 1), self.max_row), min(max(c, 1), self.max_col)))
+
+        for r, c in roots:
+            if self.cell[r][c] & (self.BLOCKED | self.ROOM):
+                continue  # Masked out here; emplace_stairs falls back to the nearest end
+            self.cell[r][c] |= self.BLOCKED
+            self._reserved_roots.append((r, c))
+
+    def _release_tunnel_roots(self):
+        roots, self._reserved_roots = self._reserved_roots, []
+        for r, c in roots:
+            self.cell[r][c] &= self.CELL_MASK ^ self.BLOCKED
+        return roots
+
+    def _edge_cells(self):
+        """Valid edge connectors: border cells next to an odd cell"""
+        n_rows, n_cols = self.opts['n_rows'], self.opts['n_cols']
+        cells = []
+        for r, c in self.edge_connectors:
+            if (r in (0, n_rows) and c % 2 and 0 < c < n_cols) or \
+                    (c in (0, n_cols) and r % 2 and 0 < r < n_rows):
+                cells.append((r, c))
+            else:
+                print(f"Edge connector {(r, c)} is not a border cell next to an odd cell - ignoring it")
+        return cells
+
+    def _open_edge_connectors(self):
+        for r, c in self._edge_cells():
+            inner_r, inner_c = min(max(r, 1), self.max_row), min(max(c, 1), self.max_col)
+            for cr, cc in ((r, c), (inner_r, inner_c)):
+                if not self.cell[cr][cc] & self.ROOM:
+                    self.cell[cr][cc] &= self.CELL_MASK ^ (self.BLOCKED | self.PERIMETER)
+                    self.cell[cr][cc] |= self.CORRIDOR
+                    self.links.open(cr, cc)
+                # Inside this map the connector looks like a dead end
+                self._protected_cells.add((cr, cc))
+
+    def connect_rooms(self):
+        """Make sure every room can be reached from every other
+
+        The ConnectivityIndex has tracked what rooms, doors and corridors
+        joined while they were carved, so a connected dungeon costs one
+        check. Otherwise each room outside the set holding the most rooms is
+        linked to the nearest set with other rooms (_link_room), pass after
+        pass, until only one set is left. Edge connectors are then linked to
+        the rooms the same way, so stitched maps always join up. Added doors
+        and corridors are listed in added_links; anything that still could
+        not be joined is reported under 'connect_rooms' in 'degraded'.
+        """
+        self.added_links = []
+        links = self.links
+        if links is None:
+            return
+        if not links.connected():
+            self._link_room_groups()
+        if self.edge_connectors and self.room:
+            self._link_edge_connectors()
+
+    def _link_room_groups(self):
+        links = self.links
+        corners = [(room['north'], room['west']) for room in self.room]
+        while not links.connected():
+            groups = links.room_groups
+            main = max(corners, key=lambda corner: links.rooms_with(*corner))
+            shut_in = []
+            for room, corner in zip(self.room, corners):
+                if links.connected():
+                    break
+                if not links.same(corner, main) and not self._link_room(room):
+                    shut_in.append((room, corner))
+            # Rooms walled in by their own corridors search from their whole set, once per set
+            tried = set()
+            for room, corner in shut_in:
+                group = links.group(*corner)
+                if links.connected() or group in tried or links.same(corner, main):
+                    continue
+                tried.add(group)
+                self._link_room(room, whole_set=True)
+            if links.room_groups == groups:
+                self._degrade('connect_rooms', f"{groups} groups of rooms could not be linked together")
+                break
+
+    def _link_edge_connectors(self):
+        main = (self.room[0]['north'], self.room[0]['west'])
+        for r, c in self._edge_cells():
+            if self.links.same((r, c), main):
+                continue
+            # The connector's own cells leave nothing to search from but its whole set,
+            # and a connector in a masked corner has to tunnel through the mask
+            spot = {'id': None, 'north': r, 'south': r, 'west': c, 'east': c}
+            if not self._link_room(spot, whole_set=True, masked=True):
+                self._degrade('connect_rooms', f"edge connector {(r, c)} could not be linked to the rooms")
+
+    def _link_room(self, room, whole_set=False, masked=False):
+        """Carve the shortest way from a room to a set holding other rooms
+
+        A breadth-first search out of the room through the cells that are
+        not carved yet, so its cost depends on how far the nearest such set
+        is rather than on the size of the room's own set. A room shut in by
+        its own corridors needs whole_set, which starts the search from every
+        cell of its set instead. Cells next to a room wall only become doors
+        - entered straight on, at odd offsets along the wall like open_room's
+        sills - so links never run along a room's side. masked lets the
+        search cut through cells the dungeon layout masked out.
+
+        Under a time budget the search heads for the nearest room in another
+        set instead of spreading evenly: the link may come out longer, but
+        the cost follows the distance rather than the area around the room,
+        which matters once corridors were cut short and rooms sit in open rock.
+        """
+        cell, links = self.cell, self.links
+        home = links.group(room['north'], room['west'])
+        target = self._nearest_room_outside(room, home) if self._budget_start is not None else None
+        if whole_set:
+            width = links.width
+            seeds = [divmod(index, width) for index in range(len(links.parent))
+                     if links.is_open[index] and links.find(index) == home]
+        else:
+            seeds = [(r, c) for r in range(room['north'], room['south'] + 1)
+                     for c in range(room['west'], room['east'] + 1)]
+        found = self._search_link(seeds, home, masked, target)
+        if found is None:
+            return False
+
+        came_dir = self._link_scratch[1]
+        width = links.width
+        path = []
+        at = found
+        while came_dir[at] != self.NO_DIR:
+            dr, dc = self.LINK_DIRS[came_dir[at]]
+            path.append((divmod(at, width), (dr, dc)))
+            at -= dr * width + dc
+        path.reverse()
+
+        names = {(self.di[d], self.dj[d]): d for d in self.dj_dirs}
+        n_cells = n_doors = 0
+        for (r, c), (dr, dc) in path:
+            if links.is_open_at(r, c):
+                continue  # A stray corridor the search walked through
+            n_cells += 1
+            cell[r][c] &= self.CELL_MASK ^ (self.BLOCKED | self.PERIMETER | self.ENTRANCE)
+            cell[r][c] |= self.CORRIDOR
+            if self._touches_room(r, c, dr, dc):
+                self._add_link_door(r, c, dr, dc, names)
+                n_doors += 1
+            links.open(r, c)
+        self.added_links.append({
+            'room': room['id'],
+            'row': path[0][0][0], 'col': path[0][0][1],
+            'cells': n_cells, 'doors': n_doors
+        })
+        return True
+
+    def _nearest_room_outside(self, room, home):
+        """Middle cell of the closest room not in set `home`, or None"""
+        links = self.links
+        r0, c0 = (room['north'] + room['south']) // 2, (room['west'] + room['east']) // 2
+        best = None
+        for other in self.room:
+            r, c = (other['north'] + other['south']) // 2, (other['west'] + other['east']) // 2
+            distance = abs(r - r0) + abs(c - c0)
+            if (best is None or distance < best[0]) and links.group(other['north'], other['west']) != home:
+                best = (distance, r, c)
+        return best[1:] if best else None
+
+    def _touches_room(self, r, c, dr, dc):
+        """None if (r, c) touches no room, True if only straight across, False if sideways"""
+        cell = self.cell
+        if cell[r - dc][c - dr] & self.ROOM or cell[r + dc][c + dr] & self.ROOM:
+            return False
+        if cell[r - dr][c - dc] & self.ROOM or cell[r + dr][c + dc] & self.ROOM:
+            return True
+        return None
+
+    LINK_DIRS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+    NO_DIR = 4  # came_dir of a search's seed cells
+
+    def _search_link(self, seeds, home, masked=False, target=None):
+        """Breadth-first search from seeds for an uncarved cell next to another set with rooms
+
+        The search carves through uncarved cells and walks through open
+        cells of sets holding no rooms (stray corridors), so a room walled
+        in by such corridors is still reached. With a target (row, col) it
+        is a greedy best-first search towards it instead. Returns the flat index (r * links.width + c) of the cell found, or
+        None. The way back is in _link_scratch: came_dir holds the LINK_DIRS
+        index each reached cell was entered by (NO_DIR for seeds), so its
+        previous cell is one step back that way. Both buffers are allocated
+        once per grid size; only the seen flags are cleared after a search.
+        """
+        cell, links = self.cell, self.links
+        n_rows, n_cols = self.opts['n_rows'], self.opts['n_cols']
+        width = links.width
+        touches_room = self._touches_room
+        is_open = links.is_open
+        dirs = self.LINK_DIRS
+        if self._link_scratch is None or len(self._link_scratch[0]) != len(links.is_open):
+            self._link_scratch = (bytearray(len(links.is_open)), bytearray(len(links.is_open)))
+        seen, came_dir = self._link_scratch
+        reached = []
+        if target is None:
+            queue = deque()
+            push, pop = queue.append, queue.popleft
+        else:
+            tr, tc = target
+            queue, order = [], count()
+            push = lambda cell: heappush(queue, (abs(cell[0] - tr) + abs(cell[1] - tc), next(order), cell))
+            pop = lambda: heappop(queue)[2]
+        for r, c in seeds:
+            index = r * width + c
+            seen[index] = 1
+            came_dir[index] = self.NO_DIR
+            reached.append(index)
+            push((r, c))
+        found = None
+        while queue and found is None:
+            r, c = pop()
+            index = r * width + c
+            came = came_dir[index]
+            came = dirs[came] if came != self.NO_DIR else None
+            for k, (dr, dc) in enumerate(dirs):
+                nr, nc = r + dr, c + dc
+                # Seeds can sit on the border (edge connectors), so bounds first
+                if not (0 < nr < n_rows and 0 < nc < n_cols):
+                    continue
+                nindex = index + dr * width + dc
+                if seen[nindex]:
+                    continue
+                if came is not None and came != (dr, dc) and touches_room(r, c, *came):
+                    continue  # Doors go straight through the wall
+                if is_open[nindex]:
+                    if links.group(nr, nc) == home or links.rooms_with(nr, nc):
+                        continue
+                    # Corridors joined to no room: walk through, they need no carving
+                    seen[nindex] = 1
+                    came_dir[nindex] = k
+                    reached.append(nindex)
+                    push((nr, nc))
+                    continue
+                value = cell[nr][nc]
+                if value & self.BLOCKED and not value & self.PERIMETER and not masked:
+                    continue  # Masked out of the map
+                door = touches_room(nr, nc, dr, dc)
+                if door is False or (door and (nc if dr else nr) % 2 == 0):
+                    continue
+                if door and cell[nr + dr][nc + dc] & self.ROOM and links.group(nr + dr, nc + dc) == home:
+                    continue  # A door back into our own rooms
+                seen[nindex] = 1
+                came_dir[nindex] = k
+                reached.append(nindex)
+                # Done once the new cell meets another set that holds rooms
+                for ar, ac in ((nr - 1, nc), (nr + 1, nc), (nr, nc - 1), (nr, nc + 1)):
+                    if links.is_open_at(ar, ac) and links.group(ar, ac) != home and links.rooms_with(ar, ac):
+                        found = nindex
+                        break
+                if found is not None:
+                    break
+                push((nr, nc))
+        for index in reached:
+            seen[index] = 0
+        return found
+
+    def _add_link_door(self, r, c, dr, dc, names):
+        """Turn a cell connect_rooms carved through a room wall into a door"""
+        cell = self.cell
+        behind, ahead = cell[r - dr][c - dc], cell[r + dr][c + dc]
+        if behind & self.ROOM:
+            room_id, dir = (behind & self.ROOM_ID) >> 6, names[(dr, dc)]
+            out_id = (ahead & self.ROOM_ID) >> 6 if ahead & self.ROOM else None
+        else:
+            room_id, dir = (ahead & self.ROOM_ID) >> 6, names[(-dr, -dc)]
+            out_id = None
+        door_type = self.door_type()
+        cell[r][c] |= door_type
+        door = {
+            'x': c, 'y': r,
+            'orientation': 'vertical' if dir in ('east', 'west') else 'horizontal',
+            'key': self.DOOR_KEYS[door_type]
+        }
+        if out_id is not None:
+            door['out_id'] = out_id
+        self.door_index.open(door, self.door_index.room(room_id), dir)
+
+    def _take_anchor_end(self, ends):
+        """Remove and return the stair end at the anchor, else the closest one"""
+        r, c = self.stair_anchor
+        best = min(range(len(ends)), key=lambda k: abs(ends[k]['x'] - r) + abs(ends[k]['y'] - c))
+        end = ends.pop(best)
+        self.anchor_placement = {
+            'row': end['x'], 'col': end['y'],
+            'exact': (end['x'], end['y']) == (r, c)
+        }
+        return end
+
     def emplace_stairs(self):
         # Reset stairList at start
         self.stairList = []
@@ -695,9 +1555,24 @@ class DungeonGeneratorNeo:
             return
         
         ends = self.stair_ends()
+        if self.links is not None and self.room:
+            # Stairs on a corridor no room reaches would strand the party
+            main = (self.room[0]['north'], self.room[0]['west'])
+            reachable = [end for end in ends if self.links.same((end['x'], end['y']), main)]
+            ends = reachable or ends
         if not ends:
             return
 
+        if self.stair_anchor:
+            # The up stair goes at the anchor, the rest as usual
+            end = self._take_anchor_end(ends)
+            self.cell[end['x']][end['y']] |= self.STAIR_UP
+            end['key'] = 'up'
+            self.stairList.append(end)
+            n -= 1
+            if not n or not ends:
+                return
+
         # Create exactly one up and one down stair when n=2
         if n == 2:
             # First stair: down
@@ -720,116 +1595,340 @@ class DungeonGeneratorNeo:
                 if not ends:
                     break
                 end = ends.pop(0)
-                x, y = end['x'], end['y']
-                # Store corridor direction vector
-                next_pos = end['next']
-                end['corridor_dx'] = next_pos[0]
-                end['corridor_dy'] = next_pos[1]
+                r, c = end['x'], end['y']  # ends carry the row in 'x'
                 
-                # For n != 2, maintain existing random behavior
-                stair_type = i if i < 2 else random.randint(0, 1)
+                # First a down stair, then an up stair, then either at random
+                stair_type = i if i < 2 else self.rand.randint(0, 1)
                 
                 if stair_type == 0:
-                    self.cell[y][x] |= self.STAIR_DN
+                    self.cell[r][c] |= self.STAIR_DN
                     end['key'] = 'down'
                 else:
-                    self.cell[y][x] |= self.STAIR_UP
+                    self.cell[r][c] |= self.STAIR_UP
                     end['key'] = 'up'
-                    stair = {
-                        'x': end['x'],  # row position
-                        'y': end['y'],  # column position
-                        'dx': end['dx'],
-                        'dy': end['dy'],
-                        'orientation': end['orientation'],  # Use calculated orientation
-                        'key': 'down' if (i == 0 and n == 2) else 'up'
-                    }    
                 
-                self.stairList.append(stair)
+                self.stairList.append(end)
         if False:   # debug output you can turn on for identifying stair position for orientation fix      
             for stair in self.stairList:
                 print(f"GENERATOR stair: pos=({stair['x']},{stair['y']}) "
                       f"orientation={stair['orientation']}")
 
     def stair_ends(self):
+        """Every dead-end corridor cell that can hold a stair, in scan order
+
+        A cell qualifies for a stair_end pattern when it and the cells along
+        'corridor' are plain CORRIDOR and none of the 'walled' cells is open.
+        The patterns are compiled once (_stair_patterns) into a mask over the
+        cell's 8 neighbours, so each cell costs one neighbourhood read and a
+        table lookup instead of four check_tunnel calls. With numpy the whole
+        grid is tested at once with shifted boolean arrays.
+        """
+        if self.is_cavern:
+            return self._cavern_stair_ends()
+        if self.use_numpy:
+            return self._stair_ends_array()
+
+        patterns = self._stair_patterns()
+        cell = self.cell
+        corridor = self.CORRIDOR
+        open_space = self.ROOM | self.CORRIDOR
+        n_rows, n_cols = self.opts['n_rows'], self.opts['n_cols']
+
         ends = []
         for i in range(self.n_i):
             r = (i * 2) + 1
-            for j in range(self.n_j):
-                c = (j * 2) + 1
-                if self.cell[r][c] != self.CORRIDOR:
-                    continue
-                if self.cell[r][c] & self.STAIRS:
+            up, row, down = cell[r - 1], cell[r], cell[r + 1]
+            for c in range(1, self.n_j * 2, 2):
+                if row[c] != corridor:
                     continue
-                
-                for dir, config in self.stair_end.items():
-                    if self.check_tunnel(self.cell, r, c, config):
-                        next_vec = config['next']  # This is what matters
-                        orientation = 'horizontal' if next_vec[0] != 0 else 'vertical' # orientation of stair                
-                        end = {
-                            'y': c,  # column = horizontal position
-                            'x': r,  # row = vertical position
-                            'dx': next_vec[0],  # horizontal direction
-                            'dy': next_vec[1],  # vertical direction
-                            'orientation': orientation
-                        }
-                        ends.append(end)
+                # Bit k set when neighbour k (row-major, centre skipped) is open
+                mask = ((up[c - 1] & open_space and 1) | (up[c] & open_space and 2) |
+                        (up[c + 1] & open_space and 4) | (row[c - 1] & open_space and 8) |
+                        (row[c + 1] & open_space and 16) | (down[c - 1] & open_space and 32) |
+                        (down[c] & open_space and 64) | (down[c + 1] & open_space and 128))
+                for dir, walled_mask, outer_walled, corridor_cells, orientation, next_vec in patterns:
+                    if mask & walled_mask:
+                        continue
+                    if outer_walled and not self.check_tunnel(cell, r, c, {'walled': outer_walled}):
+                        continue
+                    for dr, dc in corridor_cells:
+                        nr, nc = r + dr, c + dc
+                        if not (0 <= nr <= n_rows and 0 <= nc <= n_cols) or cell[nr][nc] != corridor:
+                            break
+                    else:
+                        ends.append(self._stair_end(r, c, next_vec, orientation))
                         break
         return ends
 
+    def _stair_end(self, r, c, next_vec, orientation):
+        return {
+            'y': c,  # column = horizontal position
+            'x': r,  # row = vertical position
+            'dx': next_vec[0],  # horizontal direction
+            'dy': next_vec[1],  # vertical direction
+            'orientation': orientation
+        }
+
+    def _stair_patterns(self):
+        """stair_end configs as (dir, walled 8-neighbour mask, walled cells
+        outside the 3x3, corridor cells, orientation, next) in config order"""
+        if getattr(self, '_stair_pattern_cache', None) is None:
+            bits = {(dr, dc): 1 << k for k, (dr, dc) in enumerate(
+                (dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr, dc) != (0, 0))}
+            patterns = []
+            for dir, config in self.stair_end.items():
+                walled_mask = 0
+                outer_walled = []
+                for pos in config.get('walled', []):
+                    if tuple(pos) in bits:
+                        walled_mask |= bits[tuple(pos)]
+                    else:
+                        outer_walled.append(pos)
+                next_vec = config['next']
+                orientation = 'horizontal' if next_vec[0] != 0 else 'vertical' # orientation of stair
+                patterns.append((dir, walled_mask, outer_walled,
+                                 [tuple(pos) for pos in config.get('corridor', [])],
+                                 orientation, next_vec))
+            self._stair_pattern_cache = patterns
+        return self._stair_pattern_cache
+
+    def _stair_ends_array(self):
+        grid = np.array(self.cell, dtype=np.uint32)
+        rows, cols = grid.shape
+        is_corridor = grid == self.CORRIDOR
+        is_open = (grid & (self.ROOM | self.CORRIDOR)) != 0
+
+        def shifted(mask, dr, dc, outside):
+            # out[r, c] = mask[r + dr, c + dc], `outside` past the edges
+            out = np.full(mask.shape, outside, dtype=bool)
+            src_r = slice(max(dr, 0), rows + min(dr, 0))
+            dst_r = slice(max(-dr, 0), rows + min(-dr, 0))
+            src_c = slice(max(dc, 0), cols + min(dc, 0))
+            dst_c = slice(max(-dc, 0), cols + min(-dc, 0))
+            out[dst_r, dst_c] = mask[src_r, src_c]
+            return out
+
+        # Only odd cells are stair sites; lower-priority patterns lose ties
+        odd = np.zeros(grid.shape, dtype=bool)
+        odd[1:self.n_i * 2:2, 1:self.n_j * 2:2] = True
+        taken = ~odd
+        chosen = np.full(grid.shape, -1, dtype=np.int8)
+        patterns = self._stair_patterns()
+        for k, (dir, walled_mask, outer_walled, corridor_cells, orientation, next_vec) in enumerate(patterns):
+            config = self.stair_end[dir]
+            hit = ~taken
+            for dr, dc in corridor_cells:
+                hit &= shifted(is_corridor, dr, dc, False)
+            for dr, dc in config.get('walled', []):
+                hit &= ~shifted(is_open, dr, dc, False)
+            chosen[hit] = k
+            taken |= hit
+
+        ends = []
+        for r, c in zip(*np.nonzero(chosen >= 0)):
+            dir, _, _, _, orientation, next_vec = patterns[chosen[r, c]]
+            ends.append(self._stair_end(int(r), int(c), next_vec, orientation))
+        return ends
+
     def clean_dungeon(self):
         if self.opts['remove_deadends']:
-            self.remove_deadends()
+            deadline = self._budget_deadline('remove_deadends_start')
+            if deadline is not None and time.perf_counter() > deadline:
+                self._degrade('remove_deadends', 'skipped')
+            else:
+                self.remove_deadends()
         self.clean_disconnected_doors()
         self.fix_doors()
 
     def remove_deadends(self):
+        """Collapse dead ends, visiting only cells that can be dead ends
+
+        Same result and RNG sequence as sweeping every odd cell in row order
+        with one randint(0, 99) per open non-stair cell. Only cells with at
+        most one open orthogonal neighbour can match a close_end pattern, so
+        those are queued by scan index, and every cell a collapse closes
+        re-queues the odd cells around it that come later in the scan. The
+        draws the sweep would have made for the cells in between are skipped
+        in bulk by _skip_draws.
+        """
         p = self.opts['remove_deadends']
         all = (p == 100)
-        
+        cell = self.cell
+        n_j = self.n_j
+        open_space = self.ROOM | self.CORRIDOR
+        stairs = self.STAIRS
+
+        # prefix[k] = open non-stair odd cells before scan index k. Cells only
+        # ever close from here on, so eligible counts are prefix differences
+        # minus the eligible cells closed so far (kept sorted in closed_eligible)
+        prefix = [0]
+        eligible = 0
+        queue = []
+        index = 0
         for i in range(self.n_i):
             r = (i * 2) + 1
-            for j in range(self.n_j):
-                c = (j * 2) + 1
-                if not (self.cell[r][c] & (self.ROOM | self.CORRIDOR)):
-                    continue
-                if self.cell[r][c] & self.STAIRS:
-                    continue
-                if not all and self.rand.randint(0, 99) >= p:
-                    continue
-                if self.is_adjacent_to_door(r, c):
-                    continue
-                if self.corridor_leads_to_door(r, c):
+            row, up, down = cell[r], cell[r - 1], cell[r + 1]
+            for c in range(1, n_j * 2, 2):
+                value = row[c]
+                if value & open_space and not value & stairs:
+                    eligible += 1
+                    if ((up[c] & open_space != 0) + (down[c] & open_space != 0) +
+                            (row[c - 1] & open_space != 0) + (row[c + 1] & open_space != 0)) <= 1:
+                        queue.append(index)
+                prefix.append(eligible)
+                index += 1
+        n_cells = index
+
+        closed_eligible = []
+        seen_closed = set()
+        last = -1
+        deadline = self._budget_deadline('remove_deadends')
+        heapify(queue)
+        while queue:
+            index = heappop(queue)
+            if index <= last:
+                continue
+            if deadline is not None and time.perf_counter() > deadline:
+                # Out of time: leave the remaining dead ends in place
+                self._degrade('remove_deadends', f"stopped at row {(index // n_j) * 2 + 1} of {self.max_row}")
+                return
+            if not all:
+                self._skip_draws(self._eligible_between(prefix, closed_eligible, last, index))
+            last = index
+
+            r = (index // n_j) * 2 + 1
+            c = (index % n_j) * 2 + 1
+            if not (cell[r][c] & open_space):
+                continue
+            if cell[r][c] & stairs:
+                continue
+            if not all and self.rand.randint(0, 99) >= p:
+                continue
+            if self.is_adjacent_to_door(r, c):
+                continue
+            if self.corridor_leads_to_door(r, c):
+                continue
+
+            closed = []
+            self.collapse(r, c, self.close_end, closed)
+            for cr, cc in closed:
+                if (cr, cc) in seen_closed:
                     continue
-                self.collapse(r, c, self.close_end)
+                seen_closed.add((cr, cc))
+                if cr % 2 and cc % 2:
+                    closed_index = (cr // 2) * n_j + (cc // 2)
+                    if prefix[closed_index + 1] > prefix[closed_index]:
+                        insort(closed_eligible, closed_index)
+                # Re-queue the later odd cells whose 3x3 neighbourhood changed
+                for nr in range(cr - 1, cr + 2):
+                    if not nr % 2 or not 0 < nr <= self.max_row:
+                        continue
+                    for nc in range(cc - 1, cc + 2):
+                        if not nc % 2 or not 0 < nc <= self.max_col:
+                            continue
+                        neighbour = (nr // 2) * n_j + (nc // 2)
+                        if neighbour > last:
+                            heappush(queue, neighbour)
+
+        if not all:
+            self._skip_draws(self._eligible_between(prefix, closed_eligible, last, n_cells))
+
+    @staticmethod
+    def _eligible_between(prefix, closed_eligible, first, last):
+        """Open non-stair odd cells strictly between two scan indices"""
+        if last - first <= 1:
+            return 0
+        count = prefix[last] - prefix[first + 1]
+        return count - (bisect_right(closed_eligible, last - 1) - bisect_right(closed_eligible, first))
+
+    # randint(0, 99) takes the top 7 bits of one 32-bit output and retries when
+    # they are >= 100, i.e. a word is accepted when its top byte is below 200
+    _ACCEPTED_TOP_BYTE = bytes(1 if b < 200 else 0 for b in range(256))
+
+    def _skip_draws(self, m):
+        """Advance self.rand exactly as m calls to randint(0, 99) would"""
+        getrandbits = self.rand.getrandbits
+        while m > 0:
+            # Each word completes at most one draw, so m words never overshoot
+            words = getrandbits(32 * m).to_bytes(4 * m, 'little')
+            m -= words[3::4].translate(self._ACCEPTED_TOP_BYTE).count(1)
 
     def clean_disconnected_doors(self):
-        for r in range(self.opts['n_rows'] + 1):
-            for c in range(self.opts['n_cols'] + 1):
-                if self.cell[r][c] & self.DOORSPACE:
-                    connected = 0
-                    for dr, dc in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-                        nr, nc = r + dr, c + dc
-                        if 0 <= nr <= self.opts['n_rows'] and 0 <= nc <= self.opts['n_cols']:
-                            if self.cell[nr][nc] & ((self.ROOM | self.CORRIDOR) | self.DOORSPACE):
-                                connected += 1
-                    if connected < 2:
-                        self.cell[r][c] &= ~self.DOORSPACE
-                        self.cell[r][c] |= self.PERIMETER
-
-    def collapse(self, r, c, xc):
-        if not (self.cell[r][c] & (self.ROOM | self.CORRIDOR)):
+        """Wipe doors that lost the cell outside them
+
+        Only carved doors can be doors, so this walks the registry rather
+        than the grid. Door cells are never orthogonally adjacent, so the
+        order doesn't matter.
+        """
+        cell = self.cell
+        n_rows, n_cols = self.opts['n_rows'], self.opts['n_cols']
+        open_space = self.ROOM | self.CORRIDOR | self.DOORSPACE
+        for c, r in list(self.door_index.opened):
+            if not cell[r][c] & self.DOORSPACE:
+                continue
+            connected = 0
+            for nr, nc in ((r, c - 1), (r, c + 1), (r - 1, c), (r + 1, c)):
+                if 0 <= nr <= n_rows and 0 <= nc <= n_cols and cell[nr][nc] & open_space:
+                    connected += 1
+            if connected < 2:
+                cell[r][c] &= ~self.DOORSPACE
+                cell[r][c] |= self.PERIMETER
+                self.door_index.discard_opened(c, r)
+
+    def collapse(self, r, c, xc, closed=None):
+        """Close a dead end at (r, c) and follow it back along the corridor
+
+        Iterative like tunnel(): each frame keeps its own iterator over the
+        close_end patterns, so patterns are retried after a deeper collapse
+        finishes exactly as the recursive version did. Cells set to NOTHING
+        are appended to `closed` when a list is given.
+
+        Like remove_deadends, the walk stops at a cell next to a door: that
+        corridor is the door's way out, and closing it would cut the room
+        off behind it.
+        """
+        cell = self.cell
+        open_space = self.ROOM | self.CORRIDOR
+        n_rows = self.opts['n_rows']
+        n_cols = self.opts['n_cols']
+        protected = self._protected_cells
+        if not (cell[r][c] & open_space):
             return
-        
-        for dir, config in xc.items():
-            if not self.check_tunnel(self.cell, r, c, config):
+
+        stack = [(r, c, iter(xc.values()))]
+        while stack:
+            r, c, configs = stack[-1]
+            config = next(configs, None)
+            if config is None or (protected and (r, c) in protected):
+                stack.pop()
                 continue
-            
+
+            if 'corridor' in config:
+                if not self.check_tunnel(cell, r, c, config):
+                    continue
+            else:
+                # check_tunnel's 'walled' test inlined - this runs for every
+                # pattern of every cell along a collapsing corridor
+                walled = True
+                for dr, dc in config.get('walled', ()):
+                    nr, nc = r + dr, c + dc
+                    if 0 <= nr <= n_rows and 0 <= nc <= n_cols and cell[nr][nc] & open_space:
+                        walled = False
+                        break
+                if not walled:
+                    continue
+
             for pos in config['close']:
-                self.cell[r + pos[0]][c + pos[1]] = self.NOTHING
-            
+                cell[r + pos[0]][c + pos[1]] = self.NOTHING
+                if closed is not None:
+                    closed.append((r + pos[0], c + pos[1]))
+
             if 'recurse' in config:
                 recurse = config['recurse']
-                self.collapse(r + recurse[0], c + recurse[1], xc)
+                next_r = r + recurse[0]
+                next_c = c + recurse[1]
+                if cell[next_r][next_c] & open_space and not self.is_adjacent_to_door(next_r, next_c):
+                    stack.append((next_r, next_c, iter(xc.values())))
 
     def is_adjacent_to_door(self, r, c):
         for dr, dc in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
@@ -871,13 +1970,8 @@ class DungeonGeneratorNeo:
 
     def fix_doors(self):
         fixed = [[False] * (self.opts['n_cols'] + 1) for _ in range(self.opts['n_rows'] + 1)]
-        self.doorList = []  # We'll rebuild this from all_doors
-        
-        # Create a position map for quick lookup
-        position_map = {}
-        for door in self.all_doors:
-            pos = (door['x'], door['y'])
-            position_map[pos] = door
+        self.doorList = []  # We'll rebuild this from the opened doors
+        self.door_index.clear_final()
         
         for room in self.room:
             for dir, doors in room['door'].items():
@@ -897,8 +1991,8 @@ class DungeonGeneratorNeo:
                     
                     fixed[y][x] = True
                     
-                    # Get the original door from master list
-                    original_door = position_map.get((x, y))
+                    # Get the original door from the registry
+                    original_door = self.door_index.opened_at(x, y)
                     if original_door:
                         # Preserve original orientation
                         orientation = original_door.get('orientation', 'horizontal')
@@ -919,11 +2013,12 @@ class DungeonGeneratorNeo:
                     
                     shiny.append(new_door)
                     self.doorList.append(new_door)
+                    self.door_index.register(new_door)
                     
                     # Update opposite room if needed
                     if 'out_id' in door and door['out_id'] is not None:
                         out_id = door['out_id']
-                        out_room = next((r for r in self.room if r['id'] == out_id), None)
+                        out_room = self.door_index.room(out_id)
                         if out_room:
                             out_dir = self.opposite[dir]
                             if out_dir not in out_room['door']:
@@ -958,6 +2053,9 @@ class DungeonGeneratorNeo:
 
     def fill_blocks(self):
         """Post-processing step to fill all empty space with BLOCKED cells"""
+        if self.use_numpy:
+            self._fill_blocks_array()
+            return
         for r in range(len(self.cell)):
             for c in range(len(self.cell[r])):
                 # Only fill cells that are truly empty (NOTHING)
@@ -26,7 +26,8 @@ class MovementService:
     
     @property
     def dungeon_state(self):
-        return self.state.dungeon.state
+        # Built over the game state (which holds the dungeon) or over a DungeonStateNeo itself
+        return self.state.dungeon.state if hasattr(self.state, 'dungeon') else self.state
 
     def move(self, direction, steps=1):
         """Alias for move_party"""
@@ -98,7 +99,7 @@ class MovementService:
             return {"success": False, "message": f"Invalid direction: {direction}"}
 
         # Access the dungeon state
-        dungeon_state = self.state.dungeon.state
+        dungeon_state = self.dungeon_state
         
         # Get current position
         x0, y0 = dungeon_state.party_position
@@ -132,24 +133,8 @@ class MovementService:
         return result
 
     def is_passable(self, x: int, y: int) -> bool:
-        """Check if a cell is passable for movement"""
-        if not self.dungeon_state.grid_system.is_valid_position(x, y):
-            return False
-            
-        cell = self.dungeon_state.get_cell(x, y)
-        if not cell:
-            return False
-            
-        # Special cases
-        if cell.is_stairs:
-            return True
-        if cell.is_secret and not self.state.secret_mask[y][x]:
-            return False
-        if cell.is_door:
-            return cell.is_arch
-            
-        # Default passability
-        return not (cell.is_blocked or cell.is_perimeter)
+        """Check if a cell is passable for movement (a bitmap lookup on the state)"""
+        return self.dungeon_state.is_passable(x, y)
     
     def get_cell_type(self, x: int, y: int) -> str:
         """Get descriptive cell type"""
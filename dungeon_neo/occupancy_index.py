@@ -0,0 +1,58 @@
+class OccupancyIndex:
+    """Row bitsets of BLOCKED and ROOM cells for room placement checks
+
+    Bit c of blocked[r] / room[r] is set when cell[r][c] has that flag. A
+    rectangle test ANDs one column mask per row, so its cost depends on the
+    room height (at most room_max) rather than on the number of cells in the
+    rectangle or the size of the map. The generator updates the bitsets
+    alongside its own cell writes in emplace_room.
+    """
+
+    def __init__(self, cell, blocked_flag, room_flag):
+        self.blocked = []
+        self.room = []
+        for row in cell:
+            blocked, room = self._row_bits(row, blocked_flag, room_flag)
+            self.blocked.append(blocked)
+            self.room.append(room)
+
+    @staticmethod
+    def _row_bits(row, blocked_flag, room_flag):
+        # Most rows are still empty when rooms get placed - any() skips them
+        # at C speed, so the build only walks rows the mask actually touches
+        if not any(row):
+            return 0, 0
+        blocked = room = 0
+        for c, value in enumerate(row):
+            if value & blocked_flag:
+                blocked |= 1 << c
+            if value & room_flag:
+                room |= 1 << c
+        return blocked, room
+
+    @staticmethod
+    def span(c1, c2):
+        """Column mask covering c1..c2 inclusive"""
+        return ((1 << (c2 - c1 + 1)) - 1) << c1
+
+    def mark_blocked(self, r, c):
+        self.blocked[r] |= 1 << c
+
+    def mark_room(self, r1, c1, r2, c2):
+        span = self.span(c1, c2)
+        for r in range(r1, r2 + 1):
+            self.room[r] |= span
+
+    def any_blocked(self, r1, c1, r2, c2):
+        span = self.span(c1, c2)
+        for r in range(r1, r2 + 1):
+            if self.blocked[r] & span:
+                return True
+        return False
+
+    def any_room(self, r1, c1, r2, c2):
+        span = self.span(c1, c2)
+        for r in range(r1, r2 + 1):
+            if self.room[r] & span:
+                return True
+        return False
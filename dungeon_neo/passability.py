@@ -0,0 +1,81 @@
+from dungeon_neo.constants import CELL_FLAGS
+
+BLOCKED = CELL_FLAGS['BLOCKED']
+PERIMETER = CELL_FLAGS['PERIMETER']
+ARCH = CELL_FLAGS['ARCH']
+SECRET = CELL_FLAGS['SECRET']
+DOORSPACE = CELL_FLAGS['DOORSPACE']
+STAIRS = CELL_FLAGS['STAIRS']
+
+
+def cell_passable(value, revealed=False):
+    """Whether a party can walk onto a cell with these flags
+
+    The one rule movement, pathing and DungeonSystem share: stairs always,
+    doors only when they are arches (and, for secret ones, revealed),
+    anything else unless it is rock, wall or empty.
+    """
+    if value & STAIRS:
+        return True
+    if value & DOORSPACE:
+        return bool(value & ARCH) and (revealed or not value & SECRET)
+    return bool(value) and not value & (BLOCKED | PERIMETER)
+
+
+def cell_opaque(value):
+    """Whether a cell with these flags blocks line of sight"""
+    if value & DOORSPACE:
+        return not value & ARCH
+    return not value or bool(value & (BLOCKED | PERIMETER))
+
+
+class PassabilityMap:
+    """Passable and opaque bitmaps for a fixed-size grid
+
+    One byte per cell in each bytearray, indexed y * width + x. build() fills
+    them from the cell flags once after generation; every later change to a
+    cell goes through update(), which re-derives just that cell's bits and
+    bumps `version`, so caches built on top (paths, FOV) can tell when they
+    are stale. Lookups outside the grid read as impassable and opaque.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.passable = bytearray(width * height)
+        self.opaque = bytearray(width * height)
+        self.version = 0
+
+    def build(self, values, revealed=None):
+        """Fill both bitmaps from flat row-major flags; revealed(x, y) for secrets"""
+        known = {}
+        passable, opaque = self.passable, self.opaque
+        for index, value in enumerate(values):
+            bits = known.get(value)
+            if bits is None:
+                bits = known[value] = (cell_passable(value), cell_opaque(value))
+            passable[index], opaque[index] = bits
+        if revealed:
+            # Only secret doors care whether they were found
+            for index, value in enumerate(values):
+                if value & SECRET:
+                    y, x = divmod(index, self.width)
+                    passable[index] = cell_passable(value, revealed(x, y))
+        self.version += 1
+
+    def update(self, x, y, value, revealed=False):
+        """Re-derive one cell's bits after its flags (or secret state) changed"""
+        index = y * self.width + x
+        self.passable[index] = cell_passable(value, revealed)
+        self.opaque[index] = cell_opaque(value)
+        self.version += 1
+
+    def passable_at(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.passable[y * self.width + x] == 1
+        return False
+
+    def opaque_at(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.opaque[y * self.width + x] == 1
+        return True
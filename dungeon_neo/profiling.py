@@ -0,0 +1,140 @@
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+
+class LogSink:
+    """Print one line per generation"""
+
+    def emit(self, record):
+        phases = ' '.join(f"{name}={ms:.1f}" for name, ms in record['phases'].items())
+        print(f"Dungeon timing {record['n_rows']}x{record['n_cols']} seed={record['seed']} "
+              f"total={record['total_ms']:.1f}ms {phases}")
+
+
+class RingBufferSink:
+    """Keep the last `capacity` records in memory for the API"""
+
+    def __init__(self, capacity=100):
+        self._records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        self._records.append(record)
+
+    def records(self, limit=None):
+        records = list(self._records)
+        return records[-limit:] if limit else records
+
+    def clear(self):
+        self._records.clear()
+
+
+class JsonLinesSink:
+    """Append each record as one JSON line"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+
+
+class PhaseTimer:
+    """Times the phases of create_dungeon and hands the result to sinks
+
+    A generator with a timer attached wraps each phase in timer.phase(run,
+    name). One timer can be shared by several generators and threads, since
+    everything about a single generation lives in its own run dict.
+
+    profile_phase names one phase to run under cProfile (profile_mode
+    'cprofile') or tracemalloc ('tracemalloc'); the report is stored in the
+    record under 'profile'. on_phase(name, ms) is called after every phase
+    and may raise to abort the generation.
+    """
+
+    def __init__(self, sinks=None, profile_phase=None, profile_mode='cprofile',
+                 profile_limit=20, on_phase=None):
+        self.sinks = list(sinks) if sinks else []
+        self.profile_phase = profile_phase
+        self.profile_mode = profile_mode
+        self.profile_limit = profile_limit
+        self.on_phase = on_phase
+
+    def begin(self, **meta):
+        run = dict(meta)
+        run['phases'] = {}
+        run['_start'] = time.perf_counter()
+        return run
+
+    @contextmanager
+    def phase(self, run, name):
+        profiling = name == self.profile_phase
+        if profiling:
+            stop_profile = self._start_profile()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            run['phases'][name] = elapsed
+            if profiling:
+                run['profile'] = {'phase': name, 'mode': self.profile_mode,
+                                  'report': stop_profile()}
+        if self.on_phase:
+            self.on_phase(name, elapsed)
+
+    def finish(self, run):
+        run['total_ms'] = (time.perf_counter() - run.pop('_start')) * 1000
+        for sink in self.sinks:
+            try:
+                sink.emit(run)
+            except Exception as e:
+                print(f"Timing sink {type(sink).__name__} failed: {str(e)}")
+        return run
+
+    def _start_profile(self):
+        if self.profile_mode == 'tracemalloc':
+            return self._start_tracemalloc()
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def stop():
+            profiler.disable()
+            out = io.StringIO()
+            stats = pstats.Stats(profiler, stream=out)
+            stats.sort_stats('cumulative').print_stats(self.profile_limit)
+            return out.getvalue()
+        return stop
+
+    def _start_tracemalloc(self):
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        base = tracemalloc.get_traced_memory()[0]
+
+        def stop():
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            if started_here:
+                tracemalloc.stop()
+            top = after.compare_to(before, 'lineno')[:self.profile_limit]
+            return {
+                'allocated_kb': (current - base) / 1024,
+                # Only a tracer started here has a peak that belongs to this
+                # phase; someone else's isn't ours to reset
+                'peak_kb': (peak - base) / 1024 if started_here else None,
+                'top': [str(stat) for stat in top]
+            }
+        return stop
@@ -76,9 +76,18 @@ class DungeonRendererNeo:
             return self.create_composite_image(dungeon_img, icons)
         return dungeon_img
 
+    def _view_bounds(self, state):
+        """(x0, y0, x1, y1) cells to draw: the whole map, or for an endless
+        grid a window around the party over the chunks already loaded"""
+        grid_system = state.grid_system
+        if hasattr(grid_system, 'view_bounds'):
+            return grid_system.view_bounds(*state.party_position)
+        return 0, 0, state.width, state.height
+
     def _render_dungeon(self, state: DungeonStateNeo, debug_show_all=False, visibility_system=None):
-        width = state.width * self.cell_size
-        height = state.height * self.cell_size
+        view_x0, view_y0, view_x1, view_y1 = self._view_bounds(state)
+        width = (view_x1 - view_x0) * self.cell_size
+        height = (view_y1 - view_y0) * self.cell_size
         base_img = Image.new('RGB', (width, height), self.COLORS['blocked'])
         base_draw = ImageDraw.Draw(base_img)
         cs = self.cell_size
@@ -88,6 +97,7 @@ class DungeonRendererNeo:
         
         # DEBUG: Draw red dot at party position
         party_y, party_x = state.party_position
+        party_y, party_x = party_y - view_x0, party_x - view_y0
         base_draw.ellipse([
             party_y*cs + cs//3,
             party_x*cs + cs//3,
@@ -100,19 +110,33 @@ class DungeonRendererNeo:
         visible_count = 0
 
         print(f"Rendering with visibility_system: {visibility_system is not None}")
+
+        # Flat grids expose their flag buffer: plain rock needs no cell at all,
+        # the background already has its colour
+        grid_system = state.grid_system
+        flags = getattr(grid_system, 'flags', None)
+        drawn = self.ROOM | self.CORRIDOR | self.DOORSPACE | self.STAIRS | self.LABEL
+        # Endless grids: read loaded chunks only, never generate while drawing
+        get_cell = getattr(grid_system, 'peek_cell', state.get_cell)
         
         # Draw cells with visibility handling
-        for x in range(state.width):
-            for y in range(state.height):
+        for x in range(view_x0, view_x1):
+            for y in range(view_y0, view_y1):
             
-                cell = state.get_cell(x, y)
-                x_pix = x * cs
-                y_pix = y * cs
-
                 is_visible = visibility_system and visibility_system.is_visible(x, y)
                 
                 if is_visible:
                     visible_count += 1
+
+                if flags is not None and not flags[y * grid_system.width + x] & drawn \
+                        and (x, y) not in grid_system.extra:
+                    continue
+
+                cell = get_cell(x, y)
+                if not cell:
+                    continue
+                x_pix = (x - view_x0) * cs
+                y_pix = (y - view_y0) * cs
                 
                 # Handle secrets first
                 if cell.is_secret:
@@ -183,44 +207,38 @@ class DungeonRendererNeo:
                 if cell.has_label:
                     self._draw_label(base_draw, x_pix, y_pix, cell)
 
-                # Render entities as text overlays
-                for entity in cell.entities:
-                    # Create text overlay for entity
-                    overlay = Overlay(
-                        primitive="text",
-                        content=entity.get_symbol(),
-                        color=(255, 255, 255),
-                    )
-                    overlay.render(draw, x_pix, y_pix, cs)
-                
-                # Render other overlays
-                for overlay in cell.overlays:
-                    overlay.render(draw, x_pix, y_pix, cs)
+        # Entities and overlays live in the state's sparse stores, so this
+        # only visits cells that have any (Overlay.render takes cell coords)
+        for x, y, entities in state.entities.occupied():
+            if not (view_x0 <= x < view_x1 and view_y0 <= y < view_y1):
+                continue
+            x, y = x - view_x0, y - view_y0
+            # Render entities as text overlays
+            for entity in entities:
+                overlay = Overlay(
+                    primitive="text",
+                    content=entity.get_symbol(),
+                    color=(255, 255, 255),
+                )
+                overlay.render(base_draw, x, y, cs)
+
+        # Render other overlays
+        for x, y, overlays in state.overlays.occupied():
+            if not (view_x0 <= x < view_x1 and view_y0 <= y < view_y1):
+                continue
+            x, y = x - view_x0, y - view_y0
+            for overlay in overlays:
+                overlay.render(base_draw, x, y, cs)
                 
         # Draw grid on top of cells
         self._draw_grid(base_draw, width, height)
 
-        # In the _render_dungeon method, after drawing the base cell:
-        # Render entities as text overlays
-        for entity in cell.entities:
-            overlay = Overlay(
-                primitive="text",
-                content=entity.get_symbol(),
-                color=(255, 255, 255),
-                size=1.0
-            )
-            overlay.render(draw, y, x, self.cell_size)  # Note: x and y swapped
-
-        # Render other overlays
-        for overlay in cell.overlays:
-            overlay.render(draw, y, x, self.cell_size)  # Note: x and y swapped
-
         # Draw party icon last
         self._draw_party_icon(base_draw, party_y * cs, party_x * cs)
 
         # --- Fog layer
         
-        print(f"Visible count: {visible_count}/{state.width*state.height}")
+        print(f"Visible count: {visible_count}/{(view_x1 - view_x0) * (view_y1 - view_y0)}")
         visited_count = 0
         if not debug_show_all and visibility_system:
             # Create fog layer
@@ -229,13 +247,14 @@ class DungeonRendererNeo:
             
             # Cut holes for visible cells
 
-            for y in range(state.height):
-                for x in range(state.width):
+            for y in range(view_y0, view_y1):
+                for x in range(view_x0, view_x1):
                     if visibility_system.is_visible(x, y):
                         visited_count += 1
                         # Make this cell transparent in fog layer
+                        px, py = x - view_x0, y - view_y0
                         fog_draw.rectangle(
-                            [x*cs, y*cs, (x+1)*cs, (y+1)*cs], # swapping x and y
+                            [px*cs, py*cs, (px+1)*cs, (py+1)*cs], # swapping x and y
                             fill=(0, 0, 0, 0)  # Fully transparent
                         )
             # this allowed me to prove I could cut a hole in the fog
@@ -249,7 +268,7 @@ class DungeonRendererNeo:
             base_rgba = base_img.convert('RGBA')
             composite = Image.alpha_composite(base_rgba, fog_img)
             result_img = composite.convert('RGB')
-            print(f"visited cells: {visited_count}/{state.width*state.height}")
+            print(f"visited cells: {visited_count}/{(view_x1 - view_x0) * (view_y1 - view_y0)}")
 
             print("fog")
         else:
@@ -0,0 +1,219 @@
+"""Compact binary form of a generator_result
+
+Layout (all little-endian):
+
+    header   '<4sHHIIIIII'  magic, version, flags, n_rows, n_cols,
+                            n_doors, n_stairs, n_rooms, seed length
+    seed     UTF-8 JSON of the seed (usually a few bytes)
+    doors    '<HHBBi' per door   x, y, orientation, key, out_id (-1 = None)
+    stairs   '<HHbbBB' per stair x, y, dx, dy, key, orientation
+    rooms    '<HHHHH' per room   id, north, south, west, east
+    grid     (n_rows + 1) * (n_cols + 1) uint32 cells, row major, or with
+             FLAG_RLE a uint32 run count, then that many uint16 run lengths,
+             then that many uint32 run values
+
+decode_result hands the grid back as one memoryview per row over the
+input buffer, so nothing is copied for a raw grid. Rows index like the
+generator's lists (grid[y][x]) and DungeonStateNeo builds from them
+directly. Run-length encoded grids have to be expanded, into array('I')
+rows. RLE only pays off on maps with large uniform areas (masked layouts,
+sparse Scattered maps); busy Packed maps have runs of two or three cells.
+Rooms come back without their per-direction door lists, which only
+repeat the 'doors' entries.
+"""
+import json
+import struct
+import sys
+from array import array
+
+MAGIC = b'DNGR'
+VERSION = 1
+FLAG_RLE = 0x1
+
+HEADER = struct.Struct('<4sHHIIIIII')
+DOOR = struct.Struct('<HHBBi')
+STAIR = struct.Struct('<HHbbBB')
+ROOM = struct.Struct('<HHHHH')
+COUNT = struct.Struct('<I')
+
+ORIENTATIONS = ['horizontal', 'vertical']
+DOOR_KEYS = ['door', 'arch', 'open', 'lock', 'trap', 'secret', 'portc', 'potential']
+STAIR_KEYS = ['down', 'up']
+
+LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def _code(table, value, what):
+    try:
+        return table.index(value)
+    except ValueError:
+        raise ValueError(f"Cannot encode {what} {value!r}")
+
+
+def encode_result(result, seed=None, rle=False):
+    """Pack a generator_result into bytes"""
+    grid = result['grid']
+    n_rows, n_cols = result['n_rows'], result['n_cols']
+    width = n_cols + 1
+    if seed is None:
+        seed = result.get('seed')
+    seed_bytes = json.dumps(seed).encode('utf-8')
+
+    doors, stairs, rooms = result['doors'], result['stairs'], result['rooms']
+    parts = [
+        HEADER.pack(MAGIC, VERSION, FLAG_RLE if rle else 0, n_rows, n_cols,
+                    len(doors), len(stairs), len(rooms), len(seed_bytes)),
+        seed_bytes
+    ]
+    for door in doors:
+        out_id = door.get('out_id')
+        parts.append(DOOR.pack(door['x'], door['y'],
+                               _code(ORIENTATIONS, door.get('orientation', 'horizontal'), 'orientation'),
+                               _code(DOOR_KEYS, door.get('key', 'door'), 'door key'),
+                               -1 if out_id is None else out_id))
+    for stair in stairs:
+        parts.append(STAIR.pack(stair['x'], stair['y'], stair['dx'], stair['dy'],
+                                _code(STAIR_KEYS, stair['key'], 'stair key'),
+                                _code(ORIENTATIONS, stair.get('orientation', 'horizontal'), 'orientation')))
+    for room in rooms:
+        parts.append(ROOM.pack(room['id'], room['north'], room['south'], room['west'], room['east']))
+
+    cells = array('I')
+    for row in grid[:n_rows + 1]:
+        if len(row) != width:
+            raise ValueError(f"Grid row has {len(row)} cells, expected {width}")
+        cells.extend(row)
+
+    if rle:
+        parts.append(_encode_runs(cells))
+    else:
+        if not LITTLE_ENDIAN:
+            cells.byteswap()
+        parts.append(cells.tobytes())
+    return b''.join(parts)
+
+
+def _encode_runs(cells):
+    lengths, values = array('H'), array('I')
+    if cells:
+        value, length = cells[0], 0
+        for cell in cells:
+            if cell == value and length < 0xFFFF:
+                length += 1
+            else:
+                lengths.append(length)
+                values.append(value)
+                value, length = cell, 1
+        lengths.append(length)
+        values.append(value)
+    if not LITTLE_ENDIAN:
+        lengths.byteswap()
+        values.byteswap()
+    return COUNT.pack(len(values)) + lengths.tobytes() + values.tobytes()
+
+
+def _need(view, end):
+    if len(view) < end:
+        raise ValueError(f"Encoded dungeon result is truncated ({len(view)} bytes, need {end})")
+
+
+def decode_result(data):
+    """Unpack bytes from encode_result into a generator_result-shaped dict"""
+    view = memoryview(data)
+    _need(view, HEADER.size)
+    magic, version, flags, n_rows, n_cols, n_doors, n_stairs, n_rooms, seed_len = \
+        HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("Not an encoded dungeon result")
+    if version != VERSION:
+        raise ValueError(f"Unsupported dungeon result version {version}")
+
+    offset = HEADER.size
+    _need(view, offset + seed_len + n_doors * DOOR.size + n_stairs * STAIR.size + n_rooms * ROOM.size)
+    seed = json.loads(bytes(view[offset:offset + seed_len]).decode('utf-8'))
+    offset += seed_len
+
+    doors = []
+    for x, y, orientation, key, out_id in DOOR.iter_unpack(view[offset:offset + n_doors * DOOR.size]):
+        doors.append({
+            'x': x,
+            'y': y,
+            'orientation': ORIENTATIONS[orientation],
+            'key': DOOR_KEYS[key],
+            'out_id': None if out_id < 0 else out_id
+        })
+    offset += n_doors * DOOR.size
+
+    stairs = []
+    for x, y, dx, dy, key, orientation in STAIR.iter_unpack(view[offset:offset + n_stairs * STAIR.size]):
+        stairs.append({
+            'x': x,
+            'y': y,
+            'dx': dx,
+            'dy': dy,
+            'key': STAIR_KEYS[key],
+            'orientation': ORIENTATIONS[orientation]
+        })
+    offset += n_stairs * STAIR.size
+
+    rooms = []
+    for room_id, north, south, west, east in ROOM.iter_unpack(view[offset:offset + n_rooms * ROOM.size]):
+        height = (south - north + 1) * 10
+        width = (east - west + 1) * 10
+        rooms.append({
+            'id': room_id, 'row': north, 'col': west,
+            'north': north, 'south': south, 'west': west, 'east': east,
+            'height': height, 'width': width, 'area': height * width
+        })
+    offset += n_rooms * ROOM.size
+
+    width = n_cols + 1
+    height = n_rows + 1
+    if flags & FLAG_RLE:
+        grid = _decode_runs(view, offset, height, width)
+    else:
+        grid = _grid_rows(view[offset:offset + height * width * 4], height, width)
+
+    return {
+        'seed': seed,
+        'grid': grid,
+        'stairs': stairs,
+        'doors': doors,
+        'rooms': rooms,
+        'n_rows': n_rows,
+        'n_cols': n_cols
+    }
+
+
+def _grid_rows(view, height, width):
+    if len(view) != height * width * 4:
+        raise ValueError("Encoded grid is truncated")
+    if not LITTLE_ENDIAN:
+        cells = array('I', view.tobytes())
+        cells.byteswap()
+        return [cells[r * width:(r + 1) * width] for r in range(height)]
+    # Zero-copy: each row is a uint32 view into the caller's buffer
+    row_bytes = width * 4
+    return [view[r * row_bytes:(r + 1) * row_bytes].cast('I') for r in range(height)]
+
+
+def _decode_runs(view, offset, height, width):
+    _need(view, offset + COUNT.size)
+    (n_runs,) = COUNT.unpack_from(view, offset)
+    offset += COUNT.size
+    _need(view, offset + n_runs * 6)
+    lengths = array('H', view[offset:offset + n_runs * 2].tobytes())
+    offset += n_runs * 2
+    values = array('I', view[offset:offset + n_runs * 4].tobytes())
+    if not LITTLE_ENDIAN:
+        lengths.byteswap()
+        values.byteswap()
+
+    # Expanding through a list is a lot quicker than growing the array
+    expanded = []
+    for value, length in zip(values, lengths):
+        expanded += [value] * length
+    cells = array('I', expanded)
+    if len(cells) != height * width:
+        raise ValueError("Encoded grid runs do not cover the map")
+    return [cells[r * width:(r + 1) * width] for r in range(height)]
@@ -0,0 +1,223 @@
+from collections import deque
+from dungeon_neo.constants import CELL_FLAGS
+
+
+class RoomGraph:
+    """Rooms and the corridors between them, joined by doors
+
+    Nodes are 'room:<id>' for rooms and 'corridor:<n>' for connected runs of
+    corridor cells. Every door is an edge between the two nodes on either
+    side of it, tagged with its position, key (arch/open/lock/...) and
+    orientation, so two rooms can be joined by several edges. Corridor
+    nodes list their junction cells (three or more open sides) and any
+    stairs in them.
+
+    The graph is built once from the finished grid and door list - one walk
+    over the corridor cells reachable from doors and stairs - and after that
+    reachability and path questions cost O(rooms + doors).
+    """
+
+    ROOM = CELL_FLAGS['ROOM']
+    CORRIDOR = CELL_FLAGS['CORRIDOR']
+    ROOM_ID = CELL_FLAGS['ROOM_ID']
+    DOORSPACE = CELL_FLAGS['DOORSPACE']
+    STAIRS = CELL_FLAGS['STAIRS']
+
+    # Door flag -> door 'key', as the generator names them
+    DOOR_KEYS = {
+        CELL_FLAGS['ARCH']: 'arch',
+        CELL_FLAGS['DOOR']: 'open',
+        CELL_FLAGS['LOCKED']: 'lock',
+        CELL_FLAGS['TRAPPED']: 'trap',
+        CELL_FLAGS['SECRET']: 'secret',
+        CELL_FLAGS['PORTC']: 'portc'
+    }
+
+    def __init__(self):
+        self.nodes = {}      # node id -> attributes
+        self.edges = []      # door edges
+        self.adjacency = {}  # node id -> list of (neighbour, edge)
+        self.n_corridors = 0
+
+    # Building
+
+    @classmethod
+    def build(cls, grid, doors, rooms, stairs=None):
+        """Build the graph from a generator result's grid, doors, rooms and stairs"""
+        graph = cls()
+        for room in rooms:
+            graph._add_node(f"room:{room['id']}", type='room', id=room['id'],
+                            north=room['north'], south=room['south'],
+                            west=room['west'], east=room['east'])
+
+        # Corridor node number per cell, flat index row * width + col
+        height, width = len(grid), len(grid[0]) if grid else 0
+        corridor_of = [-1] * (height * width)
+        for door in doors:
+            x, y = door['x'], door['y']  # column, row
+            # A door has open cells on both sides along one axis and walls on
+            # the other. Check the cells rather than trusting 'orientation',
+            # which follows the generator's direction names, not the grid axes.
+            for sides in (((y, x - 1), (y, x + 1)), ((y - 1, x), (y + 1, x))):
+                ends = [graph._node_at(grid, r, c, corridor_of) for r, c in sides]
+                if None not in ends:
+                    break
+            else:
+                continue
+            graph._add_edge(ends[0], ends[1], x=x, y=y, key=door.get('key', 'door'),
+                            orientation=door.get('orientation', 'horizontal'))
+
+        for stair in stairs or []:
+            # Stair dicts carry the row in 'x' and the column in 'y'
+            node = graph._node_at(grid, stair['x'], stair['y'], corridor_of)
+            if node:
+                graph.nodes[node].setdefault('stairs', []).append(
+                    {'row': stair['x'], 'col': stair['y'], 'key': stair['key']})
+        return graph
+
+    @classmethod
+    def from_grid(cls, grid, rooms, orientations=None):
+        """Build the graph from flags alone, reading doors and stairs off the grid
+
+        For grids that were edited after generation, where the result's door
+        and stair lists no longer match. orientations maps (x, y) to a door's
+        orientation.
+        """
+        doors, stairs = [], []
+        door_space, stair_dn = cls.DOORSPACE, CELL_FLAGS['STAIR_DN']
+        for r, row in enumerate(grid):
+            for c, value in enumerate(row):
+                if value & door_space:
+                    doors.append({'x': c, 'y': r, 'key': cls.DOOR_KEYS.get(value & door_space, 'door'),
+                                  'orientation': (orientations or {}).get((c, r), 'horizontal')})
+                elif value & cls.STAIRS:
+                    stairs.append({'x': r, 'y': c, 'key': 'down' if value & stair_dn else 'up'})
+        return cls.build(grid, doors, rooms, stairs)
+
+    def _add_node(self, node, **attrs):
+        self.nodes[node] = attrs
+        self.adjacency.setdefault(node, [])
+
+    def _add_edge(self, a, b, **attrs):
+        edge = dict(attrs, a=a, b=b)
+        self.edges.append(edge)
+        self.adjacency[a].append((b, edge))
+        if b != a:
+            self.adjacency[b].append((a, edge))
+
+    def _node_at(self, grid, r, c, corridor_of):
+        """Node id for the cell at (r, c), labelling its corridor on first sight"""
+        height, width = len(grid), len(grid[0])
+        if not (0 <= r < height and 0 <= c < width):
+            return None
+        value = grid[r][c]
+        if value & self.ROOM:
+            room_id = (value & self.ROOM_ID) >> 6
+            node = f"room:{room_id}"
+            if node not in self.nodes:
+                self._add_node(node, type='room', id=room_id)
+            return node
+
+        corridor, not_corridor = self.CORRIDOR, self.ROOM | self.DOORSPACE
+        if not (value & corridor) or value & not_corridor:
+            return None
+        label = corridor_of[r * width + c]
+        if label >= 0:
+            return f"corridor:{label}"
+
+        # Flood the corridor this cell belongs to
+        label = self.n_corridors
+        self.n_corridors += 1
+        open_space = self.ROOM | self.CORRIDOR | self.DOORSPACE
+        cells, junctions = 0, []
+        corridor_of[r * width + c] = label
+        stack = [(r, c)]
+        while stack:
+            cr, cc = stack.pop()
+            cells += 1
+            open_sides = 0
+            for nr, nc in ((cr - 1, cc), (cr + 1, cc), (cr, cc - 1), (cr, cc + 1)):
+                if nr < 0 or nc < 0 or nr >= height or nc >= width:
+                    continue
+                neighbour = grid[nr][nc]
+                if not neighbour & open_space:
+                    continue
+                open_sides += 1
+                if neighbour & corridor and not neighbour & not_corridor:
+                    index = nr * width + nc
+                    if corridor_of[index] < 0:
+                        corridor_of[index] = label
+                        stack.append((nr, nc))
+            if open_sides >= 3:
+                junctions.append((cr, cc))
+        node = f"corridor:{label}"
+        self._add_node(node, type='corridor', cells=cells, junctions=sorted(junctions))
+        return node
+
+    # Queries
+
+    def neighbours(self, node):
+        return [other for other, _ in self.adjacency.get(node, [])]
+
+    def doors_between(self, a, b):
+        return [edge for other, edge in self.adjacency.get(a, []) if other == b]
+
+    def reachable(self, start, passable=None):
+        """Nodes reachable from start; passable(edge) can rule doors out"""
+        if start not in self.nodes:
+            return set()
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for other, edge in self.adjacency[node]:
+                if other in seen or (passable and not passable(edge)):
+                    continue
+                seen.add(other)
+                queue.append(other)
+        return seen
+
+    def path(self, start, goal, passable=None):
+        """Fewest-doors node path from start to goal, or None"""
+        if start not in self.nodes or goal not in self.nodes:
+            return None
+        came_from = {start: None}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if node == goal:
+                route = []
+                while node is not None:
+                    route.append(node)
+                    node = came_from[node]
+                return route[::-1]
+            for other, edge in self.adjacency[node]:
+                if other in came_from or (passable and not passable(edge)):
+                    continue
+                came_from[other] = node
+                queue.append(other)
+        return None
+
+    def components(self, passable=None):
+        """Connected groups of nodes, largest first"""
+        remaining = set(self.nodes)
+        groups = []
+        for node in self.nodes:
+            if node in remaining:
+                group = self.reachable(node, passable)
+                remaining -= group
+                groups.append(group)
+        return sorted(groups, key=len, reverse=True)
+
+    def unreachable_rooms(self, start, passable=None):
+        """Room ids that cannot be reached from start"""
+        reached = self.reachable(start, passable)
+        return sorted(attrs['id'] for node, attrs in self.nodes.items()
+                      if attrs['type'] == 'room' and node not in reached)
+
+    def to_dict(self):
+        """JSON-friendly view for the API"""
+        return {
+            'nodes': [dict(attrs, node=node) for node, attrs in self.nodes.items()],
+            'edges': list(self.edges)
+        }
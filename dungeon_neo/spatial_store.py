@@ -0,0 +1,101 @@
+class SpatialStore:
+    """Sparse (x, y) -> objects store for entities and overlays
+
+    Only occupied cells are kept: `cells` maps a position to the list of
+    objects on it, and a spatial hash groups those positions into
+    bucket_size x bucket_size buckets so rectangle and radius queries only
+    look at buckets overlapping the query, not the whole grid. Each object
+    remembers where it is, so move() and remove() need only the object.
+    before_change(x, y), if set, is called before any cell's objects change.
+    """
+
+    def __init__(self, bucket_size=8):
+        self.bucket_size = bucket_size
+        self.cells = {}    # (x, y) -> [objects]
+        self.buckets = {}  # (bx, by) -> {(x, y), ...} occupied cells
+        self.where = {}    # id(obj) -> (x, y)
+        self.before_change = None
+
+    def __len__(self):
+        return len(self.where)
+
+    def __bool__(self):
+        return bool(self.cells)
+
+    def _bucket(self, x, y):
+        return (x // self.bucket_size, y // self.bucket_size)
+
+    def add(self, x, y, obj):
+        if id(obj) in self.where:
+            self.remove(obj)
+        if self.before_change:
+            self.before_change(x, y)
+        objects = self.cells.get((x, y))
+        if objects is None:
+            objects = self.cells[(x, y)] = []
+            self.buckets.setdefault(self._bucket(x, y), set()).add((x, y))
+        objects.append(obj)
+        self.where[id(obj)] = (x, y)
+
+    def remove(self, obj):
+        """Take obj out of the store; returns where it was, or None"""
+        pos = self.where.get(id(obj))
+        if pos is None:
+            return None
+        if self.before_change:
+            self.before_change(*pos)
+        del self.where[id(obj)]
+        objects = self.cells[pos]
+        objects.remove(obj)
+        if not objects:
+            del self.cells[pos]
+            bucket = self._bucket(*pos)
+            self.buckets[bucket].discard(pos)
+            if not self.buckets[bucket]:
+                del self.buckets[bucket]
+        return pos
+
+    def move(self, obj, x, y):
+        """Move obj to (x, y); False if it isn't in the store"""
+        if id(obj) not in self.where:
+            return False
+        self.remove(obj)
+        self.add(x, y, obj)
+        return True
+
+    def position(self, obj):
+        return self.where.get(id(obj))
+
+    def at(self, x, y):
+        """Objects on one cell (a copy, safe to iterate while moving them)"""
+        return list(self.cells.get((x, y), ()))
+
+    def occupied(self):
+        """(x, y, objects) for every occupied cell - O(occupied), not O(W*H)"""
+        for (x, y), objects in list(self.cells.items()):
+            yield x, y, list(objects)
+
+    def in_rect(self, x0, y0, x1, y1):
+        """(x, y, obj) for objects with x0 <= x < x1 and y0 <= y < y1"""
+        bx0, by0 = self._bucket(x0, y0)
+        bx1, by1 = self._bucket(x1 - 1, y1 - 1)
+        for bx in range(bx0, bx1 + 1):
+            for by in range(by0, by1 + 1):
+                for x, y in list(self.buckets.get((bx, by), ())):
+                    if x0 <= x < x1 and y0 <= y < y1:
+                        for obj in list(self.cells[(x, y)]):
+                            yield x, y, obj
+
+    def in_radius(self, x, y, radius):
+        """(x, y, obj) within `radius` steps of (x, y)
+
+        Distance is Manhattan, the same diamond VisibilitySystemNeo lights.
+        """
+        for ox, oy, obj in self.in_rect(x - radius, y - radius, x + radius + 1, y + radius + 1):
+            if abs(ox - x) + abs(oy - y) <= radius:
+                yield ox, oy, obj
+
+    def clear_area(self, x0, y0, x1, y1):
+        """Drop everything in [x0, x1) x [y0, y1), e.g. an evicted chunk"""
+        for _, _, obj in list(self.in_rect(x0, y0, x1, y1)):
+            self.remove(obj)
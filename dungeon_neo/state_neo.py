@@ -1,8 +1,15 @@
+from collections import defaultdict
 from typing import List, Dict, Any, Tuple, Optional, Union
 from dungeon_neo.grid_system import GridSystem
+from dungeon_neo.flat_grid import FlatGridSystem
 from dungeon_neo.constants import CELL_FLAGS, DIRECTION_VECTORS_8
 from dungeon_neo.cell_neo import DungeonCellNeo
 from dungeon_neo.visibility_neo import VisibilitySystemNeo
+from dungeon_neo.result_codec import decode_result
+from dungeon_neo.room_graph import RoomGraph
+from dungeon_neo.passability import PassabilityMap, cell_passable, cell_opaque
+from dungeon_neo.spatial_store import SpatialStore
+from dungeon_neo.edit_history import EditHistory
 
 class DungeonStateNeo:
     NOTHING = CELL_FLAGS['NOTHING']
@@ -22,25 +29,34 @@ class DungeonStateNeo:
     STAIR_UP = CELL_FLAGS['STAIR_UP']
     LABEL = CELL_FLAGS['LABEL']
 
-    def __init__(self, generator_result):
-        self.generator_result = generator_result
+    def __init__(self, generator_result, flat_grid=False):
+        # The result itself isn't kept: with reuse_buffers its grid rows are
+        # overwritten by the generator's next dungeon
         self.n_cols = generator_result['n_cols']
         self.n_rows = generator_result['n_rows']
         
-        # Create grid system with proper dimensions
-        self.grid_system = GridSystem(
+        # Create grid system with proper dimensions. A flat grid keeps the
+        # flags in one buffer and only makes objects for cells with data.
+        grid_class = FlatGridSystem if flat_grid else GridSystem
+        self.grid_system = grid_class(
             width=self.n_cols + 1,
             height=self.n_rows + 1
         )
 
         # Initialize orientation lookups before _populate_grid
-        self.door_orientations = {}
-        for door in generator_result.get('doors', []):
-            #print(f"2a state door {door}")
-            x, y = door['x'], door['y']
-            orientation = door.get('orientation', 'horizontal')
-            self.door_orientations[(x, y)] = orientation
-            #print(f"2b state store ({x},{y}) = {orientation}")
+        self.door_index = generator_result.get('door_index')
+        if self.door_index is not None:
+            # The generator already keeps orientations keyed by position
+            self.door_orientations = dict(self.door_index.orientations)
+        else:
+            # Results without a registry (e.g. compact batch results)
+            self.door_orientations = {}
+            for door in generator_result.get('doors', []):
+                #print(f"2a state door {door}")
+                x, y = door['x'], door['y']
+                orientation = door.get('orientation', 'horizontal')
+                self.door_orientations[(x, y)] = orientation
+                #print(f"2b state store ({x},{y}) = {orientation}")
 
         # print("=== STATE DOOR ORIENTATIONS ===")
         # for (x,y), orient in self.door_orientations.items():
@@ -55,9 +71,28 @@ class DungeonStateNeo:
             #print(f"STORED: Stair at ({x},{y}) orientation={orientation}")
 
         self._populate_grid(generator_result['grid'])
+
+        # Room/corridor connectivity is built from the live flags on first
+        # use (see room_graph), and dropped whenever a cell's flags change
+        self.rooms = generator_result.get('rooms', [])
+        self._room_graph = None
         
         # Initialize secret mask
         self.secret_mask = [[False] * self.grid_system.width for _ in range(self.grid_system.height)]
+
+        # Passable/opaque bitmaps, kept in step by set_cell_flags and the
+        # secret setters; movement and visibility only read these
+        self.passability = PassabilityMap(self.grid_system.width, self.grid_system.height)
+        self.passability.build(self._flag_values())
+
+        # Entities and overlays by position; only occupied cells are stored
+        self.entities = SpatialStore()
+        self.overlays = SpatialStore()
+
+        # Undo/redo for map edits; unchanged chunks are never copied
+        self.history = EditHistory(self)
+        self.entities.before_change = self.touch
+        self.overlays.before_change = self.touch
         
         # Initialize party position
         self._party_position = (0, 0)
@@ -66,6 +101,54 @@ class DungeonStateNeo:
         self.visibility_system = None # Will be set later
         self.movement = None # Will be set later
 
+    @classmethod
+    def endless(cls, world):
+        """State over a dungeon_neo.chunked_grid.ChunkedGridSystem
+
+        Cells, door and stair orientations come from whichever chunks the
+        world has loaded. Per-cell state for chunks it drops (revealed
+        secrets, seen cells, entities and overlays) is dropped along with
+        them.
+        """
+        state = cls.__new__(cls)
+        state.n_cols = state.n_rows = world.chunk_size - 1
+        state.grid_system = world
+        state.door_index = None
+        state.door_orientations = world.door_orientations
+        state.stair_orientations = world.stair_orientations
+        state.stairs = []
+        # No fixed extent to build a graph over
+        state.rooms = None
+        state._room_graph = None
+        # Sparse: unset cells read as hidden
+        state.secret_mask = defaultdict(lambda: defaultdict(bool))
+        # No fixed extent to build bitmaps over; lookups read the cells
+        state.passability = None
+        state.entities = SpatialStore()
+        state.overlays = SpatialStore()
+        # Chunks come and go with exploration, so there is nothing stable to roll back
+        state.history = None
+        state._party_position = (0, 0)
+        state.visibility_system = None
+        state.movement = None
+        world.evict_listeners.append(state._forget_area)
+        return state
+
+    def _forget_area(self, x0, y0, x1, y1):
+        for y in [y for y in self.secret_mask if y0 <= y < y1]:
+            row = self.secret_mask[y]
+            for x in [x for x in row if x0 <= x < x1]:
+                del row[x]
+        self.entities.clear_area(x0, y0, x1, y1)
+        self.overlays.clear_area(x0, y0, x1, y1)
+        if self.visibility_system:
+            self.visibility_system.forget_area(x0, y0, x1, y1)
+
+    @classmethod
+    def from_encoded(cls, data):
+        """Build a state straight from result_codec bytes (grid rows stay views)"""
+        return cls(decode_result(data))
+
     def save_debug_grid(self, filename="dungeon_debug.txt", show_blocking=True, show_types=False):
         """
         Save text-based grid representation to file
@@ -84,6 +167,8 @@ class DungeonStateNeo:
         """Enhanced debug view showing block fill status"""
         grid = []
         px, py = self.party_position
+        if isinstance(self.grid_system, FlatGridSystem):
+            return self._flat_debug_grid(px, py)
         
         for y in range(self.height):
             row = []
@@ -115,12 +200,41 @@ class DungeonStateNeo:
         
         return grid
 
+    def _flat_debug_grid(self, px, py):
+        """get_debug_grid straight off a FlatGridSystem's flags"""
+        def symbol(value):
+            if value & self.BLOCKED:
+                return '#'
+            if value & self.PERIMETER:
+                return 'X'
+            if value & CELL_FLAGS['DOORSPACE']:
+                return 'D'
+            if value & self.ROOM:
+                return 'R'
+            if value & self.CORRIDOR:
+                return 'C'
+            return '!'
+
+        symbols = {}
+        grid = []
+        for y in range(self.height):
+            row = [symbols.get(value) or symbols.setdefault(value, symbol(value))
+                   for value in self.grid_system.row(y)]
+            if y == py and 0 <= px < self.width:
+                row[px] = 'P'
+            grid.append(''.join(row))
+        return grid
+
     def _populate_grid(self, generator_grid):
-        for door in self.generator_result.get('doors', []):
-            if door['key'] != 'potential':  # Only register actual doors
-                x, y = door['x'], door['y']
-                self.door_orientations[(x, y)] = door['orientation']
         #print(f"POPULATE: door_orientations {self.door_orientations}")
+        if isinstance(self.grid_system, FlatGridSystem):
+            # Flags go straight into the buffer; only doors get a cell object
+            self.grid_system.load(generator_grid)
+            for (x, y), orientation in self.door_orientations.items():
+                cell = self.grid_system.get_cell(x, y)
+                if cell and cell.is_door:
+                    cell.properties['orientation'] = orientation
+            return
         for y in range(self.grid_system.height):
             # Ensure row exists
             if y >= len(generator_grid):
@@ -156,15 +270,25 @@ class DungeonStateNeo:
     @party_position.setter
     def party_position(self, value):
         self._party_position = value
+        # Endless worlds load the chunks around the party as it moves
+        if hasattr(self.grid_system, 'focus'):
+            self.grid_system.focus(*value)
         # Only update visibility if it exists
         if hasattr(self, 'visibility_system') and self.visibility_system:
             self.visibility_system.party_position = value
 
     def get_cell(self, x: int, y: int):
         """Get cell with bounds checking"""
-        if 0 <= x < self.width and 0 <= y < self.height:
-            return self.grid_system.get_cell(x, y)
+        # The grid system checks bounds; a chunked one has none
+        return self.grid_system.get_cell(x, y)
     
+    def room_node_at(self, x: int, y: int):
+        """room_graph node id of the room containing (x, y), or None"""
+        cell = self.get_cell(x, y)
+        if not cell or not cell.is_room:
+            return None
+        return f"room:{(cell.base_type & self.ROOM_ID) >> 6}"
+
     def get_door_orientation(self, x: int, y: int):
         orientations = self.door_orientations.get((x, y), 'horizontal')
         #print(f"orientations in state: {orientations}")
@@ -178,10 +302,80 @@ class DungeonStateNeo:
         return result
     
     def reveal_secret(self, x: int, y: int):
-        if self.grid_system.is_valid_position(x, y): # need to test this function
-            self.secret_mask[y][x] = True
-            return True
-        return False
+        return self.set_secret_revealed(x, y, True)
+
+    def set_secret_revealed(self, x: int, y: int, revealed: bool):
+        """Mark a secret as found (or hidden again) and patch its passability"""
+        if not self.grid_system.is_valid_position(x, y):
+            return False
+        self.touch(x, y)
+        self.secret_mask[y][x] = revealed
+        if self.passability is not None:
+            self.passability.update(x, y, self.get_cell(x, y).base_type, revealed)
+        return True
+
+    def set_cell_flags(self, x: int, y: int, value: int):
+        """Replace a cell's flags; every map edit should come through here
+
+        Keeps the passability bitmaps in step, bumps map_version and saves
+        the cell's chunk for undo.
+        """
+        cell = self.get_cell(x, y)
+        if not cell:
+            return False
+        self.touch(x, y)
+        if value != cell.base_type:
+            self._room_graph = None
+        cell.base_type = value
+        if self.passability is not None:
+            self.passability.update(x, y, cell.base_type, self.secret_mask[y][x])
+        return True
+
+    @property
+    def room_graph(self):
+        """RoomGraph of the map as it is now, or None for an endless state"""
+        if self._room_graph is None and self.rooms is not None:
+            if isinstance(self.grid_system, FlatGridSystem):
+                width, flags = self.grid_system.width, self.grid_system.flags
+                rows = [flags[i:i + width] for i in range(0, len(flags), width)]
+            else:
+                rows = [[cell.base_type if cell else self.NOTHING for cell in row]
+                        for row in self.grid_system.grid]
+            self._room_graph = RoomGraph.from_grid(rows, self.rooms, self.door_orientations)
+        return self._room_graph
+
+    def drop_room_graph(self):
+        """Forget the room graph after flags changed behind set_cell_flags"""
+        self._room_graph = None
+
+    def touch(self, x: int, y: int):
+        """Call before changing anything at (x, y) so undo can put it back"""
+        if self.history is not None:
+            self.history.touch(x, y)
+
+    @property
+    def map_version(self):
+        """Bumped on every cell change, for caches over passability"""
+        return self.passability.version if self.passability is not None else 0
+
+    def is_passable(self, x: int, y: int) -> bool:
+        if self.passability is not None:
+            return self.passability.passable_at(x, y)
+        cell = self.get_cell(x, y)
+        return bool(cell) and cell_passable(cell.base_type, self.secret_mask[y][x])
+
+    def is_opaque(self, x: int, y: int) -> bool:
+        if self.passability is not None:
+            return self.passability.opaque_at(x, y)
+        cell = self.get_cell(x, y)
+        return not cell or cell_opaque(cell.base_type)
+
+    def _flag_values(self):
+        """Every cell's flags, row by row"""
+        if isinstance(self.grid_system, FlatGridSystem):
+            return self.grid_system.flags
+        return [cell.base_type if cell else self.NOTHING
+                for row in self.grid_system.grid for cell in row]
     
     def update_visibility_for_path(self, path_cells: list):
         """Update visibility for a path of cells"""
@@ -1,4 +1,5 @@
 from dungeon_neo.constants import CELL_FLAGS, DIRECTION_VECTORS_8
+from dungeon_neo.passability import cell_opaque
 import math
 
 class VisibilitySystemNeo:
@@ -27,8 +28,10 @@ class VisibilitySystemNeo:
     BLOCK_CORR = CELL_FLAGS['BLOCK_CORR']
     BLOCK_DOOR = CELL_FLAGS['BLOCK_DOOR']
 
-    def __init__(self, grid_system, party_position, light_radius=3):
+    def __init__(self, grid_system, party_position, light_radius=3, passability=None):
         self.grid_system = grid_system
+        # Optional dungeon_neo.passability.PassabilityMap for the same grid
+        self.passability = passability
         self.party_position = party_position
         self.light_radius = light_radius
         self.visible_cells = set()   # Persistent visibility (once seen, always shown)
@@ -119,15 +122,18 @@ class VisibilitySystemNeo:
         return points
     
     def _is_blocking(self, x: int, y: int) -> bool:
+        if self.passability is not None:
+            return self.passability.opaque_at(x, y)
         cell = self.grid_system.get_cell(x, y)
         if not cell:
             return True
-            
-        return (cell.is_blocked or 
-                cell.is_perimeter or
-                (cell.is_door and not cell.is_arch) or
-                cell.base_type == CELL_FLAGS['NOTHING'])
+        return cell_opaque(cell.base_type)
     
+    def forget_area(self, x0, y0, x1, y1):
+        """Drop seen cells in [x0, x1) x [y0, y1), e.g. an evicted chunk"""
+        self.visible_cells = {(x, y) for x, y in self.visible_cells
+                              if not (x0 <= x < x1 and y0 <= y < y1)}
+
     def is_visible(self, x: int, y: int) -> bool:
         """Check if cell has been made visible (persistent)"""
         return (x, y) in self.visible_cells
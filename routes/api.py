@@ -282,7 +282,10 @@ def handle_movement():
     try:
         game_state = current_app.game_state
         # Access movement service directly
-        result = game_state.dungeon.state.movement.move(direction, steps)
+        dungeon = game_state.dungeon
+        result = dungeon.state.movement.move(direction, steps)
+        # Start on the next level while the party heads for the stairs
+        dungeon.near_down_stair()
         return jsonify(result)
     
     except Exception as e:
@@ -435,8 +438,85 @@ def get_dungeon_image():
     
     return send_file(img_io, mimetype='image/png')
 
+# Soft latency target for interactive regeneration: optional generator work
+# is trimmed to fit, but required phases still run, so big maps can take longer
+RESET_TIME_BUDGET_MS = 250
+
 # Add reset endpoint
 @api_bp.route('/reset', methods=['POST'])
 def reset_dungeon():
-    current_app.game_state.dungeon.generate()
-    return jsonify({"success": True, "message": "Dungeon reset"})
+    # Served from the dungeon pool when a pre-generated dungeon is ready,
+    # otherwise generated inline, aiming for RESET_TIME_BUDGET_MS
+    dungeon = current_app.game_state.dungeon
+    dungeon.generate(time_budget_ms=RESET_TIME_BUDGET_MS)
+    return jsonify({"success": True, "message": "Dungeon reset", "degraded": dungeon.last_degraded})
+
+# Endless mode: swap the current dungeon for a chunked world generated as the party explores
+@api_bp.route('/endless', methods=['POST'])
+def start_endless():
+    data = request.json or {}
+    dungeon = current_app.game_state.dungeon
+    success = dungeon.generate_endless(
+        data.get('world_seed'),
+        chunk_size=data.get('chunk_size', 41),
+        max_chunks=data.get('max_chunks', 16)
+    )
+    if not success:
+        return jsonify({"success": False, "message": "Endless dungeon generation failed"})
+    world = dungeon.state.grid_system
+    return jsonify({"success": True, "world_seed": world.world_seed, "chunks": world.stats()})
+
+# Undo/redo for DM edits (each AI command is one step)
+@api_bp.route('/undo', methods=['POST'])
+def undo_edit():
+    history = current_app.game_state.dungeon.state.history
+    if history is None or not history.can_undo():
+        return jsonify({"success": False, "message": "Nothing to undo"})
+    label = history.undo()
+    return jsonify({"success": True, "message": f"Undid {label or 'last edit'}", "can_redo": history.can_redo()})
+
+@api_bp.route('/redo', methods=['POST'])
+def redo_edit():
+    history = current_app.game_state.dungeon.state.history
+    if history is None or not history.can_redo():
+        return jsonify({"success": False, "message": "Nothing to redo"})
+    label = history.redo()
+    return jsonify({"success": True, "message": f"Redid {label or 'last edit'}", "can_undo": history.can_undo()})
+
+@api_bp.route('/dungeon-level', methods=['POST'])
+def change_dungeon_level():
+    """Take the stairs the party stands on, one level down or up
+
+    Levels are stored as generated, so the level left behind loses its DM
+    edits and explored cells; returning to it shows it unexplored again.
+    """
+    delta = request.json.get('delta', 1)
+    game_state = current_app.game_state
+    success = game_state.change_dungeon_level(delta)
+    dungeon = game_state.dungeon
+    message = f"Now on level {dungeon.depth}" if success else (
+        "Stand on a down stair to go down" if delta > 0 else "Stand on an up stair to go up")
+    return jsonify({
+        "success": success,
+        "message": message,
+        "depth": dungeon.depth if dungeon else None,
+        "levels": dungeon.levels.stats() if dungeon and dungeon.levels else None
+    })
+
+@api_bp.route('/dungeon-pool')
+def dungeon_pool_stats():
+    return jsonify(current_app.game_state.dungeon_pool.stats())
+
+@api_bp.route('/dungeon-timings')
+def dungeon_timings():
+    """Per-phase generator timings, newest last, with a per-phase average"""
+    limit = request.args.get('limit', type=int)
+    records = current_app.game_state.generation_timings.records(limit)
+
+    totals = {}
+    for record in records:
+        for name, ms in record['phases'].items():
+            totals.setdefault(name, []).append(ms)
+    average = {name: sum(times) / len(times) for name, times in totals.items()}
+
+    return jsonify({"records": records, "average_ms": average})
@@ -0,0 +1,98 @@
+# test_cell_collections.py
+import copy
+import pickle
+import unittest
+from dungeon_neo.cell_neo import DungeonCellNeo
+
+
+def fresh_cell():
+    return DungeonCellNeo(DungeonCellNeo.ROOM, 3, 4)
+
+
+class TestLazyCollections(unittest.TestCase):
+    def test_reading_leaves_the_cell_empty(self):
+        cell = fresh_cell()
+        self.assertEqual(cell.entities, [])
+        self.assertEqual(cell.properties, {})
+        self.assertNotIn('x', cell.properties)
+        self.assertIsNone(cell._entities)
+        self.assertIsNone(cell._properties)
+
+    def test_list_writes_persist(self):
+        writes = {
+            'append': lambda items: items.append('a'),
+            'extend': lambda items: items.extend(['a']),
+            'insert': lambda items: items.insert(0, 'a'),
+            'setitem': lambda items: items.__setitem__(slice(None), ['a']),
+            'iadd': lambda items: items.__iadd__(['a']),
+        }
+        for name in DungeonCellNeo.COLLECTIONS:
+            for how, write in writes.items():
+                with self.subTest(collection=name, write=how):
+                    cell = fresh_cell()
+                    held = getattr(cell, name)
+                    write(held)
+                    self.assertEqual(getattr(cell, name), ['a'])
+                    self.assertIs(getattr(cell, name), held)
+
+    def test_held_list_keeps_attaching_once(self):
+        cell = fresh_cell()
+        held = cell.npcs
+        held.append(1)
+        held += [2]
+        self.assertIs(cell.npcs, held)
+        self.assertEqual(cell.npcs, [1, 2])
+
+    def test_dict_writes_persist(self):
+        writes = {
+            'setitem': lambda props: props.__setitem__('lit', True),
+            'update': lambda props: props.update(lit=True),
+            'setdefault': lambda props: props.setdefault('lit', True),
+            'ior': lambda props: props.__ior__({'lit': True}),
+        }
+        for how, write in writes.items():
+            with self.subTest(write=how):
+                cell = fresh_cell()
+                write(cell.properties)
+                self.assertEqual(cell.properties, {'lit': True})
+
+    def test_assigning_replaces_the_collection(self):
+        cell = fresh_cell()
+        cell.items = ['sword']
+        cell.properties = {'trap': 'pit'}
+        self.assertEqual(cell.items, ['sword'])
+        self.assertEqual(cell.properties['trap'], 'pit')
+
+    def test_slotted_cells_pickle_and_copy(self):
+        cell = fresh_cell()
+        cell.description = "a mossy floor"
+        cell.items.append('torch')
+        cell.properties['lit'] = True
+        blank = fresh_cell()
+        blank.npcs  # a stand-in that was only read
+
+        for clone in (pickle.loads(pickle.dumps(cell)), copy.copy(cell), copy.deepcopy(cell)):
+            self.assertEqual((clone.x, clone.y, clone.base_type), (3, 4, DungeonCellNeo.ROOM))
+            self.assertEqual(clone.description, "a mossy floor")
+            self.assertEqual(clone.items, ['torch'])
+            self.assertEqual(clone.properties, {'lit': True})
+            self.assertIsNone(clone._npcs)
+
+        clone = copy.deepcopy(cell)
+        clone.items.append('rope')
+        self.assertEqual(cell.items, ['torch'])
+
+        for clone in (pickle.loads(pickle.dumps(blank)), copy.deepcopy(blank)):
+            self.assertIsNone(clone._npcs)
+            clone.npcs.append('bat')
+            self.assertEqual(clone.npcs, ['bat'])
+            self.assertEqual(blank.npcs, [])
+
+    def test_stand_ins_copy_as_plain_containers(self):
+        cell = fresh_cell()
+        self.assertIs(type(copy.copy(cell.entities)), list)
+        self.assertIs(type(pickle.loads(pickle.dumps(cell.properties))), dict)
+
+
+if __name__ == '__main__':
+    unittest.main()
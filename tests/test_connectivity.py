@@ -0,0 +1,99 @@
+# test_connectivity.py
+import unittest
+from collections import deque
+from core.dungeon import DungeonSystem
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+from dungeon_neo.connectivity_index import ConnectivityIndex
+from dungeon_neo.constants import CELL_FLAGS
+
+# Doors count as open here: connected means reachable once doors are opened
+OPEN = CELL_FLAGS['ROOM'] | CELL_FLAGS['CORRIDOR'] | CELL_FLAGS['ENTRANCE'] | CELL_FLAGS['DOORSPACE']
+BLOCKED = CELL_FLAGS['BLOCKED']
+
+
+def generate(**overrides):
+    options = dict(DungeonSystem.DEFAULT_OPTIONS, n_rows=39, n_cols=39)
+    options.update(overrides)
+    generator = DungeonGeneratorNeo(options)
+    return generator, generator.create_dungeon()
+
+
+def reachable_rooms(result):
+    """Ids of the rooms reachable from the first room, by flood fill"""
+    grid, rooms = result['grid'], result['rooms']
+    start = (rooms[0]['north'], rooms[0]['west'])
+    seen, queue = {start}, deque([start])
+    while queue:
+        r, c = queue.popleft()
+        for nr, nc in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)):
+            if 0 <= nr < len(grid) and 0 <= nc < len(grid[0]) and (nr, nc) not in seen:
+                if grid[nr][nc] & OPEN and not grid[nr][nc] & BLOCKED:
+                    seen.add((nr, nc))
+                    queue.append((nr, nc))
+    return {room['id'] for room in rooms if (room['north'], room['west']) in seen}
+
+
+class TestConnectivityIndex(unittest.TestCase):
+    def test_rooms_join_through_open_cells(self):
+        links = ConnectivityIndex(10, 10)
+        links.add_room(1, 1, 2, 2)
+        links.add_room(1, 7, 2, 8)
+        self.assertEqual(links.room_groups, 2)
+        self.assertFalse(links.connected())
+
+        for c in range(3, 7):
+            links.open(1, c)
+        self.assertTrue(links.connected())
+        self.assertTrue(links.same((2, 2), (2, 8)))
+        self.assertEqual(links.rooms_with(1, 5), 2)
+
+    def test_closed_cells_stay_apart(self):
+        links = ConnectivityIndex(10, 10)
+        links.open(0, 0)
+        links.open(0, 2)
+        self.assertFalse(links.is_open_at(0, 1))
+        self.assertFalse(links.same((0, 0), (0, 2)))
+        links.open(0, 1)
+        self.assertTrue(links.same((0, 0), (0, 2)))
+
+    def test_opening_twice_changes_nothing(self):
+        links = ConnectivityIndex(4, 4)
+        links.add_room(1, 1, 1, 1)
+        links.open(1, 1)
+        self.assertEqual(links.rooms_with(1, 1), 1)
+        self.assertEqual(links.room_groups, 1)
+
+
+class TestConnectedDungeons(unittest.TestCase):
+    def test_every_room_is_reachable(self):
+        for layout in ('Scattered', 'Packed', 'Dense'):
+            for corridors in ('Labyrinth', 'Bent', 'Straight'):
+                for seed in (1, 2, 3):
+                    for deadends in (0, 100):
+                        generator, result = generate(seed=seed, room_layout=layout,
+                                                     corridor_layout=corridors, remove_deadends=deadends)
+                        with self.subTest(layout=layout, corridors=corridors, seed=seed, deadends=deadends):
+                            self.assertTrue(generator.links.connected())
+                            self.assertEqual(reachable_rooms(result), {room['id'] for room in result['rooms']})
+
+    def test_room_walled_in_by_stray_corridors(self):
+        # Room 22 sits behind corridors that join no room; the link has to run through them
+        for deadends in (0, 50, 100):
+            generator, result = generate(seed=22, dungeon_layout='Box', room_layout='Packed',
+                                         remove_deadends=deadends)
+            self.assertTrue(generator.links.connected(), deadends)
+            self.assertEqual(reachable_rooms(result), {room['id'] for room in result['rooms']})
+            self.assertEqual(result['degraded'], [])
+
+    def test_edge_connectors_on_the_border(self):
+        # Connector cells sit on the outer wall, where link searches must stay in bounds
+        connectors = [(0, 5), (40, 17), (9, 0), (21, 40)]
+        for seed in (1, 2, 3):
+            generator, result = generate(seed=seed, n_rows=40, n_cols=40, edge_connectors=connectors)
+            self.assertTrue(generator.links.connected())
+            for r, c in connectors:
+                self.assertTrue(result['grid'][r][c] & OPEN, (seed, r, c))
+
+
+if __name__ == '__main__':
+    unittest.main()
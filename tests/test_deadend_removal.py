@@ -0,0 +1,72 @@
+# test_deadend_removal.py
+import hashlib
+import json
+import unittest
+from core.dungeon import DungeonSystem
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+
+# sha1 of the grid, first 16 hex digits, for seeds 1, 2 and 3: the grids
+# the full row-order sweep (SweepGenerator) gives for these options
+BASELINE = {
+    (39, 'Scattered', 0): ['d0257e0e60bf6f67', '00bd61375b0e71c6', 'bda226cb1a5d3fb1'],
+    (39, 'Scattered', 50): ['38f92e10cef09863', '5a2b9bd15e7ea824', '3e52d2a929194f2d'],
+    (39, 'Scattered', 100): ['c70c4419dad2562a', 'acc0df46e6ce9fcd', 'fcd16dcd0fb5b578'],
+    (75, 'Packed', 0): ['f6112bc5b51afe7f', '59a849aa27932337', '2bdc07d33b763e61'],
+    (75, 'Packed', 50): ['c853ed98cbffbced', 'e989ae9479cedc78', 'e7e7a8ec9a0117b2'],
+    (75, 'Packed', 100): ['580d52669ba25c82', '0717d489fe5dc066', '848bfe159225ae51'],
+}
+
+
+class SweepGenerator(DungeonGeneratorNeo):
+    """The generator with the original full sweep over every odd cell"""
+
+    def remove_deadends(self):
+        p = self.opts['remove_deadends']
+        all = (p == 100)
+        for i in range(self.n_i):
+            r = (i * 2) + 1
+            for j in range(self.n_j):
+                c = (j * 2) + 1
+                if not (self.cell[r][c] & (self.ROOM | self.CORRIDOR)):
+                    continue
+                if self.cell[r][c] & self.STAIRS:
+                    continue
+                if not all and self.rand.randint(0, 99) >= p:
+                    continue
+                if self.is_adjacent_to_door(r, c):
+                    continue
+                if self.corridor_leads_to_door(r, c):
+                    continue
+                self.collapse(r, c, self.close_end)
+
+
+def options(size, room_layout, deadends, seed, corridors='Bent'):
+    return dict(DungeonSystem.DEFAULT_OPTIONS, n_rows=size, n_cols=size, room_layout=room_layout,
+                corridor_layout=corridors, remove_deadends=deadends, seed=seed)
+
+
+def grid_digest(grid):
+    return hashlib.sha1(json.dumps([[int(v) for v in row] for row in grid]).encode()).hexdigest()[:16]
+
+
+class TestDeadendRemoval(unittest.TestCase):
+    def test_known_seeds_keep_their_grids(self):
+        for (size, room_layout, deadends), digests in BASELINE.items():
+            for seed, digest in enumerate(digests, 1):
+                result = DungeonGeneratorNeo(options(size, room_layout, deadends, seed)).create_dungeon()
+                self.assertEqual(grid_digest(result['grid']), digest, (size, room_layout, deadends, seed))
+
+    def test_worklist_matches_the_full_sweep(self):
+        # Same grid and the same RNG state afterwards, so later draws line up too
+        for corridors in ('Labyrinth', 'Bent', 'Straight'):
+            for deadends in (0, 30, 50, 90, 100):
+                for seed in (1, 2, 3):
+                    opts = options(51, 'Scattered', deadends, seed, corridors)
+                    worklist, sweep = DungeonGeneratorNeo(dict(opts)), SweepGenerator(dict(opts))
+                    with self.subTest(corridors=corridors, deadends=deadends, seed=seed):
+                        self.assertEqual(worklist.create_dungeon()['grid'], sweep.create_dungeon()['grid'])
+                        self.assertEqual(worklist.rand.getstate(), sweep.rand.getstate())
+
+
+if __name__ == '__main__':
+    unittest.main()
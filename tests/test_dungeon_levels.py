@@ -0,0 +1,109 @@
+# test_dungeon_levels.py
+import unittest
+from core.dungeon import DungeonSystem
+from dungeon_neo.dm_tools import DMTools
+
+
+def make_dungeon(**options):
+    dungeon = DungeonSystem(dict(DungeonSystem.DEFAULT_OPTIONS, n_rows=39, n_cols=39, **options))
+    assert dungeon.generate()
+    return dungeon
+
+
+def stand_on(dungeon, key):
+    # Stair dicts carry the row in 'x' and the column in 'y'
+    stair = next(s for s in dungeon.state.stairs if s['key'] == key)
+    dungeon.state.party_position = (stair['y'], stair['x'])
+
+
+class TestDungeonLevels(unittest.TestCase):
+    def test_stack_is_made_on_first_trip_down(self):
+        dungeon = make_dungeon(seed=11)
+        self.assertIsNone(dungeon.levels)
+        stand_on(dungeon, 'down')
+        self.assertTrue(dungeon.take_stairs(1))
+        self.assertIsNotNone(dungeon.levels)
+        self.assertEqual(dungeon.depth, 2)
+        dungeon.levels.close()
+
+    def test_stairs_need_a_matching_stair(self):
+        dungeon = make_dungeon(seed=11)
+        stand_on(dungeon, 'down')
+        self.assertFalse(dungeon.take_stairs(-1))
+        self.assertFalse(dungeon.take_stairs(2))
+        self.assertTrue(dungeon.take_stairs(1))
+
+        # The party arrives beside the stair it came down
+        self.assertFalse(dungeon.take_stairs(-1))
+        stand_on(dungeon, 'up')
+        self.assertFalse(dungeon.take_stairs(1))
+        self.assertTrue(dungeon.take_stairs(-1))
+        self.assertEqual(dungeon.depth, 1)
+        dungeon.levels.close()
+
+    def test_level_one_up_stair_leads_nowhere(self):
+        dungeon = make_dungeon(seed=11)
+        stand_on(dungeon, 'up')
+        self.assertFalse(dungeon.take_stairs(-1))
+        self.assertEqual(dungeon.depth, 1)
+
+    def test_stack_is_seeded_from_the_real_seed(self):
+        dungeon = make_dungeon(seed='None')
+        seed = dungeon._level_one['seed']
+        self.assertNotIn(seed, (None, 'None'))
+        stack = dungeon.level_stack()
+        self.assertEqual(stack.base_seed, seed)
+        self.assertEqual(stack.level_seed(2), f"{seed}:2")
+        stack.close()
+
+    def test_levels_below_are_reproducible(self):
+        grids = []
+        for _ in range(2):
+            dungeon = make_dungeon(seed=23)
+            stand_on(dungeon, 'down')
+            self.assertTrue(dungeon.take_stairs(1))
+            grids.append(dungeon.state._flag_values())
+            dungeon.levels.close()
+        self.assertEqual(grids[0], grids[1])
+
+    def test_regenerating_drops_the_stack(self):
+        dungeon = make_dungeon(seed=11)
+        stand_on(dungeon, 'down')
+        dungeon.take_stairs(1)
+        levels = dungeon.levels
+        self.assertTrue(dungeon.generate())
+        self.assertIsNone(dungeon.levels)
+        self.assertEqual(dungeon.depth, 1)
+        self.assertEqual(dungeon._level_one['seed'], '11#2')
+        levels.close()
+
+    def test_approaching_a_down_stair_prefetches(self):
+        dungeon = make_dungeon(seed=11)
+        stand_on(dungeon, 'down')
+        x, y = dungeon.state.party_position
+        dungeon.state.party_position = (x, y + 1)
+        self.assertTrue(dungeon.near_down_stair())
+        self.assertIsNotNone(dungeon.levels)
+        dungeon.levels.close()
+
+    def test_levels_come_back_as_generated(self):
+        # Documented limitation: only generated results are stored
+        dungeon = make_dungeon(seed=11)
+        flags = list(dungeon.state._flag_values())
+        tools = DMTools(dungeon.state)
+        x, y = dungeon.state.party_position
+        tools.describe_cell(x, y, "chalk marks")
+        tools.set_cell_type(x + 1, y, 'blocked')
+        self.assertNotEqual(list(dungeon.state._flag_values()), flags)
+
+        stand_on(dungeon, 'down')
+        self.assertTrue(dungeon.take_stairs(1))
+        stand_on(dungeon, 'up')
+        self.assertTrue(dungeon.take_stairs(-1))
+        self.assertEqual(list(dungeon.state._flag_values()), flags)
+        self.assertEqual(dungeon.state.get_cell(x, y).description, "")
+        dungeon.levels.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# test_edit_history.py
+import random
+import unittest
+from core.dungeon import DungeonSystem
+from dungeon_neo.dm_tools import DMTools
+from dungeon_neo.flat_grid import FlatCell
+
+
+def make_dungeon(flat_grid=False, seed=1):
+    dungeon = DungeonSystem(dict(DungeonSystem.DEFAULT_OPTIONS, seed=seed, n_rows=39, n_cols=39,
+                                 flat_grid=flat_grid))
+    assert dungeon.generate()
+    return dungeon
+
+
+def fingerprint(state):
+    """Everything undo is meant to put back"""
+    cells = []
+    for y in range(state.height):
+        for x in range(state.width):
+            cell = state.get_cell(x, y)
+            if cell.description or cell.properties:
+                cells.append((x, y, cell.description, sorted(cell.properties.items())))
+    return (
+        list(state._flag_values()),
+        [list(row) for row in state.secret_mask],
+        sorted(state.door_orientations.items()),
+        sorted(state.stair_orientations.items()),
+        cells,
+        sorted((x, y, len(objects)) for x, y, objects in state.entities.occupied()),
+        sorted((x, y, len(objects)) for x, y, objects in state.overlays.occupied()),
+        bytes(state.passability.passable)
+    )
+
+
+def random_edit(tools, state, rng, doors):
+    x, y = rng.randrange(state.width), rng.randrange(state.height)
+    kind = rng.randrange(6)
+    if kind == 0:
+        tools.set_cell_type(x, y, rng.choice(['room', 'corridor', 'blocked']))
+    elif kind == 1:
+        dx, dy = rng.choice(doors)
+        tools.set_door_properties(dx, dy, rng.choice(['horizontal', 'vertical']), rng.choice(['arch', 'secret', 'locked']))
+    elif kind == 2:
+        tools.modify_cell_flag(x, y, rng.choice(['arch', 'secret', 'stairs_up']), rng.choice(['true', 'false']))
+    elif kind == 3:
+        tools.add_entity(x, y, 'npc')
+    elif kind == 4:
+        tools.add_overlay(x, y, 'circle', 1, 2, 3)
+    else:
+        tools.describe_cell(x, y, f"note {x},{y}")
+
+
+class TestEditHistory(unittest.TestCase):
+    def test_undo_and_redo_everything(self):
+        for flat_grid in (False, True):
+            dungeon = make_dungeon(flat_grid)
+            state, tools = dungeon.state, DMTools(dungeon.state)
+            rng = random.Random(5)
+            doors = list(state.door_orientations)
+            start = fingerprint(state)
+            for _ in range(30):
+                random_edit(tools, state, rng, doors)
+            end = fingerprint(state)
+
+            while tools.undo_edit()['success']:
+                pass
+            self.assertEqual(fingerprint(state), start, flat_grid)
+            while tools.redo_edit()['success']:
+                pass
+            self.assertEqual(fingerprint(state), end, flat_grid)
+
+    def test_each_tool_call_is_one_step(self):
+        dungeon = make_dungeon()
+        state, tools = dungeon.state, DMTools(dungeon.state)
+        before = fingerprint(state)
+        tools.describe_cell(3, 3, "a statue")
+        middle = fingerprint(state)
+        tools.add_entity(3, 3, 'npc')
+
+        self.assertEqual(state.history.undo(), 'add_entity')
+        self.assertEqual(fingerprint(state), middle)
+        self.assertEqual(state.history.undo(), 'describe_cell')
+        self.assertEqual(fingerprint(state), before)
+
+    def test_nested_tools_stay_one_step(self):
+        dungeon = make_dungeon()
+        state, tools = dungeon.state, DMTools(dungeon.state)
+        before = fingerprint(state)
+        tools.create_door(5, 5, 'horizontal', 'locked')
+        self.assertEqual(len(state.history.undo_stack), 1)
+        self.assertEqual(state.history.undo(), 'create_door')
+        self.assertEqual(fingerprint(state), before)
+        self.assertFalse(state.history.can_undo())
+
+    def test_new_edit_drops_redo(self):
+        dungeon = make_dungeon()
+        state, tools = dungeon.state, DMTools(dungeon.state)
+        tools.describe_cell(2, 2, "first")
+        tools.describe_cell(2, 2, "second")
+        tools.undo_edit()
+        self.assertTrue(state.history.can_redo())
+        tools.describe_cell(4, 4, "fork")
+        self.assertFalse(state.history.can_redo())
+        self.assertEqual(state.get_cell(2, 2).description, "first")
+
+    def test_undo_on_flat_grid_leaves_no_empty_cells(self):
+        dungeon = make_dungeon(flat_grid=True)
+        state, tools = dungeon.state, DMTools(dungeon.state)
+        grid = state.grid_system
+        kept = set(grid.extra)
+        for x in range(1, 8):
+            tools.describe_cell(x, 3, "dust")
+        while tools.undo_edit()['success']:
+            pass
+        self.assertEqual(set(grid.extra), kept)
+        for cell in grid.extra.values():
+            self.assertTrue(any(getattr(cell, slot, None) for slot in FlatCell.DATA_SLOTS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# test_flat_grid.py
+import unittest
+from core.dungeon import DungeonSystem
+from dungeon_neo.dm_tools import DMTools
+from dungeon_neo.flat_grid import FlatCell, FlatGridSystem
+
+
+def make_dungeon(flat_grid, seed):
+    dungeon = DungeonSystem(dict(DungeonSystem.DEFAULT_OPTIONS, seed=seed, n_rows=39, n_cols=39,
+                                 flat_grid=flat_grid))
+    assert dungeon.generate()
+    return dungeon
+
+
+def edit(dungeon):
+    tools = DMTools(dungeon.state)
+    tools.describe_cell(3, 5, "a cracked pillar")
+    tools.set_cell_type(7, 7, 'corridor')
+    tools.modify_cell_flag(9, 11, 'secret', 'true')
+    tools.create_door(13, 13, 'vertical', 'locked')
+    tools.add_entity(5, 5, 'npc')
+
+
+def cells(state):
+    """Flags, description and properties of every cell, row by row"""
+    rows = []
+    for y in range(state.height):
+        for x in range(state.width):
+            cell = state.get_cell(x, y)
+            rows.append((x, y, cell.base_type, cell.description, dict(cell.properties),
+                         cell.is_room, cell.is_door, cell.is_secret, cell.is_stairs))
+    return rows
+
+
+class TestFlatGrid(unittest.TestCase):
+    def test_same_cells_as_the_object_grid(self):
+        for seed in (1, 2, 3):
+            objects, flat = make_dungeon(False, seed), make_dungeon(True, seed)
+            self.assertIsInstance(flat.state.grid_system, FlatGridSystem)
+            self.assertNotIsInstance(objects.state.grid_system, FlatGridSystem)
+            self.assertEqual(cells(flat.state), cells(objects.state), seed)
+
+            edit(objects)
+            edit(flat)
+            self.assertEqual(cells(flat.state), cells(objects.state), seed)
+
+    def test_views_are_kept_only_with_data(self):
+        grid = FlatGridSystem(5, 4)
+        grid.load([[1] * 5 for _ in range(4)])
+        view = grid.get_cell(2, 1)
+        self.assertIsNot(grid.get_cell(2, 1), view)
+        self.assertEqual(grid.extra, {})
+
+        view.base_type = 4
+        self.assertEqual(grid.flags[grid.index(2, 1)], 4)
+        self.assertEqual(grid.extra, {})
+
+        view.description = "ashes"
+        self.assertIs(grid.get_cell(2, 1), view)
+        grid.release(view)
+        self.assertIs(grid.get_cell(2, 1), view)
+
+    def test_release_drops_emptied_views(self):
+        grid = FlatGridSystem(5, 4)
+        described, furnished = grid.get_cell(1, 1), grid.get_cell(3, 2)
+        described.description = "ashes"
+        furnished.properties['lit'] = True
+        furnished.items.append('torch')
+        self.assertEqual(set(grid.extra), {(1, 1), (3, 2)})
+
+        described.description = ""
+        grid.release(described)
+        self.assertNotIn((1, 1), grid.extra)
+
+        furnished.properties = {}
+        grid.release(furnished)
+        self.assertIn((3, 2), grid.extra)
+        furnished.items = []
+        grid.release(furnished)
+        self.assertEqual(grid.extra, {})
+        self.assertIsNot(grid.get_cell(3, 2), furnished)
+
+        for cell in (grid.get_cell(1, 1), grid.get_cell(3, 2)):
+            self.assertFalse(any(getattr(cell, slot, None) for slot in FlatCell.DATA_SLOTS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+# test_numpy_passes.py
+import unittest
+from core.dungeon import DungeonSystem
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestNumpyPasses(unittest.TestCase):
+    def test_same_dungeon_as_the_list_passes(self):
+        for layout in ('None', 'Box', 'Cross', 'Round', 'Cavern'):
+            for room_layout in ('Scattered', 'Packed'):
+                for seed in (1, 2, 3, 4):
+                    options = dict(DungeonSystem.DEFAULT_OPTIONS, seed=seed, n_rows=51, n_cols=51,
+                                   dungeon_layout=layout, room_layout=room_layout)
+                    lists = DungeonGeneratorNeo(dict(options)).create_dungeon()
+                    arrays = DungeonGeneratorNeo(dict(options, numpy_passes=True)).create_dungeon()
+                    with self.subTest(layout=layout, room_layout=room_layout, seed=seed):
+                        self.assertEqual(arrays['grid'], lists['grid'])
+                        self.assertEqual(arrays['doors'], lists['doors'])
+                        self.assertEqual(arrays['stairs'], lists['stairs'])
+                        self.assertTrue(all(type(v) is int for v in arrays['grid'][seed]))
+
+    def test_reused_buffers_match_too(self):
+        options = dict(DungeonSystem.DEFAULT_OPTIONS, seed=7, n_rows=39, n_cols=39, reuse_buffers=True)
+        lists = DungeonGeneratorNeo(dict(options))
+        arrays = DungeonGeneratorNeo(dict(options, numpy_passes=True))
+        for _ in range(3):
+            self.assertEqual(arrays.create_dungeon()['grid'], lists.create_dungeon()['grid'])
+
+
+if __name__ == '__main__':
+    unittest.main()
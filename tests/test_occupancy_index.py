@@ -0,0 +1,43 @@
+# test_occupancy_index.py
+import random
+import unittest
+from unittest import mock
+from core.dungeon import DungeonSystem
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+from dungeon_neo.occupancy_index import OccupancyIndex
+
+
+def options(seed, room_layout='Scattered', layout='Cross'):
+    return dict(DungeonSystem.DEFAULT_OPTIONS, seed=seed, n_rows=75, n_cols=75,
+                dungeon_layout=layout, room_layout=room_layout)
+
+
+class TestOccupancyIndex(unittest.TestCase):
+    def test_rectangles_agree_with_the_cells(self):
+        rng = random.Random(3)
+        for seed in (1, 2, 3):
+            generator = DungeonGeneratorNeo(options(seed, 'Packed'))
+            generator.create_dungeon()
+            index = OccupancyIndex(generator.cell, generator.BLOCKED, generator.ROOM)
+            for _ in range(300):
+                r1, c1 = rng.randrange(1, 70), rng.randrange(1, 70)
+                r2, c2 = r1 + rng.randrange(5), c1 + rng.randrange(5)
+                generator.occupancy = None
+                scanned = generator.sound_room(r1, c1, r2, c2)
+                generator.occupancy = index
+                self.assertEqual(generator.sound_room(r1, c1, r2, c2), scanned, (seed, r1, c1, r2, c2))
+                self.assertEqual(generator.room_collides(r1, c1, r2, c2), bool(scanned))
+
+    def test_scattered_output_matches_a_cell_scan(self):
+        for layout in ('None', 'Cross', 'Round'):
+            for seed in (1, 2, 3):
+                indexed = DungeonGeneratorNeo(options(seed, layout=layout)).create_dungeon()
+                # Without an index the collision checks fall back to sound_room's scan
+                with mock.patch('dungeon_neo.generator_neo.OccupancyIndex', lambda *args: None):
+                    scanned = DungeonGeneratorNeo(options(seed, layout=layout)).create_dungeon()
+                self.assertEqual(indexed['grid'], scanned['grid'], (layout, seed))
+                self.assertEqual(indexed['rooms'], scanned['rooms'], (layout, seed))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# test_passability.py
+import random
+import unittest
+from core.dungeon import DungeonSystem
+from dungeon_neo.dm_tools import DMTools
+from dungeon_neo.constants import CELL_FLAGS
+from dungeon_neo.passability import PassabilityMap, cell_passable, cell_opaque
+
+F = CELL_FLAGS
+
+
+def make_dungeon(flat_grid=False, seed=3):
+    dungeon = DungeonSystem(dict(DungeonSystem.DEFAULT_OPTIONS, seed=seed, n_rows=39, n_cols=39,
+                                 flat_grid=flat_grid))
+    assert dungeon.generate()
+    return dungeon
+
+
+def rebuilt(state):
+    """A PassabilityMap built from scratch from the state's cells"""
+    fresh = PassabilityMap(state.width, state.height)
+    fresh.build(state._flag_values(), lambda x, y: state.secret_mask[y][x])
+    return fresh
+
+
+class TestCellRules(unittest.TestCase):
+    def test_floor_rock_and_walls(self):
+        self.assertTrue(cell_passable(F['ROOM']))
+        self.assertTrue(cell_passable(F['CORRIDOR']))
+        self.assertFalse(cell_passable(F['NOTHING']))
+        self.assertFalse(cell_passable(F['BLOCKED']))
+        self.assertFalse(cell_passable(F['PERIMETER'] | F['ROOM']))
+        self.assertTrue(cell_opaque(F['NOTHING']))
+        self.assertTrue(cell_opaque(F['PERIMETER']))
+        self.assertFalse(cell_opaque(F['ROOM']))
+
+    def test_doors(self):
+        self.assertTrue(cell_passable(F['ARCH'] | F['ENTRANCE']))
+        self.assertFalse(cell_passable(F['DOOR'] | F['ENTRANCE']))
+        self.assertFalse(cell_opaque(F['ARCH']))
+        self.assertTrue(cell_opaque(F['DOOR']))
+
+    def test_secret_doors_open_once_revealed(self):
+        secret = F['ARCH'] | F['SECRET'] | F['ENTRANCE']
+        self.assertFalse(cell_passable(secret))
+        self.assertTrue(cell_passable(secret, revealed=True))
+
+    def test_stairs_are_always_passable(self):
+        self.assertTrue(cell_passable(F['STAIR_DN'] | F['PERIMETER']))
+        self.assertTrue(cell_passable(F['STAIR_UP']))
+
+
+class TestPassabilityMap(unittest.TestCase):
+    def test_outside_the_grid(self):
+        bitmap = PassabilityMap(3, 2)
+        bitmap.build([F['ROOM']] * 6)
+        self.assertTrue(bitmap.passable_at(2, 1))
+        self.assertFalse(bitmap.passable_at(3, 0))
+        self.assertFalse(bitmap.passable_at(0, -1))
+        self.assertTrue(bitmap.opaque_at(-1, 0))
+
+    def test_update_bumps_version(self):
+        bitmap = PassabilityMap(2, 2)
+        bitmap.build([F['ROOM']] * 4)
+        version = bitmap.version
+        bitmap.update(1, 0, F['BLOCKED'])
+        self.assertFalse(bitmap.passable_at(1, 0))
+        self.assertTrue(bitmap.passable_at(0, 0))
+        self.assertGreater(bitmap.version, version)
+
+
+class TestStatePassability(unittest.TestCase):
+    def test_matches_movement_rule(self):
+        dungeon = make_dungeon()
+        state = dungeon.state
+        for y in range(state.height):
+            for x in range(state.width):
+                blocked = dungeon.is_blocked_for_movement(state.get_cell(x, y))
+                self.assertEqual(state.is_passable(x, y), not blocked, (x, y))
+
+    def test_stays_in_step_with_edits(self):
+        for flat_grid in (False, True):
+            dungeon = make_dungeon(flat_grid)
+            state, tools = dungeon.state, DMTools(dungeon.state)
+            rng = random.Random(7)
+            doors = list(state.door_orientations)
+            version = state.map_version
+            for _ in range(60):
+                x, y = rng.randrange(state.width), rng.randrange(state.height)
+                kind = rng.randrange(4)
+                if kind == 0:
+                    tools.set_cell_type(x, y, rng.choice(['room', 'corridor', 'blocked']))
+                elif kind == 1:
+                    dx, dy = rng.choice(doors)
+                    tools.set_door_properties(dx, dy, 'horizontal', rng.choice(['arch', 'secret', 'locked']))
+                elif kind == 2:
+                    dx, dy = rng.choice(doors)
+                    tools.reveal_secret(dx, dy)
+                else:
+                    tools.modify_cell_flag(x, y, rng.choice(['arch', 'secret', 'stairs_up']),
+                                           rng.choice(['true', 'false']))
+            fresh = rebuilt(state)
+            self.assertEqual(bytes(fresh.passable), bytes(state.passability.passable), flat_grid)
+            self.assertEqual(bytes(fresh.opaque), bytes(state.passability.opaque), flat_grid)
+            self.assertGreater(state.map_version, version)
+
+    def test_revealing_a_secret_door(self):
+        dungeon = make_dungeon()
+        state = dungeon.state
+        x, y = next(iter(state.door_orientations))
+        state.set_cell_flags(x, y, F['ARCH'] | F['SECRET'] | F['ENTRANCE'])
+        self.assertFalse(state.is_passable(x, y))
+        state.reveal_secret(x, y)
+        self.assertTrue(state.is_passable(x, y))
+        state.set_secret_revealed(x, y, False)
+        self.assertFalse(state.is_passable(x, y))
+
+
+if __name__ == '__main__':
+    unittest.main()
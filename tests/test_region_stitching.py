@@ -0,0 +1,64 @@
+# test_region_stitching.py
+import unittest
+from core.dungeon import DungeonSystem
+from core.region_generation import RegionGenerator
+from dungeon_neo.constants import CELL_FLAGS
+
+ROOM_ID = CELL_FLAGS['ROOM_ID']
+LABEL = CELL_FLAGS['LABEL']
+
+
+def stitched(regions, seed=5):
+    options = dict(DungeonSystem.DEFAULT_OPTIONS, seed=seed, n_rows=81, n_cols=121, regions=regions)
+    return RegionGenerator(options).generate()
+
+
+def labels(grid):
+    """Every word spelled out by the label bits, left to right on each row"""
+    words = []
+    for row in grid:
+        text = ''.join(chr((value & LABEL) >> 24) if value & LABEL else ' ' for value in row)
+        words.extend(text.split())
+    return words
+
+
+class TestRegionStitching(unittest.TestCase):
+    def test_room_ids_are_unique(self):
+        for regions in (1, 4, 6):
+            result = stitched(regions)
+            ids = [room['id'] for room in result['rooms']]
+            self.assertEqual(sorted(ids), list(range(1, len(ids) + 1)), regions)
+
+    def test_cells_carry_their_rooms_id(self):
+        result = stitched(4)
+        grid = result['grid']
+        for room in result['rooms']:
+            for r in range(room['north'], room['south'] + 1):
+                for c in range(room['west'], room['east'] + 1):
+                    self.assertEqual((grid[r][c] & ROOM_ID) >> 6, room['id'], (r, c))
+
+    def test_every_room_is_labelled_once(self):
+        for regions in (1, 4, 6):
+            result = stitched(regions)
+            words = labels(result['grid'])
+            self.assertEqual(sorted(words), sorted(str(room['id']) for room in result['rooms']), regions)
+
+    def test_labels_sit_inside_their_room(self):
+        result = stitched(6)
+        grid = result['grid']
+        for room in result['rooms']:
+            r = (room['north'] + room['south']) // 2
+            text = ''.join(chr((grid[r][c] & LABEL) >> 24) if grid[r][c] & LABEL else ' '
+                           for c in range(room['west'], room['east'] + 1))
+            self.assertEqual(text.strip(), str(room['id']))
+
+    def test_output_does_not_depend_on_workers(self):
+        options = dict(DungeonSystem.DEFAULT_OPTIONS, seed=9, n_rows=81, n_cols=81, regions=4)
+        serial = RegionGenerator(options, workers=1).generate()
+        parallel = RegionGenerator(options, workers=2).generate()
+        self.assertEqual(serial['grid'], parallel['grid'])
+        self.assertEqual(serial['rooms'], parallel['rooms'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# test_result_codec.py
+import struct
+import unittest
+from core.dungeon import DungeonSystem
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+from dungeon_neo.result_codec import HEADER, encode_result, decode_result
+
+
+def generate(seed, **overrides):
+    options = dict(DungeonSystem.DEFAULT_OPTIONS, seed=seed, n_rows=39, n_cols=39)
+    options.update(overrides)
+    return DungeonGeneratorNeo(options).create_dungeon()
+
+
+def empty_result(n_rows=4, n_cols=6):
+    return {
+        'seed': 'empty',
+        'grid': [[r * 10 + c for c in range(n_cols + 1)] for r in range(n_rows + 1)],
+        'stairs': [], 'doors': [], 'rooms': [],
+        'n_rows': n_rows, 'n_cols': n_cols
+    }
+
+
+class TestResultCodec(unittest.TestCase):
+    def assertRoundTrip(self, result, rle):
+        decoded = decode_result(encode_result(result, rle=rle))
+        self.assertEqual([list(row) for row in decoded['grid']], [list(row) for row in result['grid']])
+        self.assertEqual(decoded['doors'], result['doors'])
+        self.assertEqual(decoded['stairs'], result['stairs'])
+        # Rooms lose their per-direction door lists, which repeat 'doors'
+        self.assertEqual(decoded['rooms'], [{k: v for k, v in room.items() if k != 'door'}
+                                            for room in result['rooms']])
+        self.assertEqual(decoded['seed'], result['seed'])
+        self.assertEqual((decoded['n_rows'], decoded['n_cols']), (result['n_rows'], result['n_cols']))
+
+    def test_generated_dungeons_round_trip(self):
+        for rle in (False, True):
+            for seed in (1, 2, 3):
+                for layout in ('None', 'Cross'):
+                    result = generate(seed, dungeon_layout=layout)
+                    self.assertTrue(result['doors'] and result['stairs'] and result['rooms'])
+                    with self.subTest(rle=rle, seed=seed, layout=layout):
+                        self.assertRoundTrip(result, rle)
+
+    def test_nothing_but_a_grid_round_trips(self):
+        for rle in (False, True):
+            with self.subTest(rle=rle):
+                self.assertRoundTrip(empty_result(), rle)
+                self.assertRoundTrip(generate(4, add_stairs=0, dungeon_layout='Cavern'), rle)
+
+    def test_seed_can_be_overridden(self):
+        result = generate(5)
+        self.assertEqual(decode_result(encode_result(result, seed='5#2'))['seed'], '5#2')
+
+    def test_raw_grid_rows_are_views(self):
+        data = bytearray(encode_result(empty_result()))
+        grid = decode_result(data)['grid']
+        self.assertIsInstance(grid[0], memoryview)
+        self.assertEqual(grid[2][3], 23)
+
+    def test_truncated_buffers_raise(self):
+        for rle in (False, True):
+            data = encode_result(generate(1), rle=rle)
+            for size in (0, HEADER.size - 1, HEADER.size + 3, len(data) // 2, len(data) - 1):
+                with self.subTest(rle=rle, size=size):
+                    with self.assertRaisesRegex(ValueError, 'truncated|do not cover'):
+                        decode_result(data[:size])
+
+    def test_wrong_magic_or_version_raises(self):
+        data = bytearray(encode_result(empty_result()))
+        with self.assertRaisesRegex(ValueError, 'Not an encoded dungeon result'):
+            decode_result(b'XXXX' + bytes(data[4:]))
+        struct.pack_into('<H', data, 4, 99)
+        with self.assertRaisesRegex(ValueError, 'Unsupported dungeon result version 99'):
+            decode_result(data)
+
+    def test_unknown_door_key_raises(self):
+        result = generate(1)
+        result['doors'][0] = dict(result['doors'][0], key='portal')
+        with self.assertRaisesRegex(ValueError, "door key 'portal'"):
+            encode_result(result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# test_spatial_store.py
+import random
+import unittest
+from core.dungeon import DungeonSystem
+from dungeon_neo.dm_tools import DMTools
+from dungeon_neo.spatial_store import SpatialStore
+
+
+class Thing:
+    """Plain object; the store keys objects by identity, not equality"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Thing) and other.name == self.name
+
+    __hash__ = object.__hash__
+
+
+class TestSpatialStore(unittest.TestCase):
+    def test_add_move_remove(self):
+        store = SpatialStore(bucket_size=4)
+        goblin = Thing('goblin')
+        store.add(1, 2, goblin)
+        self.assertEqual(store.position(goblin), (1, 2))
+        self.assertEqual(store.at(1, 2), [goblin])
+        self.assertEqual(len(store), 1)
+
+        self.assertTrue(store.move(goblin, 9, 9))
+        self.assertEqual(store.at(1, 2), [])
+        self.assertEqual(store.position(goblin), (9, 9))
+
+        self.assertEqual(store.remove(goblin), (9, 9))
+        self.assertIsNone(store.remove(goblin))
+        self.assertFalse(store.move(goblin, 0, 0))
+        self.assertFalse(store)
+        self.assertEqual(store.buckets, {})
+
+    def test_equal_objects_are_kept_apart(self):
+        store = SpatialStore()
+        first, second = Thing('rat'), Thing('rat')
+        store.add(0, 0, first)
+        store.add(5, 5, second)
+        store.remove(second)
+        self.assertEqual(store.position(first), (0, 0))
+        self.assertIsNone(store.position(second))
+
+    def test_adding_again_moves(self):
+        store = SpatialStore()
+        orc = Thing('orc')
+        store.add(0, 0, orc)
+        store.add(3, 3, orc)
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.at(0, 0), [])
+
+    def test_queries_match_a_full_scan(self):
+        store = SpatialStore(bucket_size=8)
+        rng = random.Random(1)
+        placed = []
+        for k in range(300):
+            x, y = rng.randrange(-20, 60), rng.randrange(-20, 60)
+            thing = Thing(k)
+            store.add(x, y, thing)
+            placed.append((x, y, thing))
+
+        for _ in range(50):
+            x0, y0 = rng.randrange(-25, 60), rng.randrange(-25, 60)
+            x1, y1 = x0 + rng.randrange(1, 30), y0 + rng.randrange(1, 30)
+            expected = {id(t) for x, y, t in placed if x0 <= x < x1 and y0 <= y < y1}
+            self.assertEqual({id(t) for _, _, t in store.in_rect(x0, y0, x1, y1)}, expected)
+
+            cx, cy, radius = rng.randrange(60), rng.randrange(60), rng.randrange(12)
+            expected = {id(t) for x, y, t in placed if abs(x - cx) + abs(y - cy) <= radius}
+            self.assertEqual({id(t) for _, _, t in store.in_radius(cx, cy, radius)}, expected)
+
+    def test_clear_area(self):
+        store = SpatialStore(bucket_size=4)
+        inside, outside = Thing('in'), Thing('out')
+        store.add(2, 2, inside)
+        store.add(10, 2, outside)
+        store.clear_area(0, 0, 8, 8)
+        self.assertIsNone(store.position(inside))
+        self.assertEqual(store.position(outside), (10, 2))
+        self.assertEqual([(x, y) for x, y, _ in store.occupied()], [(10, 2)])
+
+    def test_before_change_sees_both_ends_of_a_move(self):
+        store = SpatialStore()
+        touched = []
+        store.before_change = lambda x, y: touched.append((x, y))
+        bat = Thing('bat')
+        store.add(1, 1, bat)
+        store.move(bat, 4, 4)
+        self.assertEqual(touched, [(1, 1), (1, 1), (4, 4)])
+
+
+class TestStateStores(unittest.TestCase):
+    def test_tools_place_entities_and_overlays(self):
+        dungeon = DungeonSystem(dict(DungeonSystem.DEFAULT_OPTIONS, seed=2, n_rows=39, n_cols=39))
+        self.assertTrue(dungeon.generate())
+        state, tools = dungeon.state, DMTools(dungeon.state)
+        tools.add_entity(4, 5, 'npc')
+        tools.add_overlay(4, 5, 'circle', 1, 2, 3)
+        self.assertEqual(len(state.entities.at(4, 5)), 1)
+        self.assertEqual(len(state.overlays.at(4, 5)), 1)
+        self.assertEqual([(x, y) for x, y, _ in state.entities.in_radius(5, 5, 1)], [(4, 5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# test_time_budget.py
+import contextlib
+import io
+import time
+import unittest
+from collections import deque
+from core.dungeon import DungeonSystem
+from dungeon_neo.generator_neo import DungeonGeneratorNeo
+from dungeon_neo.constants import CELL_FLAGS
+
+OPEN = CELL_FLAGS['ROOM'] | CELL_FLAGS['CORRIDOR'] | CELL_FLAGS['ENTRANCE'] | CELL_FLAGS['DOORSPACE']
+BLOCKED = CELL_FLAGS['BLOCKED']
+
+# The budget is soft: linking the rooms and cleanup run after the cuts.
+# Best of three, since a timing test has to live with a busy box.
+TOLERANCE = 1.5
+
+
+def generate(seed, budget=None, size=301):
+    options = dict(DungeonSystem.DEFAULT_OPTIONS, seed=seed, n_rows=size, n_cols=size)
+    if budget:
+        options['time_budget_ms'] = budget
+    with contextlib.redirect_stdout(io.StringIO()):
+        generator = DungeonGeneratorNeo(options)
+        start = time.perf_counter()
+        result = generator.create_dungeon()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def reachable_rooms(result):
+    """Ids of the rooms reachable from the first room, by flood fill"""
+    grid, rooms = result['grid'], result['rooms']
+    start = (rooms[0]['north'], rooms[0]['west'])
+    seen, queue = {start}, deque([start])
+    while queue:
+        r, c = queue.popleft()
+        for nr, nc in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)):
+            if 0 <= nr < len(grid) and 0 <= nc < len(grid[0]) and (nr, nc) not in seen:
+                if grid[nr][nc] & OPEN and not grid[nr][nc] & BLOCKED:
+                    seen.add((nr, nc))
+                    queue.append((nr, nc))
+    return {room['id'] for room in rooms if (room['north'], room['west']) in seen}
+
+
+class TestTimeBudget(unittest.TestCase):
+    def test_large_map_stays_near_its_budget(self):
+        budget = 200
+        runs = [generate(5, budget) for _ in range(3)]
+        result, elapsed = min(runs, key=lambda run: run[1])
+        self.assertLess(elapsed, budget * TOLERANCE)
+
+        steps = {entry['step'] for entry in result['degraded']}
+        self.assertIn('corridors', steps)
+        self.assertNotIn('connect_rooms', steps)
+        self.assertEqual(reachable_rooms(result), {room['id'] for room in result['rooms']})
+
+    def test_no_budget_cuts_nothing(self):
+        full, _ = generate(5, size=75)
+        generous, _ = generate(5, budget=60000, size=75)
+        self.assertEqual(full['degraded'], [])
+        self.assertEqual(generous['degraded'], [])
+        self.assertEqual(generous['grid'], full['grid'])
+
+
+if __name__ == '__main__':
+    unittest.main()